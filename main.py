@@ -5,13 +5,52 @@ import chess
 from rich.live import Live
 
 import src.engine as engine
+from src.search import set_cache
 import src.personality as personality
 import src.ui as ui
 import src.tui as tui
+from src.stats import SearchStats
+
+# How often the status panel shows the progress of a running search
+SEARCH_POLL = 0.25
+
+# Show TT hits, first-move cutoffs and branching factor while the bot thinks
+# (counting them costs the search a few percent of its speed)
+SHOW_SEARCH_STATS = True
+
+# Keep search results in this file so positions from earlier sessions are
+# answered at once (see src/cache.py), None to search everything afresh
+ANALYSIS_CACHE_FILE = None
+
+def new_stats():
+    return SearchStats() if SHOW_SEARCH_STATS else None
+
+def search_status(board, label, info, stats=None):
+    # One status line with the progress of the bot's search
+    if info is None:
+        return f"{label} (Ctrl-C to move now)"
+    best = board.san(info["pv"][0])
+    line = f"{label} depth {info['depth']} | {info['nps']:,} nodes/s | best {best}"
+    if stats is not None:
+        line += " | " + stats.status()
+    return line + " (Ctrl-C to move now)"
+
+def think(search, board, game_tui, label):
+    # Wait for an engine.BackgroundSearch while keeping the dashboard live.
+    # Ctrl-C stops the search and plays the best move found so far.
+    try:
+        while not search.done():
+            game_tui.set_status(search_status(board, label, search.info, search.stats))
+            search.wait(SEARCH_POLL)
+    except KeyboardInterrupt:
+        search.cancel()
+    return search.wait()
 
 def main():
     # Load weights
     engine.load_weights("model.json")
+    if ANALYSIS_CACHE_FILE:
+        set_cache(ANALYSIS_CACHE_FILE)
     
     board = chess.Board()
     
@@ -37,6 +76,9 @@ def main():
     comment = personality.get_comment("GAME_START")
     if comment: game_tui.add_chat(comment)
     
+    # Background search on the user's time, see engine.PonderSearch
+    ponder = None
+    
     with Live(game_tui.layout, refresh_per_second=4, screen=True) as live:
         while not board.is_game_over():
             game_tui.update(board)
@@ -55,12 +97,26 @@ def main():
                 game_tui.set_status(f"Bot ({persona}) is thinking...")
                 live.refresh() # Force update status
                 
-                best_move = engine.get_best_move(board, depth=depth)
+                if ponder is not None:
+                    # Ponder hit: the search of this position ran on the user's time
+                    search = ponder
+                    ponder = None
+                else:
+                    search = engine.BackgroundSearch(board, depth=depth, stats=new_stats())
+                result = think(search, board, game_tui, f"Bot ({persona}) is thinking...")
+                best_move = result.move
+                if result.book:
+                    print(f"Book Move: {board.san(best_move)}")
                 
                 if best_move:
                     game_tui.add_move(board.san(best_move))
                     board.push(best_move)
                     
+                    # Ponder on the reply the search expects from the user
+                    if not board.is_game_over():
+                        expected = result.pv[1] if len(result.pv) > 1 else None
+                        ponder = engine.PonderSearch(board, expected, depth, stats=new_stats())
+                    
                     # Bot Move Comment
                     event = "BOT_MOVE"
                     if board.is_check(): event = "BOT_CHECK"
@@ -90,6 +146,10 @@ def main():
                 if user_input:
                     try:
                         move = board.parse_san(user_input)
+                        if ponder is not None and not ponder.hit(move):
+                            # Ponder miss, the table still holds what it searched
+                            ponder.cancel()
+                            ponder = None
                         game_tui.add_move(user_input)
                         board.push(move)
                         
@@ -106,14 +166,19 @@ def main():
                         continue
                 else:
                     if user_color is None:
-                        game_tui.set_status("Bot is thinking for you...")
-                        live.refresh()
-                        best_move = engine.get_best_move(board, depth=depth)
+                        search = engine.BackgroundSearch(board, depth=depth, stats=new_stats())
+                        best_move = think(search, board, game_tui, "Bot is thinking for you...").move
                         if best_move:
                             game_tui.add_move(board.san(best_move))
                             board.push(best_move)
                     else:
                         pass
+        
+        # The game ended or the user quit with a ponder search still running,
+        # e.g. after a ponder hit that mated or drew
+        if ponder is not None:
+            ponder.cancel()
+            ponder = None
                     
         result = board.result()
         game_tui.set_status(f"Game Over! Result: {result}")
@@ -0,0 +1,217 @@
+import sys
+import os
+import json
+import time
+import argparse
+import importlib
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import chess
+import chess.pgn
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.search as search
+import src.analysis as analysis
+
+# Batch analysis of PGN archives (see src/analysis.py).
+# Streams the games of the PGN files to a pool of worker processes and writes
+# one result per game, in input order, as JSON lines or as annotated PGN:
+#   python scripts/analyze.py games.pgn --depth 8 --output games.jsonl
+#   python scripts/analyze.py games.pgn --movetime 0.2 --output annotated.pgn
+#   python scripts/analyze.py games.pgn more.pgn --output games.jsonl --resume
+# Only a few games per worker are in flight at once, so memory stays flat
+# however large the archive. --resume counts the games already in the output
+# and skips as many input games, so give it the same files in the same order.
+
+MODEL_FILE = "model.json"
+
+# Games submitted ahead per worker, enough to keep every worker busy
+GAMES_IN_FLIGHT = 4
+
+
+def init_worker(engine_name, cache_file=None):
+    module = importlib.import_module("src." + engine_name)
+    if hasattr(module, "load_weights"):
+        # Keep stdout clean for the results
+        with contextlib.redirect_stdout(sys.stderr):
+            module.load_weights(MODEL_FILE)
+    search.set_cache(cache_file)
+
+
+def read_games(paths, skip=0):
+    # (path, number in the file, game) for every game of the files, after
+    # skipping the first `skip` games without parsing them
+    for path in paths:
+        with open(path) as f:
+            number = 0
+            while skip and chess.pgn.skip_game(f):
+                skip -= 1
+                number += 1
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                number += 1
+                yield path, number, game
+
+
+def completed_games(path, output_format):
+    # Games already in an output file. A JSON line cut off by an interruption
+    # is removed so appending continues cleanly.
+    if not os.path.exists(path):
+        return 0
+    if output_format == "pgn":
+        count = 0
+        with open(path) as f:
+            while chess.pgn.read_headers(f) is not None:
+                count += 1
+        return count
+    count = 0
+    end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            end += len(line)
+    if end != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(end)
+    return count
+
+
+def standard(game):
+    try:
+        board = game.board()
+    except ValueError:  # A broken FEN header
+        return False
+    return board.uci_variant == "chess" and not board.chess960
+
+
+def game_record(path, number, game, result, limits):
+    # The JSON result of one game, or the reason it couldn't be analyzed
+    record = {"source": path, "game": number, "headers": dict(game.headers)}
+    if result is None:
+        record["error"] = "not a standard chess game"
+        return record, None
+    board = game.board()
+    moves = [move for move in game.mainline_moves()]
+    positions = result["positions"]
+    records = analysis.judge_moves(board.fen(), moves, positions)
+    final = board.copy(stack=False)
+    for move in moves:
+        final.push(move)
+    record.update({
+        "limits": limits,
+        "summary": analysis.summarize(records, board.turn),
+        "moves": records,
+        "final": analysis.final_eval(final, positions[-1]["score"]),
+        "nodes": sum(position["nodes"] for position in positions),
+        "time": result["time"],
+    })
+    if game.errors:
+        record["error"] = "; ".join(str(error) for error in game.errors)
+    return record, records
+
+
+def write_game(out, output_format, path, number, game, result, limits, annotator):
+    record, records = game_record(path, number, game, result, limits)
+    if output_format == "pgn":
+        if records is not None:
+            analysis.annotate(game, result["positions"], records, annotator)
+        out.write(str(game) + "\n\n")
+    else:
+        out.write(json.dumps(record) + "\n")
+    out.flush()
+    return record
+
+
+def log_game(count, path, number, record):
+    # Progress line on stderr, returns the positions and nodes analyzed
+    if "summary" not in record:
+        print(f"Game {count} ({path} #{number}): skipped, {record['error']}", file=sys.stderr)
+        return 0, 0
+    summary = record["summary"]
+    print(
+        f"Game {count} ({path} #{number}): {record['headers'].get('White', '?')} vs {record['headers'].get('Black', '?')}, "
+        f"ACPL {summary['white']['acpl']:.0f}/{summary['black']['acpl']:.0f}, "
+        f"{len(record['moves'])} plies in {record['time']:.1f}s",
+        file=sys.stderr,
+    )
+    return len(record["moves"]) + 1, record["nodes"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze the games of PGN files: eval, best move and centipawn loss of every move.")
+    parser.add_argument("pgn", nargs="+", help="PGN files to analyze")
+    parser.add_argument("--output", default=None, help="Output file, .pgn for annotated PGN (default: JSON lines on stdout)")
+    parser.add_argument("--format", choices=["jsonl", "pgn"], default=None, help="Output format (default: from the output file name)")
+    parser.add_argument("--depth", type=int, default=None, help=f"Search depth per position (default {analysis.DEFAULT_DEPTH})")
+    parser.add_argument("--movetime", type=float, default=None, help="Seconds per position instead of a fixed depth")
+    parser.add_argument("--nodes", type=int, default=None, help="Nodes per position instead of a fixed depth")
+    parser.add_argument("--engine", default="engine", help="Module in src/, e.g. engine")
+    parser.add_argument("--concurrency", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--cache", default=None, help="Share search results through this analysis cache file")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run, appending to --output")
+    args = parser.parse_args()
+
+    output_format = args.format or ("pgn" if args.output and args.output.lower().endswith(".pgn") else "jsonl")
+    limits = {}
+    if args.movetime is not None:
+        limits["movetime"] = args.movetime
+    if args.nodes is not None:
+        limits["nodes"] = args.nodes
+    if args.depth is not None or not limits:
+        limits["depth"] = args.depth or analysis.DEFAULT_DEPTH
+    annotator = "RoastChess " + ", ".join(f"{name}={value}" for name, value in limits.items())
+
+    skip = 0
+    if args.resume:
+        if not args.output:
+            parser.error("--resume needs --output")
+        skip = completed_games(args.output, output_format)
+        print(f"Resuming after {skip} games", file=sys.stderr)
+    out = open(args.output, "a" if args.resume else "w") if args.output else sys.stdout
+
+    concurrency = args.concurrency or os.cpu_count() or 1
+    totals = [0, 0, 0]  # Games, positions, nodes
+    start = time.time()
+
+    def finish(path, number, game, future):
+        record = write_game(out, output_format, path, number, game, future and future.result(), limits, annotator)
+        totals[0] += 1
+        counts = log_game(skip + totals[0], path, number, record)
+        totals[1] += counts[0]
+        totals[2] += counts[1]
+
+    # Futures in input order, with at most GAMES_IN_FLIGHT games per worker
+    # waiting, so results are written in order as they finish
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=init_worker, initargs=(args.engine, args.cache)) as pool:
+        for index, (path, number, game) in enumerate(read_games(args.pgn, skip)):
+            future = None
+            if standard(game):
+                job = (index, game.board().fen(), [move.uci() for move in game.mainline_moves()], args.engine, limits)
+                future = pool.submit(analysis.analyze_game, job)
+            in_flight.append((path, number, game, future))
+            if len(in_flight) > concurrency * GAMES_IN_FLIGHT:
+                finish(*in_flight.popleft())
+        while in_flight:
+            finish(*in_flight.popleft())
+
+    if out is not sys.stdout:
+        out.close()
+    games, positions, nodes = totals
+    elapsed = time.time() - start
+    print(
+        f"Analyzed {games} games, {positions} positions in {elapsed:.1f}s "
+        f"({positions / elapsed if elapsed else 0:.1f} positions/s, {int(nodes / elapsed) if elapsed else 0} nodes/s)",
+        file=sys.stderr,
+    )
@@ -1,6 +1,8 @@
 import sys
 import os
 import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import chess
 import chess.pgn
 
@@ -9,6 +11,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import src.engine as engine
 import src.rival_engine as rival_engine
+import src.search as search
+from src.match import (
+    parse_time_control, describe_time_control, load_openings, play_game, paired_jobs,
+    first_player_score, game_to_pgn, record_game, elo_estimate, sprt_llr, sprt_bounds, percentile,
+)
+from src.dataset import DatasetWriter
+from src.stats import SearchStats
 
 def run_match(white_engine, black_engine, depth=3):
     board = chess.Board()
@@ -74,12 +83,124 @@ def run_match(white_engine, black_engine, depth=3):
     
     return board.result()
 
+# Tournament mode
+# Games are played in a process pool, two per opening with the colors
+# swapped, and the score is reported from engine 1's point of view.
+
+# Percentiles of the per-move think time in the report
+LATENCY_PERCENTILES = [50, 90, 99]
+
+def run_tournament(name1, name2, games, tc1, tc2, concurrency=None, openings_file=None, sprt=None, pgn_file=None, dataset_file=None, show_stats=False, cache_file=None):
+    # sprt: (elo0, elo1, alpha, beta) to stop as soon as the test decides
+    # dataset_file: position dataset the positions of every game are appended to
+    # show_stats: collect search statistics and report them per engine
+    # cache_file: analysis cache the workers share (see src/cache.py)
+    fens = load_openings(openings_file)
+    jobs = paired_jobs(name1, name2, games, fens, tc1, tc2, collect_stats=show_stats)
+
+    print(f"Tournament: {name1} ({describe_time_control(tc1)}) vs {name2} ({describe_time_control(tc2)}), {games} games, {len(fens)} openings")
+    wins = draws = losses = 0
+    latencies = ([], [])  # Think times of engine 1 and engine 2
+    search_stats = (SearchStats(), SearchStats())
+    finished = []
+    decision = None
+    if sprt is not None:
+        elo0, elo1, alpha, beta = sprt
+        lower, upper = sprt_bounds(alpha, beta)
+
+    writer = DatasetWriter(dataset_file) if dataset_file else None
+
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=search.set_cache, initargs=(cache_file,)) as pool:
+        futures = [pool.submit(play_game, job) for job in jobs]
+        for future in as_completed(futures):
+            game = future.result()
+            finished.append(game)
+            if writer is not None:
+                record_game(writer, game)
+            white, black = jobs[game["index"]][2]
+            first_is_white = game["index"] % 2 == 0
+            latencies[0].extend(game["latencies"][0 if first_is_white else 1])
+            latencies[1].extend(game["latencies"][1 if first_is_white else 0])
+            if game["stats"] is not None:
+                search_stats[0].merge(game["stats"][0 if first_is_white else 1])
+                search_stats[1].merge(game["stats"][1 if first_is_white else 0])
+            score = first_player_score(game)
+            if score == 1:
+                wins += 1
+            elif score == 0.5:
+                draws += 1
+            else:
+                losses += 1
+            line = f"Game {len(finished)}/{games}: {white} vs {black} {game['result']} ({game['termination']})  +{wins} ={draws} -{losses}"
+            if sprt is not None:
+                llr = sprt_llr(wins, draws, losses, elo0, elo1)
+                line += f"  LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]"
+                if llr >= upper:
+                    decision = f"H1 accepted: {name1} is at least {elo1:g} Elo stronger"
+                elif llr <= lower:
+                    decision = f"H0 accepted: {name1} is not {elo1:g} Elo stronger"
+            print(line)
+            if decision is not None:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    if writer is not None:
+        written = writer.flush()
+        print(f"Added {written} new positions to {dataset_file}")
+
+    total = wins + draws + losses
+    print("-" * 40)
+    if decision is not None:
+        print(f"SPRT stopped after {total} games. {decision}")
+    elo, margin = elo_estimate(wins, draws, losses)
+    print(f"Score of {name1} vs {name2}: +{wins} ={draws} -{losses} ({(wins + draws / 2) / total:.3f})")
+    print(f"Elo difference: {elo:.1f} +/- {margin:.1f}, draw rate {draws / total:.1%}")
+    for name, times in zip((name1, name2), latencies):
+        stats = ", ".join(f"p{pct} {percentile(times, pct) * 1000:.0f}ms" for pct in LATENCY_PERCENTILES)
+        print(f"{name} move time: {stats}, max {max(times, default=0) * 1000:.0f}ms over {len(times)} moves")
+    if show_stats:
+        for name, collected in zip((name1, name2), search_stats):
+            print(f"{name} search statistics:")
+            for line in collected.report():
+                print("  " + line)
+
+    if pgn_file:
+        with open(pgn_file, "w") as f:
+            for game in sorted(finished, key=lambda g: g["index"]):
+                f.write(str(game_to_pgn(game, jobs[game["index"]][2])) + "\n\n")
+
+    return {"wins": wins, "draws": draws, "losses": losses, "elo": elo, "margin": margin, "sprt": decision}
+
 if __name__ == "__main__":
-    # You can swap engines here to test fairness
-    # Match 1: Standard vs Rival
-    print("\n=== MATCH 1 ===")
-    run_match(engine, rival_engine, depth=2) # Lower depth for faster test
+    parser = argparse.ArgumentParser(description="Engine matches. Without --games, plays the two demo games.")
+    parser.add_argument("--games", type=int, help="Play a tournament of this many games")
+    parser.add_argument("--engine1", default="engine", help="Module in src/, e.g. engine")
+    parser.add_argument("--engine2", default="rival_engine")
+    parser.add_argument("--tc1", default="depth=3", help="depth=N, nodes=N, movetime=S or BASE+INC seconds")
+    parser.add_argument("--tc2", default=None, help="Defaults to --tc1")
+    parser.add_argument("--concurrency", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--openings", default=None, help="EPD/FEN or PGN file of start positions")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"), help="Stop early once the SPRT decides")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--pgn", default=None, help="Write the games to this PGN file")
+    parser.add_argument("--dataset", default=None, help="Append the positions of the games to this dataset")
+    parser.add_argument("--stats", action="store_true", help="Report search statistics (TT hits, cutoffs, branching factor)")
+    parser.add_argument("--cache", default=None, help="Share search results between games through this analysis cache file")
+    args = parser.parse_args()
+
+    if args.games:
+        tc1 = parse_time_control(args.tc1)
+        tc2 = parse_time_control(args.tc2 or args.tc1)
+        sprt = (args.sprt[0], args.sprt[1], args.alpha, args.beta) if args.sprt else None
+        run_tournament(args.engine1, args.engine2, args.games, tc1, tc2, args.concurrency, args.openings, sprt, args.pgn, args.dataset, args.stats, args.cache)
+    else:
+        # You can swap engines here to test fairness
+        # Match 1: Standard vs Rival
+        print("\n=== MATCH 1 ===")
+        run_match(engine, rival_engine, depth=2) # Lower depth for faster test
     
-    # Match 2: Rival vs Standard
-    print("\n=== MATCH 2 ===")
-    run_match(rival_engine, engine, depth=2)
+        # Match 2: Rival vs Standard
+        print("\n=== MATCH 2 ===")
+        run_match(rival_engine, engine, depth=2)
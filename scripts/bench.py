@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import time
+import argparse
+import importlib
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.bench as bench
+
+# Fixed-depth benchmark of the engines on the positions in src/bench.py.
+# Writes a JSON report and, given a baseline report, flags slowdowns:
+#   python scripts/bench.py --output baseline.json
+#   ... change the code ...
+#   python scripts/bench.py --baseline baseline.json
+# Exits with status 1 when an engine got slower than the threshold allows.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search a fixed position suite at a fixed depth and report nodes and speed.")
+    parser.add_argument("--engines", nargs="+", default=["engine", "rival_engine"], help="Modules in src/")
+    parser.add_argument("--depth", type=int, default=bench.DEFAULT_DEPTH)
+    parser.add_argument("--runs", type=int, default=1, help="Searches per position, the fastest counts")
+    parser.add_argument("--output", default=None, help="Write the report to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Slowdown in percent that counts as a regression")
+    parser.add_argument("--verbose", action="store_true", help="Print every position")
+    args = parser.parse_args()
+
+    report = {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "machine": bench.machine_info(), "engines": {}}
+    for name in args.engines:
+        module = importlib.import_module("src." + name)
+        print(f"Benchmarking {name} at depth {args.depth} on {len(bench.BENCH_POSITIONS)} positions...")
+        result = bench.run_bench(module, args.depth, runs=args.runs, log=print if args.verbose else None)
+        report["engines"][name] = result
+        ttd = ", ".join(f"d{d} {t:.2f}s" for d, t in result["time_to_depth"].items())
+        print(f"  Nodes: {result['nodes']}  Time: {result['time']:.2f}s  NPS: {result['nps']}  Signature: {result['signature']}")
+        print(f"  Time to depth: {ttd}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Saved report to {args.output}")
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("-" * 40)
+        print(f"Compared with {args.baseline} ({baseline.get('date', 'unknown date')}):")
+        for name, result in report["engines"].items():
+            if name not in baseline["engines"]:
+                print(f"{name}: not in the baseline")
+                continue
+            messages, slower = bench.compare(result, baseline["engines"][name], args.threshold / 100)
+            for message in messages:
+                print(message)
+            regressed |= slower
+        print("Performance regression!" if regressed else "No regression.")
+    sys.exit(1 if regressed else 0)
@@ -0,0 +1,18 @@
+import sys
+import os
+import time
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.bitbase as bitbase
+
+# Generates the KQK, KRK and KPK endgame bitbases the search probes.
+# Usage: python scripts/bitbases.py [directory]
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else bitbase.BITBASE_DIR
+    start = time.time()
+    print(f"Generating bitbases in {directory}...")
+    bitbase.generate_all(directory)
+    print(f"Done in {time.time() - start:.1f}s")
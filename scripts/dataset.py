@@ -0,0 +1,35 @@
+import sys
+import os
+import argparse
+import numpy as np
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.dataset as dataset
+
+# Builds and inspects binary position datasets (see src/dataset.py).
+# Usage: python scripts/dataset.py positions.bin games.pgn [more.pgn ...]
+#        python scripts/dataset.py positions.bin        (summary only)
+
+def summary(path):
+    records = dataset.open_dataset(path)
+    results = records["result"]
+    scores = records["score"]
+    print(f"{path}: {len(records)} positions, {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    for name, value in (("White wins", 1), ("Draws", 0), ("Black wins", -1), ("Unknown result", dataset.UNKNOWN_RESULT)):
+        print(f"  {name}: {int(np.count_nonzero(results == value))}")
+    print(f"  With search score: {int(np.count_nonzero(scores != dataset.UNKNOWN_SCORE))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add PGN games to a binary position dataset.")
+    parser.add_argument("dataset", help="Dataset file, created if missing")
+    parser.add_argument("pgn", nargs="*", help="PGN files to add")
+    parser.add_argument("--skip-plies", type=int, default=0, help="Opening plies of each game left out")
+    args = parser.parse_args()
+
+    if args.pgn:
+        writer = dataset.DatasetWriter(args.dataset)
+        for path in args.pgn:
+            dataset.add_pgn(writer, path, args.skip_plies)
+    summary(args.dataset)
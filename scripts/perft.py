@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import argparse
+import chess
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.position import Position, perft, divide
+
+# Perft: the number of leaf nodes of the legal move tree to a fixed depth.
+# Counts the tree with the search's Position and with python-chess and checks
+# both against each other (and the published counts for the suite below), then
+# reports the raw move generation speed of each:
+#   python scripts/perft.py
+#   python scripts/perft.py --fen "<fen>" --depth 4
+# On a mismatch the counts per root move are compared to point at the bug.
+
+# Well known perft positions with their counts at depth 1, 2, ...
+PERFT_POSITIONS = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890]),
+]
+
+
+def chess_perft(board, depth):
+    # The same count with python-chess, bulk counting at the last ply too
+    if depth <= 1:
+        return board.legal_moves.count() if depth == 1 else 1
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += chess_perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def chess_divide(board, depth):
+    counts = {}
+    for move in board.legal_moves:
+        board.push(move)
+        counts[move.uci()] = chess_perft(board, depth - 1)
+        board.pop()
+    return counts
+
+
+def show_divide(fen, depth):
+    # Root moves whose subtree counts differ between the two move generators
+    ours = divide(Position.from_board(chess.Board(fen)), depth)
+    theirs = chess_divide(chess.Board(fen), depth)
+    for uci in sorted(set(ours) | set(theirs)):
+        if ours.get(uci) != theirs.get(uci):
+            print(f"    {uci}: position {ours.get(uci, 'missing')}, python-chess {theirs.get(uci, 'missing')}")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    nodes = function(*args)
+    return nodes, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the search's move generator against python-chess and time both.")
+    parser.add_argument("--fen", default=None, help="Count this position instead of the suite")
+    parser.add_argument("--depth", type=int, default=None, help="Depth for --fen (default 4), or the maximum depth for the suite")
+    args = parser.parse_args()
+
+    if args.fen:
+        tests = [(args.fen, [None] * (args.depth or 4))]
+    else:
+        tests = [(fen, counts[:args.depth] if args.depth else counts) for fen, counts in PERFT_POSITIONS]
+
+    totals = {"position": [0, 0.0], "python-chess": [0, 0.0]}
+    failures = 0
+    for fen, counts in tests:
+        print(fen)
+        depth = len(counts)
+        expected = counts[-1]
+        nodes, seconds = timed(perft, Position.from_board(chess.Board(fen)), depth)
+        chess_nodes, chess_seconds = timed(chess_perft, chess.Board(fen), depth)
+        totals["position"][0] += nodes
+        totals["position"][1] += seconds
+        totals["python-chess"][0] += chess_nodes
+        totals["python-chess"][1] += chess_seconds
+
+        ok = nodes == chess_nodes and (expected is None or nodes == expected)
+        status = "ok" if ok else "MISMATCH"
+        print(f"  depth {depth}: {nodes} nodes in {seconds:.2f}s (python-chess {chess_nodes} in {chess_seconds:.2f}s) {status}")
+        if not ok:
+            failures += 1
+            if expected is not None and chess_nodes != expected:
+                print(f"    expected {expected}")
+            show_divide(fen, depth)
+
+    print("-" * 40)
+    for name, (nodes, seconds) in totals.items():
+        print(f"{name}: {nodes} nodes, {int(nodes / seconds) if seconds else 0} nodes/s")
+    if totals["position"][1] > 0 and totals["python-chess"][1] > 0:
+        print(f"Speedup: {totals['python-chess'][1] / totals['position'][1]:.2f}x")
+    print(f"{failures} mismatch(es)" if failures else "All counts match.")
+    sys.exit(1 if failures else 0)
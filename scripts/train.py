@@ -4,12 +4,18 @@ import json
 import random
 import time
 import copy
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import chess
 
 # Add parent directory to path to import src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import src.engine as engine
+import src.search as search
+from src.match import load_openings, unique_positions, paired_jobs, play_game, first_player_score, record_game, score_stats, elo_estimate
+from src.dataset import DatasetWriter
 
 MODEL_FILE = "model.json"
 
@@ -65,6 +71,7 @@ def main():
 
     print(f"Current Rating: {model.get('rating', 1000)}")
     print(f"Generation: {model.get('generation', 0)}")
+    engine.load_weights(MODEL_FILE) # Tuned piece-square tables, if any
     
     generations = 5 # Run 5 generations per execution
     
@@ -107,5 +114,168 @@ def main():
         model["generation"] = model.get("generation", 0) + 1
         save_model(MODEL_FILE, model)
 
+# Population mode
+# Every generation a population of mutants, each with all weights perturbed,
+# plays paired games against the current model from varied openings. All
+# games of the generation go to one process pool, so throughput scales with
+# the number of cores. The best of N mutants looks better than it is (it won
+# a contest of N noisy scores), so it first plays a confirmation match against
+# the model from openings it hasn't played, and replaces the model only when
+# that match beats 50% with 95% confidence. The rating moves by the Elo of the
+# confirmation match.
+
+# Relative mutation size, and the smallest step for weights near zero
+MUTATION_SIGMA = 0.1
+MUTATION_FLOOR = 20
+
+# One-sided 95% bound the confirmation score must clear
+CONFIRM_Z = 1.645
+# Random plies played from the openings for the confirmation games
+CONFIRM_PLIES = 2
+
+def mutate_all(weights, sigma=MUTATION_SIGMA):
+    new_weights = weights.copy()
+    for key, value in weights.items():
+        if key == "KING":
+            continue
+        new_value = round(value + random.gauss(0, sigma * max(abs(value), MUTATION_FLOOR / sigma)))
+        if new_value < 0 and key != "DRAW_PENALTY":
+            new_value = 0
+        new_weights[key] = new_value
+    return new_weights
+
+def run_generation(base_weights, population, games, depth, fens, pool, writer=None):
+    # Returns [(mutant weights, wins, draws, losses)] in population order.
+    # writer: optional DatasetWriter that collects the positions of the games
+    mutants = [mutate_all(base_weights) for _ in range(population)]
+    tc = {"depth": depth}
+    jobs = []
+    for m, mutant in enumerate(mutants):
+        jobs.extend(paired_jobs(("engine", mutant), ("engine", base_weights), games, fens, tc, tc, start_index=m * games))
+
+    results = play_jobs(jobs, games, population, pool, writer)
+    return [(mutant, *tally) for mutant, tally in zip(mutants, results)]
+
+def play_jobs(jobs, games, matches, pool, writer=None):
+    # [wins, draws, losses] of the first player of each match, the jobs of
+    # match m having the indices m * games to (m + 1) * games - 1
+    results = [[0, 0, 0] for _ in range(matches)]
+    for future in as_completed([pool.submit(play_game, job) for job in jobs]):
+        game = future.result()
+        if writer is not None:
+            record_game(writer, game)
+        score = first_player_score(game)
+        tally = results[game["index"] // games]
+        if score == 1:
+            tally[0] += 1
+        elif score == 0.5:
+            tally[1] += 1
+        else:
+            tally[2] += 1
+    return results
+
+def fresh_openings(fens, count, plies=CONFIRM_PLIES):
+    # Up to `count` start positions none of the games played from `fens`
+    # started from: the openings with a few random moves added. The searches
+    # are deterministic, so a replayed opening would only replay its game.
+    seen = set(unique_positions(fens))
+    fresh = []
+    for _ in range(count * 10):
+        board = chess.Board(random.choice(fens))
+        for _ in range(plies):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(random.choice(moves))
+        if board.is_game_over() or board.fen() in seen:
+            continue
+        seen.add(board.fen())
+        fresh.append(board.fen())
+        if len(fresh) == count:
+            break
+    return fresh
+
+def confirm_mutant(mutant, base_weights, games, depth, fens, pool, writer=None):
+    # Confirmation match of a selected mutant against the model from fresh
+    # openings, returns (wins, draws, losses)
+    tc = {"depth": depth}
+    jobs = paired_jobs(("engine", mutant), ("engine", base_weights), games, fresh_openings(fens, games // 2) or fens, tc, tc)
+    return tuple(play_jobs(jobs, games, 1, pool, writer)[0])
+
+def init_worker(cache_file=None):
+    engine.load_weights(MODEL_FILE)
+    search.set_cache(cache_file)
+
+def train_population(generations, population, games, depth, openings_file=None, concurrency=None, dataset_file=None, cache_file=None, confirm_games=None):
+    print("=== CHESS BOT GYM (population mode) ===")
+    model = load_model(MODEL_FILE)
+    if not model:
+        print("Error: model.json not found. Run engine.py first or create it.")
+        return
+    fens = load_openings(openings_file)
+    writer = DatasetWriter(dataset_file) if dataset_file else None
+    games += games % 2  # Whole pairs of games
+    confirm_games = confirm_games or games
+    confirm_games += confirm_games % 2
+    print(f"Population {population}, {games} games per mutant at depth {depth}, {len(fens)} openings")
+
+    # Workers play with the model's piece-square tables, only the weights are
+    # mutated. In the cache, results of the base weights carry over between
+    # generations until a mutant is adopted.
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=init_worker, initargs=(cache_file,)) as pool:
+        for _ in range(generations):
+            print(f"\n--- Generation {model.get('generation', 0) + 1} ---")
+            start = time.time()
+            results = run_generation(model["weights"], population, games, depth, fens, pool, writer)
+
+            best = None
+            for i, (mutant, wins, draws, losses) in enumerate(results):
+                score, variance = score_stats(wins, draws, losses)
+                elo, margin = elo_estimate(wins, draws, losses)
+                print(f"  Mutant {i + 1}: +{wins} ={draws} -{losses} ({score:.3f}, Elo {elo:.0f} +/- {margin:.0f})")
+                if best is None or score > best[2]:
+                    best = (i, mutant, score)
+
+            i, mutant, score = best
+            played = population * games
+            if score > 0.5:
+                wins, draws, losses = confirm_mutant(mutant, model["weights"], confirm_games, depth, fens, pool, writer)
+                played += wins + draws + losses
+                score, variance = score_stats(wins, draws, losses)
+                elo, margin = elo_estimate(wins, draws, losses)
+                print(f"  Confirmation of mutant {i + 1}: +{wins} ={draws} -{losses} ({score:.3f}, Elo {elo:.0f} +/- {margin:.0f})")
+            if writer is not None:
+                print(f"  Added {writer.flush()} new positions to {dataset_file}")
+            elapsed = time.time() - start
+            print(f"  {played} games in {elapsed:.1f}s ({played * 3600 / elapsed:.0f} games/hour)")
+
+            if score > 0.5 and score - CONFIRM_Z * math.sqrt(variance / (wins + draws + losses)) > 0.5:
+                print(f"  >>> MUTANT ADOPTED ({score:.3f}). Updating model.")
+                for key in mutant:
+                    if mutant[key] != model["weights"].get(key):
+                        print(f"  -> {key} {model['weights'].get(key)} -> {mutant[key]}")
+                model["weights"] = mutant
+                model["rating"] = model.get("rating", 1000) + round(elo)
+            else:
+                print(f"  >>> No mutant clearly better ({score:.3f}). Keeping base.")
+
+            model["generation"] = model.get("generation", 0) + 1
+            save_model(MODEL_FILE, model)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Evolve the engine weights. Without --population, runs the classic single-mutant gym.")
+    parser.add_argument("--population", type=int, help="Mutants per generation")
+    parser.add_argument("--games", type=int, default=16, help="Games per mutant against the model (paired)")
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=2, help="Search depth of the population games")
+    parser.add_argument("--confirm", type=int, default=None, help="Games of the confirmation match of the best mutant (default: --games)")
+    parser.add_argument("--openings", default=None, help="EPD/FEN or PGN file of start positions")
+    parser.add_argument("--concurrency", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dataset", default=None, help="Append the positions of the population games to this dataset")
+    parser.add_argument("--cache", default=None, help="Share search results between games through this analysis cache file")
+    args = parser.parse_args()
+
+    if args.population:
+        train_population(args.generations, args.population, args.games, args.depth, args.openings, args.concurrency, args.dataset, args.cache, args.confirm)
+    else:
+        main()
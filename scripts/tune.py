@@ -0,0 +1,263 @@
+import sys
+import os
+import re
+import json
+import time
+import math
+import argparse
+import numpy as np
+import chess
+import chess.pgn
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.engine as engine
+import src.dataset as dataset
+from src.batch_eval import plane, pack_bitboards, unpack_bitboards, endgame_mask
+
+# Texel tuning
+# The evaluation is linear in its parameters (material values and
+# piece-square tables), so a position set becomes one int8 feature matrix X
+# and eval = X @ params. The tuner minimizes the mean squared error between
+# the game result and sigmoid(K * eval), with K fitted to the starting
+# parameters, using analytic gradients and Adam. The tuned values and tables
+# are written to model.json, where engine.load_weights picks them up.
+
+MODEL_FILE = "model.json"
+
+# Material values tuned, the king's is a constant that cancels out
+TUNED_PIECES = ["PAWN", "KNIGHT", "BISHOP", "ROOK", "QUEEN"]
+TABLE_OFFSET = len(TUNED_PIECES)
+PARAMS = TABLE_OFFSET + 64 * len(engine.TABLE_NAMES)
+
+# Table square used for a black piece on each square
+MIRROR = np.array([chess.square_mirror(square) for square in chess.SQUARES])
+
+# Rows converted from bitboards to features at a time
+CHUNK_ROWS = 65536
+
+RESULTS = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}
+RESULT_PATTERN = re.compile(r'(1-0|0-1|1/2-1/2)|\[([01](?:\.\d+)?)\]')
+
+def table_slice(name):
+    start = TABLE_OFFSET + 64 * engine.TABLE_NAMES.index(name)
+    return slice(start, start + 64)
+
+# Positions
+
+def load_epd(path):
+    # One position per line with its result from White's side, e.g.
+    #   <fen> c9 "1-0";   or   <fen> [0.5]
+    boards = []
+    results = []
+    with open(path) as f:
+        for line in f:
+            match = RESULT_PATTERN.search(line)
+            if not match:
+                continue
+            result = RESULTS[match.group(1)] if match.group(1) else float(match.group(2))
+            fields = line.split()
+            boards.append(chess.Board(" ".join(fields[:4]) + " 0 1"))
+            results.append(result)
+    return boards, results
+
+def load_pgn(path, skip_plies=8):
+    # Quiet positions of finished games, labelled with the game result. The
+    # opening and positions in check or right after a capture are skipped.
+    boards = []
+    results = []
+    with open(path) as f:
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            result = RESULTS.get(game.headers.get("Result"))
+            if result is None:
+                continue
+            board = game.board()
+            for ply, move in enumerate(game.mainline_moves()):
+                noisy = board.is_capture(move) or move.promotion
+                board.push(move)
+                if ply + 1 < skip_plies or noisy or board.is_check() or board.is_game_over():
+                    continue
+                boards.append(board.copy(stack=False))
+                results.append(result)
+    return boards, results
+
+def load_dataset(path, sample=None):
+    # Positions of a binary dataset (see src/dataset.py) with a known result,
+    # optionally a random sample of them
+    records = dataset.open_dataset(path)
+    if sample is not None:
+        records = dataset.sample(records, sample)
+    labels = dataset.result_scores(records)
+    known = ~np.isnan(labels)
+    return dataset.to_bitboards(np.asarray(records)[known]), labels[known]
+
+def load_positions(paths, skip_plies=8, sample=None):
+    bitboards = []
+    results = []
+    for path in paths:
+        if path.lower().endswith(".bin"):
+            boards, labels = load_dataset(path, sample)
+            bitboards.append(boards)
+        else:
+            if path.lower().endswith(".pgn"):
+                boards, labels = load_pgn(path, skip_plies)
+            else:
+                boards, labels = load_epd(path)
+            bitboards.append(pack_bitboards(boards))
+        results.extend(labels)
+        print(f"{path}: {len(labels)} positions")
+    return np.concatenate(bitboards), np.array(results, dtype=np.float64)
+
+# Features and parameters
+
+def features(bitboards):
+    # (N, 12) bitboards -> (N, PARAMS) int8 feature counts, White minus Black
+    rows = len(bitboards)
+    X = np.zeros((rows, PARAMS), dtype=np.int8)
+    for start in range(0, rows, CHUNK_ROWS):
+        planes = unpack_bitboards(bitboards[start:start + CHUNK_ROWS]).astype(np.int8)
+        chunk = X[start:start + CHUNK_ROWS]
+        endgame = endgame_mask(planes)
+        for i, name in enumerate(TUNED_PIECES):
+            piece_type = i + 1
+            counts = planes[:, plane(chess.WHITE, piece_type)] - planes[:, plane(chess.BLACK, piece_type)][:, MIRROR]
+            chunk[:, i] = counts.sum(axis=1)
+            chunk[:, table_slice(name)] = counts
+        kings = planes[:, plane(chess.WHITE, chess.KING)] - planes[:, plane(chess.BLACK, chess.KING)][:, MIRROR]
+        chunk[~endgame, table_slice("KING_MID")] = kings[~endgame]
+        chunk[endgame, table_slice("KING_END")] = kings[endgame]
+    return X
+
+def initial_params(weights, tables):
+    params = np.zeros(PARAMS)
+    for i, name in enumerate(TUNED_PIECES):
+        params[i] = weights.get(name, 0)
+    for name in engine.TABLE_NAMES:
+        params[table_slice(name)] = tables[name]
+    return params
+
+def normalize(params):
+    # A constant added to every square of a table and taken off the piece's
+    # value leaves the evaluation unchanged; keep the tables centred so the
+    # values stay readable. Pawns only ever stand on ranks 2-7.
+    params = params.copy()
+    for i, name in enumerate(TUNED_PIECES):
+        table = params[table_slice(name)]
+        used = table[8:56] if name == "PAWN" else table
+        shift = used.mean()
+        params[i] += shift
+        params[table_slice(name)] = table - shift
+    return params
+
+def to_model(params):
+    weights = {name: int(round(params[i])) for i, name in enumerate(TUNED_PIECES)}
+    tables = {name: [int(round(v)) for v in params[table_slice(name)]] for name in engine.TABLE_NAMES}
+    return weights, tables
+
+# Error and gradient
+
+def evaluate(X, params):
+    scores = np.empty(len(X))
+    for start in range(0, len(X), CHUNK_ROWS):
+        scores[start:start + CHUNK_ROWS] = X[start:start + CHUNK_ROWS].astype(np.float64) @ params
+    return scores
+
+def sigmoid(scores, k):
+    return 1 / (1 + np.power(10.0, -k * scores / 400))
+
+def error(X, results, params, k):
+    return float(np.mean((results - sigmoid(evaluate(X, params), k)) ** 2))
+
+def gradient(X, results, params, k):
+    # d/dparams of mean((r - s)^2) with s = sigmoid(k * X @ params)
+    grad = np.zeros(PARAMS)
+    total_error = 0.0
+    scale = k * math.log(10) / 400
+    for start in range(0, len(X), CHUNK_ROWS):
+        chunk = X[start:start + CHUNK_ROWS].astype(np.float64)
+        s = sigmoid(chunk @ params, k)
+        residual = results[start:start + CHUNK_ROWS] - s
+        total_error += float(residual @ residual)
+        grad += chunk.T @ (-2 * residual * s * (1 - s) * scale)
+    return grad / len(X), total_error / len(X)
+
+def fit_k(X, results, params, low=0.05, high=5.0, iterations=40):
+    # Golden-section search for the scaling constant of the sigmoid
+    ratio = (math.sqrt(5) - 1) / 2
+    a, b = low, high
+    for _ in range(iterations):
+        c = b - ratio * (b - a)
+        d = a + ratio * (b - a)
+        if error(X, results, params, c) < error(X, results, params, d):
+            b = d
+        else:
+            a = c
+    return (a + b) / 2
+
+def tune(X, results, params, k, epochs=200, learning_rate=1.0, report=10):
+    # Adam on the full position set
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    m = np.zeros(PARAMS)
+    v = np.zeros(PARAMS)
+    for epoch in range(1, epochs + 1):
+        grad, current = gradient(X, results, params, k)
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad * grad
+        m_hat = m / (1 - beta1 ** epoch)
+        v_hat = v / (1 - beta2 ** epoch)
+        params = params - learning_rate * m_hat / (np.sqrt(v_hat) + epsilon)
+        if epoch % report == 0 or epoch == 1:
+            print(f"Epoch {epoch}: error {current:.6f}")
+    return params
+
+def main():
+    parser = argparse.ArgumentParser(description="Texel tuning of the material values and piece-square tables.")
+    parser.add_argument("positions", nargs="+", help="EPD files with results, PGN files of finished games or .bin datasets")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=1.0, help="Adam step size in centipawns")
+    parser.add_argument("--k", type=float, default=None, help="Sigmoid scale (fitted when not given)")
+    parser.add_argument("--skip-plies", type=int, default=8, help="Opening plies skipped in PGN games")
+    parser.add_argument("--sample", type=int, default=None, help="Positions sampled at random from each .bin dataset")
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--dry-run", action="store_true", help="Don't write the model")
+    args = parser.parse_args()
+
+    engine.load_weights(args.model)
+    bitboards, results = load_positions(args.positions, args.skip_plies, args.sample)
+    if len(results) == 0:
+        print("No positions found.")
+        return
+    start = time.time()
+    X = features(bitboards)
+    print(f"{len(results)} positions, {PARAMS} parameters, features built in {time.time() - start:.1f}s")
+
+    params = initial_params(engine.CURRENT_WEIGHTS, engine.CURRENT_TABLES)
+    k = args.k if args.k is not None else fit_k(X, results, params)
+    print(f"K = {k:.4f}, starting error {error(X, results, params, k):.6f}")
+
+    start = time.time()
+    params = normalize(tune(X, results, params, k, args.epochs, args.lr))
+    print(f"Final error {error(X, results, params, k):.6f} after {time.time() - start:.1f}s")
+
+    weights, tables = to_model(params)
+    for name in TUNED_PIECES:
+        print(f"  {name}: {engine.CURRENT_WEIGHTS.get(name)} -> {weights[name]}")
+    if args.dry_run:
+        return
+
+    model = {"weights": dict(engine.DEFAULT_WEIGHTS), "rating": 1000, "generation": 0}
+    if os.path.exists(args.model):
+        with open(args.model) as f:
+            model = json.load(f)
+    model["weights"] = {**model.get("weights", engine.DEFAULT_WEIGHTS), **weights}
+    model["tables"] = tables
+    with open(args.model, "w") as f:
+        json.dump(model, f, indent=4)
+    print(f"Saved tuned weights and tables to {args.model}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import sys
+import os
+import threading
+import contextlib
+import chess
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.engine as engine
+import src.search as search
+import src.openings as openings
+import src.bench as bench
+from src.position import Position, divide
+from src.limits import MAX_DEPTH
+
+# Universal Chess Interface front-end.
+# Reads commands on stdin and answers on stdout, so the engine can run under
+# any UCI match manager or GUI. Searches run on a worker thread, which keeps
+# the command loop free to answer `stop` and `isready` at once.
+
+ENGINE_NAME = "RoastChess"
+ENGINE_AUTHOR = "RoastChess contributors"
+
+MODEL_FILE = "model.json"
+
+# UCI times are in milliseconds, the engine works in seconds
+MS = 1000.0
+
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = chess.Board()
+        self.own_book = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, commands=sys.stdin):
+        for line in commands:
+            line = line.strip()
+            try:
+                if not self.handle(line):
+                    break
+            except ValueError as e:
+                # Bad numbers, FENs or moves: ignore the command, keep running
+                self.send(f"info string ignored invalid command: {line} ({e})")
+        self.stop_search()
+
+    def handle(self, line):
+        # Returns False when the engine should exit
+        if not line:
+            return True
+        command, _, args = line.partition(" ")
+
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {search.TT_SIZE_MB} min 1 max 4096")
+            self.send(f"option name Threads type spin default {search.THREADS} min 1 max 64")
+            self.send("option name OwnBook type check default false")
+            self.send(f"option name BookFile type string default {openings.BOOK_FILE}")
+            self.send("option name CacheFile type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.set_option(args)
+        elif command == "ucinewgame":
+            self.stop_search()
+            engine.SEARCHER.clear()
+            self.board = chess.Board()
+        elif command == "position":
+            self.stop_search()
+            self.set_position(args)
+        elif command == "go":
+            self.stop_search()
+            self.go(args)
+        elif command == "stop":
+            self.stop_search()
+        elif command == "bench":
+            # Non-standard, like other engines: bench [depth]
+            self.stop_search()
+            result = bench.run_bench(engine, int(args) if args.strip() else bench.DEFAULT_DEPTH)
+            engine.SEARCHER.clear()
+            self.send(f"Nodes searched: {result['nodes']}")
+            self.send(f"Nodes/second: {result['nps']}")
+        elif command == "quit":
+            return False
+        return True
+
+    def set_option(self, args):
+        # setoption name <id> [value <x>]
+        tokens = args.split()
+        if "name" not in tokens:
+            return
+        name_end = tokens.index("value") if "value" in tokens else len(tokens)
+        name = " ".join(tokens[tokens.index("name") + 1:name_end]).lower()
+        value = " ".join(tokens[name_end + 1:])
+
+        self.stop_search()
+        try:
+            if name == "hash":
+                search.set_hash_size(max(1, int(value)))
+            elif name == "threads":
+                search.set_threads(max(1, int(value)))
+            elif name == "ownbook":
+                self.own_book = value.lower() == "true"
+            elif name == "bookfile":
+                openings.set_book(value or None)
+            elif name == "cachefile":
+                search.set_cache(value if value and value != "<empty>" else None)
+        except ValueError:
+            self.send(f"info string invalid value for {name}: {value}")
+
+    def set_position(self, args):
+        tokens = args.split()
+        if not tokens:
+            return
+        if tokens[0] == "startpos":
+            board = chess.Board()
+            rest = tokens[1:]
+        elif tokens[0] == "fen":
+            fen_end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            board = chess.Board(" ".join(tokens[1:fen_end]))
+            rest = tokens[fen_end:]
+        else:
+            return
+        if rest and rest[0] == "moves":
+            for uci in rest[1:]:
+                board.push_uci(uci)
+        self.board = board
+
+    def parse_limits(self, args):
+        tokens = args.split()
+        params = {}
+        infinite = False
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token == "infinite":
+                infinite = True
+            elif token in ("wtime", "btime", "winc", "binc", "movetime", "depth", "nodes", "movestogo") and i + 1 < len(tokens):
+                params[token] = int(tokens[i + 1])
+                i += 1
+            i += 1
+
+        us = "w" if self.board.turn == chess.WHITE else "b"
+        movetime = params.get("movetime")
+        clock = params.get(us + "time")
+        depth = params.get("depth")
+        if depth is None and movetime is None and clock is None and "nodes" not in params:
+            infinite = True  # A bare "go" searches until "stop"
+        if infinite:
+            depth = MAX_DEPTH
+        limits = {
+            "depth": depth,
+            "movetime": None if movetime is None else movetime / MS,
+            "clock": None if clock is None else clock / MS,
+            "increment": params.get(us + "inc", 0) / MS,
+            "nodes": params.get("nodes"),
+        }
+        return limits, infinite
+
+    def go(self, args):
+        if args.startswith("perft"):
+            # Non-standard, like other engines: go perft <depth>
+            self.perft(max(1, int(args.split()[1])) if len(args.split()) > 1 else 1)
+            return
+        limits, infinite = self.parse_limits(args)
+        self.stop_event.clear()
+        board = self.board.copy()
+        self.thread = threading.Thread(target=self.search, args=(board, limits, infinite), daemon=True)
+        self.thread.start()
+
+    def search(self, board, limits, infinite):
+        result = engine.search_position(
+            board,
+            depth=limits["depth"],
+            movetime=limits["movetime"],
+            clock=limits["clock"],
+            increment=limits["increment"],
+            nodes=limits["nodes"],
+            on_info=self.send_info,
+            stop=self.stop_event,
+            use_book=self.own_book,
+        )
+        if infinite:
+            # In infinite mode the best move may only be sent after "stop"
+            self.stop_event.wait()
+        if result.move is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {result.move.uci()} ponder {result.pv[1].uci()}")
+        else:
+            self.send(f"bestmove {result.move.uci()}")
+
+    def perft(self, depth):
+        counts = divide(Position.from_board(self.board), depth)
+        for uci, nodes in counts.items():
+            self.send(f"{uci}: {nodes}")
+        self.send("")
+        self.send(f"Nodes searched: {sum(counts.values())}")
+
+    def send_info(self, info):
+        if info["mate"] is not None:
+            score = f"mate {info['mate']}"
+        else:
+            score = f"cp {info['score']}"
+        pv = " ".join(move.uci() for move in info["pv"])
+        self.send(
+            f"info depth {info['depth']} seldepth {info['seldepth']} score {score} "
+            f"nodes {info['nodes']} nps {info['nps']} time {int(info['time'] * MS)} "
+            f"hashfull {search.TRANSPOSITION_TABLE.hashfull()} pv {pv}"
+        )
+
+    def stop_search(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.stop_event.clear()
+
+
+def main():
+    # Keep stdout clean for the protocol
+    with contextlib.redirect_stdout(sys.stderr):
+        engine.load_weights(MODEL_FILE)
+    UciEngine().run()
+
+
+if __name__ == "__main__":
+    main()
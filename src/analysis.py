@@ -0,0 +1,162 @@
+import time
+import importlib
+
+import chess
+import chess.engine
+import chess.pgn
+
+import src.search as search
+from src.evaluation import MATE_SCORE
+
+# Batch game analysis
+# analyze_game() searches every position of a game with fixed limits, and
+# judge_moves() rates each move by its centipawn loss: how much the eval of
+# the side that moved dropped compared to the engine's eval before the move.
+# Games are analyzed in worker processes like match.play_game(), so jobs and
+# results are plain picklable data; turning the results into JSON records
+# and annotated PGN happens in the parent.
+
+DEFAULT_DEPTH = 6
+
+# Evals are capped here for the loss, so missing a mate costs at most this much
+CP_CAP = 1000
+
+# Losses from which a move counts as an inaccuracy, a mistake and a blunder,
+# with their PGN annotation glyphs
+JUDGMENTS = [
+    (300, "blunder", chess.pgn.NAG_BLUNDER),
+    (100, "mistake", chess.pgn.NAG_MISTAKE),
+    (50, "inaccuracy", chess.pgn.NAG_DUBIOUS_MOVE),
+]
+
+
+def analyze_position(module, board, limits):
+    # The engine's eval of `board` from the side to move and its best line
+    outcome = board.outcome()
+    if outcome is not None:
+        score = -MATE_SCORE if outcome.termination == chess.Termination.CHECKMATE else 0
+        return {"score": score, "pv": [], "depth": 0, "nodes": 0}
+    result = module.search_position(board, use_book=False, **limits)
+    return {"score": result.score, "pv": [move.uci() for move in result.pv], "depth": result.depth, "nodes": result.nodes}
+
+
+def analyze_game(job):
+    # job: (index, fen, moves, engine, limits) with the moves in UCI, an engine
+    # module name in src/ and search_position() limits (depth, movetime, nodes).
+    # Returns the analysis of every position, before each move and after the last.
+    index, fen, moves, engine_name, limits = job
+    module = importlib.import_module("src." + engine_name)
+    # Every game starts from an empty table and fresh move ordering, so its
+    # analysis doesn't depend on which worker got it
+    module.SEARCHER.clear()
+
+    start = time.time()
+    board = chess.Board(fen)
+    positions = []
+    for uci in moves + [None]:
+        positions.append(analyze_position(module, board, limits))
+        if uci is not None:
+            board.push_uci(uci)
+    search.flush_cache()  # Exit handlers don't run in pool workers
+    return {"index": index, "positions": positions, "time": time.time() - start}
+
+
+def capped(score):
+    return max(-CP_CAP, min(CP_CAP, score))
+
+
+def judgment(loss):
+    # (name, NAG) of a move losing `loss` centipawns, (None, None) for a fine move
+    for threshold, name, nag in JUDGMENTS:
+        if loss >= threshold:
+            return name, nag
+    return None, None
+
+
+def white_eval(score, turn):
+    # (centipawns, moves to mate) from White's side, one of them None
+    if turn == chess.BLACK:
+        score = -score
+    mate = search.mate_in(score)
+    return (None, mate) if mate is not None else (score, None)
+
+
+def final_eval(board, score):
+    # Eval of the final position from White's side, with the game result. A
+    # mate is 0 moves away for either side, the result tells who gave it.
+    cp, mate = white_eval(score, board.turn)
+    outcome = board.outcome(claim_draw=True)
+    return {"eval": cp, "mate": mate, "result": outcome.result() if outcome is not None else "*"}
+
+
+def judge_moves(fen, moves, positions):
+    # A record per move: the eval before it (White's side), the engine's best
+    # move and the centipawn loss of the move played
+    board = chess.Board(fen)
+    records = []
+    for ply, move in enumerate(moves):
+        before, after = positions[ply], positions[ply + 1]
+        best = chess.Move.from_uci(before["pv"][0]) if before["pv"] else None
+        # The score after the move is the opponent's
+        loss = 0 if move == best else max(0, capped(before["score"]) + capped(after["score"]))
+        name, _ = judgment(loss)
+        cp, mate = white_eval(before["score"], board.turn)
+        records.append({
+            "ply": ply + 1,
+            "move": board.san(move),
+            "uci": move.uci(),
+            "eval": cp,
+            "mate": mate,
+            "best": best.uci() if best else None,
+            "best_san": board.san(best) if best else None,
+            "cp_loss": loss,
+            "judgment": name,
+            "depth": before["depth"],
+        })
+        board.push(move)
+    return records
+
+
+def summarize(records, first_turn=chess.WHITE):
+    # Average centipawn loss and judgment counts of each side
+    summary = {}
+    for color, name in ((chess.WHITE, "white"), (chess.BLACK, "black")):
+        # Records alternate sides, starting with the side to move at the start
+        offset = 0 if color == first_turn else 1
+        own = records[offset::2]
+        counts = {judged: 0 for _, judged, _ in JUDGMENTS}
+        for record in own:
+            if record["judgment"] is not None:
+                counts[record["judgment"]] += 1
+        summary[name] = {
+            "moves": len(own),
+            "acpl": sum(record["cp_loss"] for record in own) / len(own) if own else 0.0,
+            **counts,
+        }
+    return summary
+
+
+def pov_score(score, turn):
+    mate = search.mate_in(score)
+    return chess.engine.PovScore(chess.engine.Mate(mate) if mate is not None else chess.engine.Cp(score), turn)
+
+
+def annotate(game, positions, records, annotator=None):
+    # Adds the analysis to a chess.pgn.Game in place: an [%eval] comment after
+    # every move, a glyph on inaccuracies, mistakes and blunders and the best
+    # move as a variation of those
+    if annotator:
+        game.headers["Annotator"] = annotator
+    node = game
+    turn = game.turn()
+    for record, before, after in zip(records, positions, positions[1:]):
+        parent = node
+        node = parent.variation(0)
+        node.set_eval(pov_score(after["score"], not turn), after["depth"] or None)
+        if record["judgment"] is not None:
+            node.nags.add(judgment(record["cp_loss"])[1])
+            if record["best"]:
+                best = parent.add_variation(chess.Move.from_uci(record["best"]))
+                best.set_eval(pov_score(before["score"], turn), before["depth"] or None)
+        turn = not turn
+    return game
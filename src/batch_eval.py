@@ -0,0 +1,137 @@
+import chess
+import numpy as np
+
+import src.engine as engine
+from src.evaluation import Evaluator
+
+# Batched evaluation with NumPy
+# Positions are encoded as (N, 12, 64) piece planes, plane = piece type - 1
+# for White and 6 + piece type - 1 for Black. The compiled material + PST
+# scores of an Evaluator become a (12 * 64,) weight vector per game phase, so
+# scoring a whole batch is one matrix-vector product. Scores are from White's
+# point of view and cover material and piece-square terms only, without the
+# mate and draw rules of evaluate_board.
+
+PLANES = 12
+
+# Rows converted to integer features at a time, bounds the temporary memory
+CHUNK_ROWS = 16384
+
+
+def plane(color, piece_type):
+    return piece_type - 1 + (0 if color == chess.WHITE else 6)
+
+
+def encode_board(board, out=None):
+    if out is None:
+        out = np.zeros((PLANES, 64), dtype=np.uint8)
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                out[plane(color, piece_type), square] = 1
+    return out
+
+
+def encode_boards(boards):
+    boards = list(boards)
+    planes = np.zeros((len(boards), PLANES, 64), dtype=np.uint8)
+    for i, board in enumerate(boards):
+        encode_board(board, planes[i])
+    return planes
+
+
+def board_bitboards(board):
+    # The 12 piece bitboards of a board, in plane order
+    return [board.pieces_mask(piece_type, color) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+
+
+def pack_bitboards(boards):
+    return np.array([board_bitboards(board) for board in boards], dtype=np.uint64).reshape(-1, PLANES)
+
+
+def unpack_bitboards(bitboards):
+    # (N, 12) uint64 bitboards -> (N, 12, 64) planes, bit i is square i
+    bitboards = np.ascontiguousarray(bitboards, dtype="<u8").reshape(-1, PLANES)
+    bits = np.unpackbits(bitboards.view(np.uint8), bitorder="little")
+    return bits.reshape(-1, PLANES, 64)
+
+
+def to_planes(boards_or_bitboards):
+    if isinstance(boards_or_bitboards, np.ndarray):
+        if boards_or_bitboards.ndim == 3:
+            return boards_or_bitboards
+        return unpack_bitboards(boards_or_bitboards)
+    return encode_boards(boards_or_bitboards)
+
+
+def compile_weights(weights=None):
+    # weights: a weights dict (None for the current model) or an Evaluator.
+    # Returns the (mg, eg) weight vectors of shape (12 * 64,).
+    evaluator = weights if isinstance(weights, Evaluator) else engine.evaluator_for(weights)
+    mg = np.zeros((PLANES, 64), dtype=np.int64)
+    eg = np.zeros((PLANES, 64), dtype=np.int64)
+    for color in chess.COLORS:
+        for piece_type in chess.PIECE_TYPES:
+            base = (color * 7 + piece_type) * 64
+            mg[plane(color, piece_type)] = evaluator.mg[base:base + 64]
+            eg[plane(color, piece_type)] = evaluator.eg[base:base + 64]
+    return mg.reshape(-1), eg.reshape(-1)
+
+
+def endgame_mask(planes):
+    # Same phase rule as evaluation.is_endgame, per row
+    counts = planes.sum(axis=2, dtype=np.int64)
+    white_queens = counts[:, plane(chess.WHITE, chess.QUEEN)]
+    black_queens = counts[:, plane(chess.BLACK, chess.QUEEN)]
+    minors = counts[:, [plane(color, piece_type) for color in chess.COLORS for piece_type in (chess.KNIGHT, chess.BISHOP)]].sum(axis=1)
+    no_queens = (white_queens == 0) & (black_queens == 0)
+    light_queens = (white_queens == 1) & (black_queens == 1) & (minors <= 4)
+    return no_queens | light_queens
+
+
+def evaluate_batch(boards_or_bitboards, weights=None):
+    # boards_or_bitboards: chess.Board objects, an (N, 12, 64) plane array or
+    # an (N, 12) uint64 bitboard array.
+    # weights: one weights dict / Evaluator for every row, or a sequence of
+    # them with one entry per row.
+    source = boards_or_bitboards
+    if not isinstance(source, np.ndarray):
+        source = list(source)
+    rows = len(source)
+    if weights is None or isinstance(weights, (dict, Evaluator)):
+        weights = [weights]
+        row_sets = np.zeros(rows, dtype=np.int64)
+    else:
+        if len(weights) != rows:
+            raise ValueError("Need one weight set per position")
+        row_sets = None
+
+    # Compile each distinct weight set once
+    compiled = []
+    seen = {}
+    set_index = np.empty(len(weights), dtype=np.int64)
+    for i, row_weights in enumerate(weights):
+        cache_key = id(row_weights)
+        if cache_key not in seen:
+            seen[cache_key] = len(compiled)
+            compiled.append(compile_weights(row_weights))
+        set_index[i] = seen[cache_key]
+    if row_sets is None:
+        row_sets = set_index
+    mg_table = np.stack([mg for mg, _ in compiled]).astype(np.int32)
+    eg_table = np.stack([eg for _, eg in compiled]).astype(np.int32)
+
+    scores = np.empty(rows, dtype=np.int64)
+    for start in range(0, rows, CHUNK_ROWS):
+        # Bitboards and boards are expanded chunk by chunk, never the whole batch
+        chunk = to_planes(source[start:start + CHUNK_ROWS])
+        features = chunk.reshape(len(chunk), -1).astype(np.int32)
+        sets = row_sets[start:start + CHUNK_ROWS]
+        if len(compiled) == 1:
+            mg_scores = features @ mg_table[0]
+            eg_scores = features @ eg_table[0]
+        else:
+            mg_scores = np.einsum("nk,nk->n", features, mg_table[sets])
+            eg_scores = np.einsum("nk,nk->n", features, eg_table[sets])
+        scores[start:start + CHUNK_ROWS] = np.where(endgame_mask(chunk), eg_scores, mg_scores)
+    return scores
@@ -0,0 +1,170 @@
+import platform
+
+import chess
+
+import src.search as search
+
+# Fixed-depth benchmark
+# Searches a fixed suite of positions with an engine module starting from an
+# empty table and fresh move ordering every time, so the node counts depend
+# only on the search and evaluation code (the analysis cache is off while it
+# runs). Their total is the bench signature:
+# it changes when a change alters the search, and stays the same for pure
+# speed-ups, which then show up in the nodes per second.
+
+DEFAULT_DEPTH = 4
+
+BENCH_POSITIONS = [
+    # Openings
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2",
+    "rnbqkb1r/pppp1ppp/5n2/4p3/2B1P3/8/PPPP1PPP/RNBQK1NR w KQkq - 2 3",
+    "rnbqkb1r/ppp1pppp/5n2/3p4/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 1 3",
+    "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "rnbqkb1r/pp2pppp/3p1n2/8/3NP3/8/PPP2PPP/RNBQKB1R w KQkq - 1 5",
+    "rnbqk2r/ppppppbp/5np1/8/2PP4/2N5/PP2PPPP/R1BQKBNR w KQkq - 2 4",
+    "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/2P2N2/PP1P1PPP/RNBQK2R w KQkq - 1 5",
+    "rnbqkbnr/pp3ppp/4p3/2ppP3/3P4/8/PPP2PPP/RNBQKBNR w KQkq c6 0 4",
+    "rnbqkb1r/pp3ppp/4pn2/2pp4/2PP4/2N1P3/PP3PPP/R1BQKBNR w KQkq - 0 5",
+    # Middlegames
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+    "r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - 1 16",
+    "4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - 1 17",
+    "2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - 0 11",
+    "r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - 1 16",
+    "3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - 6 22",
+    "r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - 2 18",
+    "4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - 3 22",
+    "3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - 4 26",
+    "r3k2r/3nnpbp/q2pp1p1/p7/Pp1PPPP1/4BNN1/1P5P/R2Q1RK1 w kq - 0 16",
+    "3Qb1k1/1r2ppb1/pN1n2q1/Pp1Pp1Pr/4P2p/4BP2/4B1R1/1R5K b - - 11 40",
+    "4k3/3q1r2/1N2r1b1/3ppN2/2nPP3/1B1R2n1/2R1Q3/3K4 w - - 5 1",
+    "4rrk1/1p1nq3/p7/2p1P1pp/3P2bp/3Q1Bn1/PPPB4/1K2R1NR w - - 40 21",
+    "5rk1/q6p/2p3bR/1pPp1rP1/1P1Pp3/P3B1Q1/1K3P2/R7 w - - 93 90",
+    "1r3k2/4q3/2Pp3b/3Bp3/2Q2p2/1p1P2P1/1P2KP2/3N4 w - - 0 1",
+    # Endgames
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 11",
+    "6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/3N4 b - - 0 1",
+    "3b4/5kp1/1p1p1p1p/pP1PpP1P/P1P1P3/3KN3/8/8 w - - 0 1",
+    "2K5/p7/7P/5pR1/8/5k2/r7/8 w - - 0 1",
+    "8/6pk/1p6/8/PP3p1p/5P2/4KP1q/3Q4 w - - 0 1",
+    "7k/3p2pp/4q3/8/4Q3/5Kp1/P6b/8 w - - 0 1",
+    "8/2p5/8/2kPKp1p/2p4P/2P5/3P4/8 w - - 0 1",
+    "8/1p3pp1/7p/5P1P/2k3P1/8/2K2P2/8 w - - 0 1",
+    "8/pp2r1k1/2p1p3/3pP2p/1P1P1P1P/P5KR/8/8 w - - 0 1",
+    "8/3p4/p1bk3p/Pp6/1Kp1PpPp/2P2P1P/2P5/5B2 b - - 0 1",
+    "5k2/7R/4P2p/5K2/p1r2P1p/8/8/8 b - - 0 1",
+    "6k1/6p1/P6p/r1N5/5p2/7P/1b3PP1/4R1K1 w - - 0 1",
+    "6k1/4pp1p/3p2p1/P1pPb3/R7/1r2P1PP/3B1P2/6K1 w - - 0 1",
+    "8/3p3B/5p2/5P2/p7/PP5b/k7/6K1 w - - 0 1",
+    "8/8/8/8/5kp1/P7/8/1K1N4 w - - 0 1",
+    "8/8/3P3k/8/1p6/8/1P6/1K3n2 b - - 0 1",
+    "8/R7/2q5/8/6k1/8/1P5p/1K6 w - - 0 1",
+    "8/8/1p4k1/p1p1p3/P1P1P3/1P3K2/8/8 w - - 0 1",
+    "8/6p1/5k2/p7/P3K3/8/6P1/8 w - - 0 1",
+    "1r6/5k2/8/8/8/8/5PPP/R5K1 w - - 0 1",
+]
+
+
+def bench_position(module, fen, depth):
+    # One search of `fen`, with the time at which every depth was completed
+    module.SEARCHER.clear()
+    board = chess.Board(fen)
+    depth_times = {}
+
+    def on_info(info):
+        depth_times[info["depth"]] = info["time"]
+
+    result = module.search_position(board, depth=depth, on_info=on_info, use_book=False)
+    return {
+        "fen": fen,
+        "move": result.move.uci() if result.move else None,
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+        "time": result.time,
+        "time_to_depth": depth_times,
+    }
+
+
+def run_bench(module, depth=DEFAULT_DEPTH, positions=None, runs=1, log=None):
+    # Searches every position `runs` times and keeps the fastest time of each,
+    # which filters out most of the noise of a busy machine. The node counts
+    # don't change between runs.
+    positions = positions or BENCH_POSITIONS
+    results = []
+    analysis, search.ANALYSIS_CACHE = search.ANALYSIS_CACHE, None
+    try:
+        for i, fen in enumerate(positions):
+            best = None
+            for _ in range(runs):
+                result = bench_position(module, fen, depth)
+                if best is not None and best["nodes"] != result["nodes"]:
+                    raise RuntimeError(f"Search is not deterministic on {fen}")
+                if best is None or result["time"] < best["time"]:
+                    best = result
+            results.append(best)
+            if log is not None:
+                log(f"{i + 1}/{len(positions)} {fen}: {best['nodes']} nodes, {best['time'] * 1000:.0f}ms")
+    finally:
+        search.ANALYSIS_CACHE = analysis
+
+    nodes = sum(r["nodes"] for r in results)
+    total_time = sum(r["time"] for r in results)
+    # A search that stopped early (a forced mate) counts its whole time
+    time_to_depth = {d: sum(r["time_to_depth"].get(d, r["time"]) for r in results) for d in range(1, depth + 1)}
+    return {
+        "engine": module.__name__.rsplit(".", 1)[-1],
+        "depth": depth,
+        "positions": len(results),
+        "nodes": nodes,
+        "time": total_time,
+        "nps": int(nodes / total_time) if total_time > 0 else 0,
+        "signature": nodes,
+        "time_to_depth": time_to_depth,
+        "results": results,
+    }
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()}
+
+
+def compare(current, baseline, threshold=0.05):
+    # Messages and whether `current` regressed against `baseline` (one engine's
+    # run_bench reports). Slower means a drop in nodes per second or a rise in
+    # the time to the full depth beyond `threshold` (a fraction).
+    messages = []
+    regressed = False
+    name = current["engine"]
+    if current["depth"] != baseline["depth"] or current["positions"] != baseline["positions"]:
+        return [f"{name}: baseline was made with another depth or suite, not compared"], False
+
+    if current["signature"] != baseline["signature"]:
+        messages.append(f"{name}: signature changed {baseline['signature']} -> {current['signature']} (the search changed)")
+    else:
+        messages.append(f"{name}: signature unchanged ({current['signature']})")
+
+    nps_change = current["nps"] / baseline["nps"] - 1 if baseline["nps"] else 0.0
+    line = f"{name}: nps {baseline['nps']} -> {current['nps']} ({nps_change:+.1%})"
+    if nps_change < -threshold:
+        line += "  SLOWER"
+        regressed = True
+    messages.append(line)
+
+    depth = str(current["depth"])
+    base_ttd = {str(d): t for d, t in baseline["time_to_depth"].items()}
+    current_ttd = {str(d): t for d, t in current["time_to_depth"].items()}
+    if depth in base_ttd and depth in current_ttd and base_ttd[depth] > 0:
+        ttd_change = current_ttd[depth] / base_ttd[depth] - 1
+        line = f"{name}: time to depth {depth} {base_ttd[depth]:.2f}s -> {current_ttd[depth]:.2f}s ({ttd_change:+.1%})"
+        if ttd_change > threshold:
+            line += "  SLOWER"
+            regressed = True
+        messages.append(line)
+    return messages, regressed
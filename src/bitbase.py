@@ -0,0 +1,247 @@
+import os
+
+import chess
+import numpy as np
+
+# Endgame bitbases for king + one piece against a bare king (KQK, KRK, KPK)
+# Generated locally by retrograde analysis, nothing is downloaded. Every
+# table covers both sides to move and all 64^3 placements of the strong
+# king, the weak king and the piece, with the strong side as White; a Black
+# strong side is probed through the vertically flipped position. Each table
+# is stored as two files:
+#   <name>.wdl  one bit per position, set when the strong side wins
+#   <name>.dtm  one byte per position, distance to mate in plies (255: no win)
+# Both are memory-mapped when first probed. The weak side can never win with
+# a bare king, so a clear bit is always a draw (or an illegal position).
+
+BITBASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bitbases")
+
+# KPK promotes into KQK and KRK, so those are generated first
+TABLES = ["KQK", "KRK", "KPK"]
+
+TABLE_PIECES = {"KQK": chess.QUEEN, "KRK": chess.ROOK, "KPK": chess.PAWN}
+
+NO_WIN = 255
+
+PLACEMENTS = 64 * 64 * 64
+
+# Side to move, relative to the strong side
+STRONG = 0
+WEAK = 1
+
+KING_STEPS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+ROOK_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+BISHOP_STEPS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+# BETWEEN[a, b]: squares strictly between a and b when they share a line
+BETWEEN = np.array([[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES], dtype=np.uint64)
+
+
+def index(side, strong_king, weak_king, square):
+    return side * PLACEMENTS + strong_king * 4096 + weak_king * 64 + square
+
+
+def _squares():
+    placement = np.arange(PLACEMENTS)
+    return placement >> 12, (placement >> 6) & 63, placement & 63
+
+
+def _distance(a, b):
+    return np.maximum(np.abs((a & 7) - (b & 7)), np.abs((a >> 3) - (b >> 3)))
+
+
+def _step(square, df, dr):
+    # Square one step away, -1 when that leaves the board
+    file = (square & 7) + df
+    rank = (square >> 3) + dr
+    on_board = (file >= 0) & (file < 8) & (rank >= 0) & (rank < 8)
+    return np.where(on_board, rank * 8 + file, -1)
+
+
+def _attacks(piece_type, piece, target, blocker):
+    # Whether a white piece on `piece` attacks `target`, with `blocker` the
+    # only other square that can block a line
+    df = (target & 7) - (piece & 7)
+    dr = (target >> 3) - (piece >> 3)
+    if piece_type == chess.PAWN:
+        return (dr == 1) & (np.abs(df) == 1)
+    line = (df == 0) | (dr == 0)
+    if piece_type == chess.QUEEN:
+        line |= np.abs(df) == np.abs(dr)
+    line &= piece != target
+    blocked = (BETWEEN[piece, target] >> blocker.astype(np.uint64)) & np.uint64(1)
+    return line & (blocked == 0)
+
+
+def _strong_moves(piece_type, strong_king, weak_king, square):
+    # Moves of the strong side as (successor placements, promotion squares)
+    # per move slot, -1 where the slot has no move
+    successors = []
+    promotions = []
+
+    for df, dr in KING_STEPS:
+        to = _step(strong_king, df, dr)
+        ok = (to >= 0) & (to != square) & (_distance(to, weak_king) > 1)
+        successors.append(np.where(ok, to * 4096 + weak_king * 64 + square, -1).astype(np.int32))
+
+    if piece_type == chess.PAWN:
+        to = square + 8
+        free = (to < 64) & (to != strong_king) & (to != weak_king)
+        promoting = (to >> 3) == 7
+        successors.append(np.where(free & ~promoting, strong_king * 4096 + weak_king * 64 + to, -1).astype(np.int32))
+        promotions.append(np.where(free & promoting, to, -1))
+        double = square + 16
+        ok = free & ((square >> 3) == 1) & (double != strong_king) & (double != weak_king)
+        successors.append(np.where(ok, strong_king * 4096 + weak_king * 64 + double, -1).astype(np.int32))
+    else:
+        steps = ROOK_STEPS + (BISHOP_STEPS if piece_type == chess.QUEEN else [])
+        for df, dr in steps:
+            to = square
+            open_ray = np.ones(PLACEMENTS, dtype=bool)
+            for _ in range(7):
+                to = _step(to, df, dr)
+                open_ray &= (to >= 0) & (to != strong_king) & (to != weak_king)
+                successors.append(np.where(open_ray, strong_king * 4096 + weak_king * 64 + to, -1).astype(np.int32))
+    return successors, promotions
+
+
+def _weak_moves(piece_type, strong_king, weak_king, square):
+    # King moves of the weak side as successor placements per move slot, plus
+    # whether it can take the piece (a draw)
+    successors = []
+    can_capture = np.zeros(PLACEMENTS, dtype=bool)
+    for df, dr in KING_STEPS:
+        to = _step(weak_king, df, dr)
+        ok = (to >= 0) & (_distance(to, strong_king) > 1)
+        capture = ok & (to == square)
+        safe = ok & ~capture & ~_attacks(piece_type, square, np.maximum(to, 0), strong_king)
+        can_capture |= capture
+        successors.append(np.where(safe, strong_king * 4096 + to * 64 + square, -1).astype(np.int32))
+    return successors, can_capture
+
+
+def generate(name, promoted=None):
+    # Retrograde analysis of one table. promoted: {piece type: dtm array} of
+    # the tables a pawn can promote into. Returns the dtm array in plies.
+    piece_type = TABLE_PIECES[name]
+    strong_king, weak_king, square = _squares()
+
+    legal = (strong_king != weak_king) & (square != strong_king) & (square != weak_king)
+    legal &= _distance(strong_king, weak_king) > 1
+    if piece_type == chess.PAWN:
+        legal &= ((square >> 3) >= 1) & ((square >> 3) <= 6)
+    weak_in_check = _attacks(piece_type, square, weak_king, strong_king)
+    strong_legal = legal & ~weak_in_check  # The weak king can't be in check with the strong side to move
+    weak_legal = legal
+
+    strong_successors, promotions = _strong_moves(piece_type, strong_king, weak_king, square)
+    weak_successors, can_capture = _weak_moves(piece_type, strong_king, weak_king, square)
+
+    # Fastest win through a promotion, in plies after the promoting move
+    promotion_dtm = np.full(PLACEMENTS, NO_WIN, dtype=np.int32)
+    for to in promotions:
+        for table in (promoted or {}).values():
+            child = np.where(to >= 0, index(WEAK, strong_king, weak_king, np.maximum(to, 0)), 0)
+            dtm = np.where(to >= 0, table[child], NO_WIN)
+            promotion_dtm = np.minimum(promotion_dtm, dtm)
+
+    has_move = can_capture.copy()
+    for successor in weak_successors:
+        has_move |= successor >= 0
+
+    strong_dtm = np.full(PLACEMENTS + 1, NO_WIN, dtype=np.int32)  # Last entry: no move in that slot
+    weak_dtm = np.full(PLACEMENTS + 1, NO_WIN, dtype=np.int32)
+    weak_dtm[:PLACEMENTS][weak_legal & weak_in_check & ~has_move] = 0  # Checkmated
+
+    # Ply n resolves strong-side wins in n (odd n) and weak-side losses in n (even n)
+    undecided_weak = weak_legal & has_move & ~can_capture
+    ply = 0
+    stalled = 0
+    while stalled < 2:
+        ply += 1
+        if ply % 2:
+            found = promotion_dtm == ply - 1
+            for successor in strong_successors:
+                found |= weak_dtm[successor] == ply - 1
+            found &= strong_legal & (strong_dtm[:PLACEMENTS] == NO_WIN)
+            strong_dtm[:PLACEMENTS][found] = ply
+        else:
+            found = undecided_weak & (weak_dtm[:PLACEMENTS] == NO_WIN)
+            for successor in weak_successors:
+                found &= (successor < 0) | (strong_dtm[successor] != NO_WIN)
+            weak_dtm[:PLACEMENTS][found] = ply
+        stalled = 0 if found.any() else stalled + 1
+
+    return np.concatenate([strong_dtm[:PLACEMENTS], weak_dtm[:PLACEMENTS]]).astype(np.uint8)
+
+
+def paths(name, directory=None):
+    directory = directory or BITBASE_DIR
+    return os.path.join(directory, name + ".wdl"), os.path.join(directory, name + ".dtm")
+
+
+def save(name, dtm, directory=None):
+    wdl_path, dtm_path = paths(name, directory)
+    os.makedirs(os.path.dirname(wdl_path), exist_ok=True)
+    np.packbits(dtm != NO_WIN, bitorder="little").tofile(wdl_path)
+    dtm.tofile(dtm_path)
+
+
+def generate_all(directory=None, log=print):
+    dtms = {}
+    for name in TABLES:
+        promoted = {pt: dtms[n] for n, pt in TABLE_PIECES.items() if n in dtms and pt != chess.PAWN}
+        dtm = generate(name, promoted if TABLE_PIECES[name] == chess.PAWN else None)
+        save(name, dtm, directory)
+        dtms[name] = dtm
+        wins = int((dtm[:PLACEMENTS] != NO_WIN).sum())
+        longest = int(dtm[dtm != NO_WIN].max())
+        log(f"{name}: {wins} wins with the strong side to move, longest mate {longest} plies")
+    reset()
+
+
+# Probing
+
+_TABLES = {}
+
+def reset():
+    # Forget the mapped tables, e.g. after regenerating them
+    _TABLES.clear()
+
+
+def _table(name):
+    if name not in _TABLES:
+        wdl_path, dtm_path = paths(name)
+        if os.path.exists(wdl_path) and os.path.exists(dtm_path):
+            _TABLES[name] = (np.memmap(wdl_path, dtype=np.uint8, mode="r"), np.memmap(dtm_path, dtype=np.uint8, mode="r"))
+        else:
+            _TABLES[name] = None
+    return _TABLES[name]
+
+
+def probe(board):
+    # For a position with exactly three pieces: (result, plies) with result
+    # 1 when the side to move wins, -1 when it loses and 0 for a draw, and the
+    # distance to mate in plies. None when no table covers the position.
+    if chess.popcount(board.occupied) != 3:
+        return None
+    pieces = board.occupied & ~board.kings
+    piece_type = board.piece_type_at(chess.lsb(pieces))
+    name = "K" + chess.piece_symbol(piece_type).upper() + "K"
+    table = _table(name) if name in TABLE_PIECES else None
+    if table is None:
+        return None
+    wdl, dtm = table
+
+    color = bool(pieces & board.occupied_co[chess.WHITE])
+    square = chess.lsb(pieces)
+    strong_king = board.king(color)
+    weak_king = board.king(not color)
+    if color == chess.BLACK:
+        square, strong_king, weak_king = chess.square_mirror(square), chess.square_mirror(strong_king), chess.square_mirror(weak_king)
+    side = STRONG if board.turn == color else WEAK
+    i = index(side, strong_king, weak_king, square)
+
+    if not (wdl[i >> 3] >> (i & 7)) & 1:
+        return 0, 0
+    return (1 if side == STRONG else -1), int(dtm[i])
@@ -0,0 +1,185 @@
+import os
+import time
+import sqlite3
+
+import chess
+
+# Persistent analysis cache
+# Root and near-root search results kept in an SQLite file so they outlive the
+# process: the next game, arena worker or training run that reaches a cached
+# position at the same or a lower depth gets the answer without searching.
+# Entries are keyed by the Polyglot key of the position and the evaluator's
+# fingerprint (search.key_salt(), which also keeps contempt scores for either
+# root color apart), so results of different weights never mix, and hold the
+# depth, the score (side to move's view) and the principal variation.
+#
+# Many processes can share one file: it is opened in WAL mode, so readers
+# never wait for the writer, and every process opens its own connection.
+# Stores are collected and written in batches of BATCH_SIZE in one
+# transaction, together with the last-use times of the entries that were hit.
+# When the file holds more than max_entries results, the least recently used
+# ones are deleted. The number of results is counted once per connection and
+# then kept up to date from the writes, so it is only an estimate while other
+# processes write too; a prune counts again.
+#
+# Like the transposition table, the cache doesn't know the game history, so a
+# cached score may miss a draw by repetition the search would have seen.
+
+BATCH_SIZE = 32
+MAX_ENTRIES = 1000000
+# Keep this much below max_entries after pruning, so it doesn't run on every write
+PRUNE_SLACK = 0.9
+# Seconds a process waits for another one's write to finish
+BUSY_TIMEOUT = 30
+# Bytes of the file read through a memory map
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key INTEGER NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    pv TEXT NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS analysis_used ON analysis (used);
+"""
+
+# Keep the deeper result when two processes store the same position
+UPSERT = """
+INSERT INTO analysis (key, fingerprint, depth, score, pv, used) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (key, fingerprint) DO UPDATE SET
+    depth = excluded.depth, score = excluded.score, pv = excluded.pv, used = excluded.used
+WHERE excluded.depth >= analysis.depth
+"""
+
+
+def _signed(value):
+    # SQLite integers are signed 64-bit, the keys unsigned
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class AnalysisCache:
+    def __init__(self, path, max_entries=MAX_ENTRIES, batch_size=BATCH_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.pending = {}  # (key, fingerprint) -> (depth, score, pv) not written yet
+        self.touched = {}  # (key, fingerprint) -> last use of entries read from the file
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        self._pid = None
+        self._count = None  # Results in the file, as far as this process knows
+
+    def _connection(self):
+        # One connection per process: a connection must not cross a fork, and
+        # what the parent had pending is the parent's to write
+        if self._pid != os.getpid():
+            self._db = None
+            self.pending = {}
+            self.touched = {}
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            db.executescript(SCHEMA)
+            self._db = db
+            self._pid = os.getpid()
+            self._count = None
+        return self._db
+
+    def probe(self, key, fingerprint, depth):
+        # (depth, score, pv) of a result searched at least `depth` deep, else None
+        entry_key = (_signed(key), _signed(fingerprint))
+        entry = self.pending.get(entry_key)
+        if entry is None:
+            try:
+                row = self._connection().execute(
+                    "SELECT depth, score, pv FROM analysis WHERE key = ? AND fingerprint = ?", entry_key
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is not None:
+                entry = (row[0], row[1], [chess.Move.from_uci(uci) for uci in row[2].split()])
+                self.touched[entry_key] = time.time()
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, fingerprint, depth, score, pv):
+        entry_key = (_signed(key), _signed(fingerprint))
+        if self._pid != os.getpid():
+            self._connection()
+        current = self.pending.get(entry_key)
+        if current is None or depth >= current[0]:
+            self.pending[entry_key] = (depth, score, list(pv))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Writes the pending results in one transaction, then prunes.
+        # Returns the number of results written.
+        if not self.pending and not self.touched:
+            return 0
+        now = time.time()
+        rows = [
+            (key, fingerprint, depth, score, " ".join(move.uci() for move in pv), now)
+            for (key, fingerprint), (depth, score, pv) in self.pending.items()
+        ]
+        touched = [(used, key, fingerprint) for (key, fingerprint), used in self.touched.items()]
+        db = self._connection()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                before = db.total_changes
+                db.executemany(UPSERT, rows)
+                written = db.total_changes - before
+                db.executemany("UPDATE analysis SET used = ? WHERE key = ? AND fingerprint = ?", touched)
+                self._prune(db, written)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            # Busy or read-only: keep the batch for the next try
+            return 0
+        self.pending = {}
+        self.touched = {}
+        return len(rows)
+
+    def _prune(self, db, written):
+        # written: rows inserted or updated by this flush. Updates are counted
+        # as new rows too, which only makes the estimate run ahead.
+        if self._count is None:
+            self._count = db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        else:
+            self._count += written
+        if self._count <= self.max_entries:
+            return
+        count = db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM analysis WHERE used <= (SELECT used FROM analysis ORDER BY used LIMIT 1 OFFSET ?)",
+                (count - int(self.max_entries * PRUNE_SLACK) - 1,),
+            )
+            count = db.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        self._count = count
+
+    def count(self):
+        # Results in the file (the pending ones not included)
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def close(self):
+        if self._db is not None and self._pid == os.getpid():
+            self.flush()
+            self._db.close()
+        self._db = None
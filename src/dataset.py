@@ -0,0 +1,219 @@
+import os
+
+import chess
+import chess.pgn
+import chess.polyglot
+import numpy as np
+
+from src.evaluation import MATE_SCORE
+from src.batch_eval import PLANES, plane
+
+# Binary position dataset
+# An append-only file of fixed-size records, memory-mapped for reading so
+# any number of positions can be sampled without parsing PGN again or
+# loading the file into RAM. Positions are deduplicated by Zobrist key when
+# they are appended. Each record holds:
+#   key       Polyglot Zobrist key of the position
+#   occupied  bitboard of the occupied squares
+#   pieces    one nibble per occupied square, in square order (see piece_code)
+#   turn      1 if White is to move
+#   result    game result from White's side: 1, 0 or -1 (UNKNOWN_RESULT if not known)
+#   score     search score from White's side in centipawns (UNKNOWN_SCORE if not known)
+
+MAGIC = b"CHESSPOS"
+VERSION = 1
+HEADER_BYTES = 16
+
+RECORD = np.dtype([
+    ("key", "<u8"),
+    ("occupied", "<u8"),
+    ("pieces", "u1", (16,)),
+    ("turn", "u1"),
+    ("result", "i1"),
+    ("score", "<i2"),
+])
+
+UNKNOWN_RESULT = -128
+UNKNOWN_SCORE = -32768
+
+# Search scores are clamped to this, mate scores included
+SCORE_LIMIT = 32000
+
+RESULTS = {"1-0": 1, "0-1": -1, "1/2-1/2": 0}
+
+
+def piece_code(color, piece_type):
+    # Nibble of a piece: its batch_eval plane + 1, so 0 never names a piece
+    return plane(color, piece_type) + 1
+
+
+def _header():
+    return MAGIC + VERSION.to_bytes(4, "little") + RECORD.itemsize.to_bytes(4, "little")
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+    if len(header) != HEADER_BYTES or header[:8] != MAGIC:
+        raise ValueError(f"{path} is not a position dataset")
+    if int.from_bytes(header[8:12], "little") != VERSION or int.from_bytes(header[12:16], "little") != RECORD.itemsize:
+        raise ValueError(f"{path} has an unsupported dataset version")
+
+
+def open_dataset(path):
+    # Memory-mapped, read-only view of all records
+    _check_header(path)
+    count = (os.path.getsize(path) - HEADER_BYTES) // RECORD.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", offset=HEADER_BYTES, shape=(count,))
+
+
+def clamp_score(score):
+    return max(-SCORE_LIMIT, min(SCORE_LIMIT, score))
+
+
+def encode(board, result=UNKNOWN_RESULT, score=UNKNOWN_SCORE):
+    # One record as a tuple in RECORD's field order
+    codes = [piece_code(board.color_at(square), board.piece_type_at(square)) for square in chess.scan_forward(board.occupied)]
+    codes += [0] * (32 - len(codes))
+    pieces = [codes[i] | (codes[i + 1] << 4) for i in range(0, 32, 2)]
+    return (chess.polyglot.zobrist_hash(board), board.occupied, pieces, board.turn, result, score)
+
+
+def to_bitboards(records):
+    # (N, 12) uint64 piece bitboards in batch_eval plane order
+    records = np.asarray(records)
+    rows = len(records)
+    squares = np.unpackbits(records["occupied"].astype("<u8").reshape(rows, 1).view(np.uint8), axis=1, bitorder="little").astype(bool)
+    nibbles = records["pieces"]
+    codes = np.empty((rows, 32), dtype=np.uint8)
+    codes[:, 0::2] = nibbles & 15
+    codes[:, 1::2] = nibbles >> 4
+    # The k-th occupied square holds the k-th code
+    order = np.cumsum(squares, axis=1) - 1
+    board_codes = np.where(squares, np.take_along_axis(codes, np.clip(order, 0, 31), axis=1), 0)
+    bitboards = np.empty((rows, PLANES), dtype=np.uint64)
+    for p in range(PLANES):
+        bits = np.packbits(board_codes == p + 1, axis=1, bitorder="little")
+        bitboards[:, p] = np.ascontiguousarray(bits).view("<u8").reshape(rows)
+    return bitboards
+
+
+def to_boards(records):
+    # Full python-chess boards (without castling rights or en passant)
+    boards = []
+    for record, bitboards in zip(np.asarray(records), to_bitboards(records)):
+        board = chess.Board(None)
+        for color in chess.COLORS:
+            for piece_type in chess.PIECE_TYPES:
+                for square in chess.scan_forward(int(bitboards[plane(color, piece_type)])):
+                    board.set_piece_at(square, chess.Piece(piece_type, color))
+        board.turn = bool(record["turn"])
+        boards.append(board)
+    return boards
+
+
+def result_scores(records):
+    # Game results as 1, 0.5 and 0 for White (NaN where unknown)
+    results = np.asarray(records)["result"].astype(np.float64)
+    return np.where(results == UNKNOWN_RESULT, np.nan, (results + 1) / 2)
+
+
+def sample(records, count, rng=None):
+    # `count` records picked at random without replacement, read from the map
+    rng = rng or np.random.default_rng()
+    count = min(count, len(records))
+    return np.asarray(records[np.sort(rng.choice(len(records), size=count, replace=False))])
+
+
+class DatasetWriter:
+    # Appends records to a dataset file, skipping positions already in it.
+    # The sorted keys of the file are kept in memory (8 bytes per position).
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(_header())
+        self.keys = np.sort(np.array(open_dataset(path)["key"]))
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self):
+        return len(self.keys) + len(self.pending)
+
+    def add(self, board, result=UNKNOWN_RESULT, score=UNKNOWN_SCORE):
+        self.pending.append(encode(board, result, score))
+
+    def add_game(self, board, moves, result, scores=None, skip_plies=0):
+        # Positions of a game from `board`, before each move and after the
+        # last one. scores: White's search score of each position (or None).
+        board = board.copy()
+        game_result = RESULTS.get(result, UNKNOWN_RESULT)
+        for ply, move in enumerate(list(moves) + [None]):
+            if ply >= skip_plies:
+                score = scores[ply] if scores is not None and ply < len(scores) else None
+                self.add(board, game_result, UNKNOWN_SCORE if score is None else clamp_score(score))
+            if move is not None:
+                board.push(move)
+
+    def flush(self):
+        # Write the pending records that are new, returns how many were written
+        if not self.pending:
+            return 0
+        records = np.array(self.pending, dtype=RECORD)
+        self.pending = []
+        _, first = np.unique(records["key"], return_index=True)
+        records = records[np.sort(first)]
+        records = records[~_contains(self.keys, records["key"])]
+        with open(self.path, "ab") as f:
+            f.write(records.tobytes())
+        self.keys = np.sort(np.concatenate([self.keys, records["key"]]))
+        return len(records)
+
+
+def _contains(sorted_keys, keys):
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    position = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[position] == keys
+
+
+def add_pgn(writer, path, skip_plies=0, log=print):
+    # Streams the games of a PGN file into the dataset. [%eval] comments, if
+    # present, become the search scores.
+    games = 0
+    written = 0
+    with open(path) as f:
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                break
+            moves = []
+            scores = []
+            for node in game.mainline():
+                moves.append(node.move)
+                scores.append(_comment_score(node.parent))
+            scores.append(_comment_score(game.end()) if moves else None)
+            writer.add_game(game.board(), moves, game.headers.get("Result", "*"), scores, skip_plies)
+            games += 1
+            if len(writer.pending) >= 100000:
+                written += writer.flush()
+    written += writer.flush()
+    log(f"{path}: {games} games, {written} new positions")
+    return written
+
+
+def _comment_score(node):
+    # White's score from a [%eval] comment of the move leading to `node`
+    if node.parent is None:
+        return None
+    score = node.eval()
+    if score is None:
+        return None
+    return score.white().score(mate_score=MATE_SCORE)
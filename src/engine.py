@@ -1,8 +1,8 @@
 import chess
-import math
 
 import json
 import os
+import threading
 
 # Default weights if file not found
 DEFAULT_WEIGHTS = {
@@ -95,169 +95,161 @@ KING_TABLE_END = [
     -50,-30,-30,-30,-30,-30,-30,-50
 ]
 
+# The tables by name, as stored under "tables" in model.json by the tuner
+DEFAULT_TABLES = {
+    "PAWN": PAWN_TABLE,
+    "KNIGHT": KNIGHT_TABLE,
+    "BISHOP": BISHOP_TABLE,
+    "ROOK": ROOK_TABLE,
+    "QUEEN": QUEEN_TABLE,
+    "KING_MID": KING_TABLE_MID,
+    "KING_END": KING_TABLE_END,
+}
+TABLE_NAMES = list(DEFAULT_TABLES)
+
+CURRENT_TABLES = dict(DEFAULT_TABLES)
+
+def phase_tables(tables):
+    # (midgame, endgame) tables by piece type from a name -> table dict.
+    # Only the king has separate midgame and endgame tables.
+    mid = {
+        chess.PAWN: tables["PAWN"],
+        chess.KNIGHT: tables["KNIGHT"],
+        chess.BISHOP: tables["BISHOP"],
+        chess.ROOK: tables["ROOK"],
+        chess.QUEEN: tables["QUEEN"],
+        chess.KING: tables["KING_MID"],
+    }
+    end = dict(mid)
+    end[chess.KING] = tables["KING_END"]
+    return mid, end
+
 def load_weights(file_path="model.json"):
-    global CURRENT_WEIGHTS
+    global CURRENT_WEIGHTS, CURRENT_TABLES
     try:
         if os.path.exists(file_path):
             with open(file_path, 'r') as f:
                 data = json.load(f)
                 CURRENT_WEIGHTS = data.get("weights", DEFAULT_WEIGHTS)
+                # Tuned piece-square tables, any table not in the file keeps its default
+                CURRENT_TABLES = {**DEFAULT_TABLES, **data.get("tables", {})}
                 print(f"Loaded weights from {file_path} (Rating: {data.get('rating', 1000)})")
         else:
             print(f"Weight file {file_path} not found. Using defaults.")
             CURRENT_WEIGHTS = DEFAULT_WEIGHTS.copy()
+            CURRENT_TABLES = dict(DEFAULT_TABLES)
     except Exception as e:
         print(f"Error loading weights: {e}")
 
-import src.openings as openings
+import src.search as search
+from src.evaluation import Evaluator
+from src.limits import SearchLimits
 
-# Transposition Table
-# Key: FEN string (or hash)
-# Value: {'score': score, 'depth': depth, 'flag': 'exact'|'lower'|'upper'}
-TRANSPOSITION_TABLE = {}
+# Transposition Table (shared with every other engine using the search kernel)
+TRANSPOSITION_TABLE = search.TRANSPOSITION_TABLE
 
-def evaluate_board(board, weights=None):
+# Killer and history tables, kept between searches
+SEARCHER = search.Searcher()
+
+# Compiled evaluators, keyed by the weights they were built from
+_EVALUATORS = {}
+
+def evaluator_for(weights=None, tables=None):
+    # tables: name -> table dict like model.json's "tables", None for the current ones
     if weights is None:
         weights = CURRENT_WEIGHTS
+    tables = CURRENT_TABLES if tables is None else {**DEFAULT_TABLES, **tables}
+    cache_key = (tuple(sorted(weights.items())), tuple(tuple(tables[name]) for name in TABLE_NAMES))
+    evaluator = _EVALUATORS.get(cache_key)
+    if evaluator is None:
+        values = {pt: weights.get(chess.piece_name(pt).upper(), 0) for pt in chess.PIECE_TYPES}
+        mid, end = phase_tables(tables)
+        evaluator = Evaluator(values, mid, end, weights.get("DRAW_PENALTY", 0))
+        _EVALUATORS[cache_key] = evaluator
+    return evaluator
+
+def set_hash_size(size_mb):
+    search.set_hash_size(size_mb)
+
+def set_threads(threads):
+    # Opt-in Lazy SMP: threads > 1 starts threads - 1 helper processes
+    search.set_threads(threads)
 
-    if board.is_checkmate():
-        if board.turn:
-            return -99999 # Black wins (White is checkmated)
-        else:
-            return 99999 # White wins
-
-    # Draw awareness
-    if board.is_stalemate() or board.is_insufficient_material() or board.is_fivefold_repetition() or board.is_seventyfive_moves():
-        return weights.get("DRAW_PENALTY", 0)
-    
-    # Can claim draw? (3-fold or 50-move)
-    if board.can_claim_draw():
-        return weights.get("DRAW_PENALTY", 0)
-
-    score = 0
-    
-    # Determine game phase (simple heuristic based on queen count)
-    white_queens = len(board.pieces(chess.QUEEN, chess.WHITE))
-    black_queens = len(board.pieces(chess.QUEEN, chess.BLACK))
-    minor_pieces = len(board.pieces(chess.KNIGHT, chess.WHITE)) + len(board.pieces(chess.BISHOP, chess.WHITE)) + \
-                   len(board.pieces(chess.KNIGHT, chess.BLACK)) + len(board.pieces(chess.BISHOP, chess.BLACK))
-    
-    is_endgame = (white_queens == 0 and black_queens == 0) or (white_queens == 1 and black_queens == 1 and minor_pieces <= 4)
-
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            # Dynamic value lookup
-            ptype = chess.piece_name(piece.piece_type).upper()
-            value = weights.get(ptype, 0)
-            
-            # Position score
-            pst_score = 0
-            if piece.piece_type == chess.PAWN:
-                pst_score = PAWN_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else PAWN_TABLE[square]
-            elif piece.piece_type == chess.KNIGHT:
-                pst_score = KNIGHT_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else KNIGHT_TABLE[square]
-            elif piece.piece_type == chess.BISHOP:
-                pst_score = BISHOP_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else BISHOP_TABLE[square]
-            elif piece.piece_type == chess.ROOK:
-                pst_score = ROOK_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else ROOK_TABLE[square]
-            elif piece.piece_type == chess.QUEEN:
-                pst_score = QUEEN_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else QUEEN_TABLE[square]
-            elif piece.piece_type == chess.KING:
-                table = KING_TABLE_END if is_endgame else KING_TABLE_MID
-                pst_score = table[chess.square_mirror(square)] if piece.color == chess.BLACK else table[square]
-
-            if piece.color == chess.WHITE:
-                score += value + pst_score
-            else:
-                score -= value + pst_score
-    
-    return score
-
-def minimax(board, depth, alpha, beta, maximizing_player, weights=None):
-    # Transposition Table Lookup
-    fen = board.fen()
-    if fen in TRANSPOSITION_TABLE:
-        entry = TRANSPOSITION_TABLE[fen]
-        if entry['depth'] >= depth:
-            return entry['score']
-
-    if board.is_checkmate():
-        return -99999 + depth if maximizing_player else 99999 - depth
-
-    if depth == 0 or board.is_game_over():
-        score = evaluate_board(board, weights)
-        # Store in TT
-        TRANSPOSITION_TABLE[fen] = {'score': score, 'depth': depth}
-        return score
-
-    if maximizing_player:
-        max_eval = -math.inf
-        moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-        
-        for move in moves:
-            board.push(move)
-            eval = minimax(board, depth - 1, alpha, beta, False, weights)
-            board.pop()
-            max_eval = max(max_eval, eval)
-            alpha = max(alpha, eval)
-            if beta <= alpha:
-                break
-        
-        # Store in TT
-        TRANSPOSITION_TABLE[fen] = {'score': max_eval, 'depth': depth}
-        return max_eval
-    else:
-        min_eval = math.inf
-        moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-        
-        for move in moves:
+def evaluate_board(board, weights=None):
+    return evaluator_for(weights).evaluate(board)
+
+def search_position(board, depth=None, weights=None, movetime=None, clock=None, increment=0, nodes=None, on_info=None, stop=None, use_book=True, stats=None):
+    # Like get_best_move but returns the full search.SearchResult (score, pv, depth, nodes).
+    # on_info: called with depth/seldepth/score/nodes/nps/pv after every iteration
+    # stop: optional threading.Event, setting it ends the search with the best move so far
+    # stats: optional stats.SearchStats the search fills with its counters
+    limits = SearchLimits(depth, movetime, clock, increment, nodes, stop)
+    return SEARCHER.search(board, evaluator_for(weights), limits, use_book=use_book, on_info=on_info, stats=stats)
+
+def get_best_move(board, depth=None, weights=None, movetime=None, clock=None, increment=0, nodes=None, stats=None):
+    # depth: maximum depth (3 when no other limit is given)
+    # movetime: seconds for this move
+    # clock/increment: our remaining time and increment in seconds
+    # nodes: maximum number of nodes to search
+    # stats: optional stats.SearchStats to fill, e.g. SearchStats(profile=True)
+    result = search_position(board, depth, weights, movetime, clock, increment, nodes, stats=stats)
+    if result.book:
+        print(f"Book Move: {board.san(result.move)}")
+    return result.move
+
+class BackgroundSearch:
+    # Runs search_position on a worker thread so the caller stays responsive.
+    # `info` holds the last completed iteration (depth, nps, pv, ...) and
+    # cancel() ends the search early with the best move found so far. A
+    # stats.SearchStats passed as `stats` fills live while the search runs.
+    def __init__(self, board, depth=None, weights=None, on_info=None, **limits):
+        self.board = board.copy()
+        self.stop = threading.Event()
+        self.on_info = on_info
+        self.info = None
+        self.stats = limits.get("stats")
+        self.result = None
+        # Waited on instead of Thread.join, which can report a running thread as
+        # finished when Ctrl-C interrupts it
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(depth, weights, limits), daemon=True)
+        self.thread.start()
+
+    def _run(self, depth, weights, limits):
+        try:
+            self.result = search_position(self.board, depth, weights, on_info=self._info, stop=self.stop, **limits)
+        finally:
+            self.finished.set()
+
+    def _info(self, info):
+        self.info = info
+        if self.on_info is not None:
+            self.on_info(info)
+
+    def done(self):
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        # The search result, or None if it is still running after `timeout` seconds
+        self.finished.wait(timeout)
+        return self.result
+
+    def cancel(self):
+        self.stop.set()
+        return self.wait()
+
+class PonderSearch(BackgroundSearch):
+    # Searches on the opponent's time: the position after their expected reply
+    # is searched while they think. On a ponder hit the result is ready (or
+    # nearly so); on a miss the search is cancelled and the real search still
+    # finds its subtrees in the shared transposition table.
+    # move: the expected reply, or None to just search the current position.
+    def __init__(self, board, move, depth=None, weights=None, stats=None):
+        board = board.copy()
+        if move is not None:
             board.push(move)
-            eval = minimax(board, depth - 1, alpha, beta, True, weights)
-            board.pop()
-            min_eval = min(min_eval, eval)
-            beta = min(beta, eval)
-            if beta <= alpha:
-                break
-        
-        # Store in TT
-        TRANSPOSITION_TABLE[fen] = {'score': min_eval, 'depth': depth}
-        return min_eval
-
-def get_best_move(board, depth=3, weights=None):
-    # Check Opening Book
-    book_move_san = openings.get_opening_move(board)
-    if book_move_san:
-        print(f"Book Move: {book_move_san}")
-        return board.parse_san(book_move_san)
-
-    best_move = None
-    max_eval = -math.inf
-    min_eval = math.inf
-    
-    maximizing_player = board.turn == chess.WHITE
-    
-    # print(f"Thinking... (Depth {depth})") # Silence for training
-    
-    moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-    
-    alpha = -math.inf
-    beta = math.inf
-    
-    for move in moves:
-        board.push(move)
-        eval = minimax(board, depth - 1, alpha, beta, not maximizing_player, weights)
-        board.pop()
-        
-        if maximizing_player:
-            if eval > max_eval:
-                max_eval = eval
-                best_move = move
-            alpha = max(alpha, eval)
-        else:
-            if eval < min_eval:
-                min_eval = eval
-                best_move = move
-            beta = min(beta, eval)
-            
-    return best_move
+        self.move = move
+        super().__init__(board, depth, weights, stats=stats)
+
+    def hit(self, move):
+        return self.move is not None and move == self.move
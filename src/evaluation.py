@@ -0,0 +1,132 @@
+import chess
+import hashlib
+
+# Material + piece-square evaluation compiled into flat score arrays.
+#
+# Every (color, piece type, square) gets one precomputed score, already signed
+# from White's point of view, in a midgame and an endgame array. The search
+# keeps the two sums current with delta() as it makes moves, so a leaf only has
+# to pick the sum that matches the game phase.
+
+MATE_SCORE = 99999
+
+# Index of a (color, piece type, square) triple in the compiled arrays
+def index(color, piece_type, square):
+    return ((color * 7) + piece_type) * 64 + square
+
+
+def is_endgame(board):
+    # Same phase rule the engine has always used: no queens, or one queen each
+    # with at most four minor pieces left.
+    white = board.occupied_co[chess.WHITE]
+    black = board.occupied_co[chess.BLACK]
+    white_queens = chess.popcount(board.queens & white)
+    black_queens = chess.popcount(board.queens & black)
+    if white_queens == 0 and black_queens == 0:
+        return True
+    if white_queens == 1 and black_queens == 1:
+        return chess.popcount(board.knights | board.bishops) <= 4
+    return False
+
+
+class Evaluator:
+    def __init__(self, values, mg_tables, eg_tables, draw_score=0):
+        # values: piece type -> material value
+        # mg_tables/eg_tables: piece type -> 64 entry table from White's side
+        self.values = dict(values)
+        self.draw_score = draw_score
+        self.mg = [0] * (2 * 7 * 64)
+        self.eg = [0] * (2 * 7 * 64)
+        for piece_type in chess.PIECE_TYPES:
+            value = values.get(piece_type, 0)
+            for square in chess.SQUARES:
+                mirror = chess.square_mirror(square)
+                self.mg[index(chess.WHITE, piece_type, square)] = value + mg_tables[piece_type][square]
+                self.eg[index(chess.WHITE, piece_type, square)] = value + eg_tables[piece_type][square]
+                self.mg[index(chess.BLACK, piece_type, square)] = -(value + mg_tables[piece_type][mirror])
+                self.eg[index(chess.BLACK, piece_type, square)] = -(value + eg_tables[piece_type][mirror])
+
+        # Identifies this configuration, e.g. to keep TT entries of different weights apart
+        digest = hashlib.blake2b(repr((self.mg, self.eg, draw_score)).encode(), digest_size=8).digest()
+        self.fingerprint = int.from_bytes(digest, "little")
+
+    def scores(self, board):
+        # Full scan, used once at the root
+        mg = 0
+        eg = 0
+        for color in chess.COLORS:
+            occupied = board.occupied_co[color]
+            for piece_type in chess.PIECE_TYPES:
+                base = index(color, piece_type, 0)
+                for square in chess.scan_forward(board.pieces_mask(piece_type, color) & occupied):
+                    mg += self.mg[base + square]
+                    eg += self.eg[base + square]
+        return mg, eg
+
+    def delta(self, board, move):
+        # Change of (mg, eg) when `move` is pushed. Call before board.push(move).
+        mg = self.mg
+        eg = self.eg
+        us = board.turn
+        from_sq = move.from_square
+        to_sq = move.to_square
+        piece_type = board.piece_type_at(from_sq)
+        ours = us * 448
+        theirs = (not us) * 448
+
+        removed = ours + piece_type * 64 + from_sq
+        d_mg = -mg[removed]
+        d_eg = -eg[removed]
+
+        if piece_type == chess.KING and (
+            board.occupied_co[us] & chess.BB_SQUARES[to_sq] or abs(to_sq - from_sq) == 2
+        ):
+            kingside = to_sq > from_sq
+            if board.occupied_co[us] & chess.BB_SQUARES[to_sq]:
+                rook_from = to_sq
+            else:
+                rook_from = from_sq + 3 if kingside else from_sq - 4
+            rank_base = chess.A1 if us == chess.WHITE else chess.A8
+            added = ours + chess.KING * 64 + rank_base + (6 if kingside else 2)
+            rook_to = ours + chess.ROOK * 64 + rank_base + (5 if kingside else 3)
+            rook_from = ours + chess.ROOK * 64 + rook_from
+            d_mg += mg[added] + mg[rook_to] - mg[rook_from]
+            d_eg += eg[added] + eg[rook_to] - eg[rook_from]
+            return d_mg, d_eg
+
+        captured = board.piece_type_at(to_sq)
+        if captured:
+            removed = theirs + captured * 64 + to_sq
+            d_mg -= mg[removed]
+            d_eg -= eg[removed]
+        elif piece_type == chess.PAWN and to_sq == board.ep_square:
+            removed = theirs + chess.PAWN * 64 + (to_sq - 8 if us == chess.WHITE else to_sq + 8)
+            d_mg -= mg[removed]
+            d_eg -= eg[removed]
+
+        added = ours + (move.promotion or piece_type) * 64 + to_sq
+        return d_mg + mg[added], d_eg + eg[added]
+
+    def blend(self, board, mg, eg):
+        return eg if is_endgame(board) else mg
+
+    def evaluate(self, board, scores=None):
+        # Full evaluation with the python-chess game-over rules.
+        # scores: the (mg, eg) sums if the caller keeps them up to date
+        if board.is_checkmate():
+            if board.turn:
+                return -MATE_SCORE # Black wins (White is checkmated)
+            else:
+                return MATE_SCORE # White wins
+
+        # Draw awareness
+        if board.is_stalemate() or board.is_insufficient_material() or board.is_fivefold_repetition() or board.is_seventyfive_moves():
+            return self.draw_score
+
+        # Can claim draw? (3-fold or 50-move)
+        if board.can_claim_draw():
+            return self.draw_score
+
+        if scores is None:
+            scores = self.scores(board)
+        return self.blend(board, *scores)
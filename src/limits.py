@@ -0,0 +1,79 @@
+import time
+
+# Search limits shared by the engines' iterative deepening drivers.
+# All times are in seconds.
+
+MAX_DEPTH = 64
+
+# How often (in nodes) the clock and stop signal are checked while searching
+CHECK_INTERVAL = 256
+
+# Fraction of the remaining clock to spend on one move, plus this share of the increment
+MOVES_TO_GO = 30
+INCREMENT_SHARE = 0.75
+# Never plan to use the last part of the clock
+CLOCK_RESERVE = 0.05
+
+
+class SearchAborted(Exception):
+    pass
+
+
+def allocate_time(movetime=None, clock=None, increment=0):
+    # Returns the time budget for one move, or None for no time limit
+    if movetime is not None:
+        return movetime
+    if clock is None:
+        return None
+    budget = clock / MOVES_TO_GO + increment * INCREMENT_SHARE
+    return max(0.01, min(budget, clock - CLOCK_RESERVE, clock * 0.5))
+
+
+class SearchLimits:
+    def __init__(self, depth=None, movetime=None, clock=None, increment=0, nodes=None, stop=None):
+        # stop: optional threading/multiprocessing Event that aborts the search when set
+        self.stop = stop
+        self.budget = allocate_time(movetime, clock, increment)
+        self.node_limit = nodes
+        if depth is None:
+            # A plain call keeps the old fixed depth of 3, any budget searches as deep as it can
+            depth = 3 if self.budget is None and nodes is None else MAX_DEPTH
+        self.depth = depth
+        self.start = time.time()
+        self.deadline = None if self.budget is None else self.start + self.budget
+        self.nodes = 0
+        self._next_check = self._check_point()
+
+    def count_node(self):
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._next_check = self._check_point()
+            self.check()
+
+    def _check_point(self):
+        point = self.nodes + CHECK_INTERVAL
+        if self.node_limit is not None:
+            point = min(point, self.node_limit)
+        return point
+
+    def check(self):
+        if self.stop is not None and self.stop.is_set():
+            raise SearchAborted()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted()
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise SearchAborted()
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def can_start_iteration(self):
+        # The next iteration usually costs several times the last one, so don't
+        # start it when more than half of the budget is already gone.
+        if self.deadline is not None and self.elapsed() >= self.budget * 0.5:
+            return False
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            return False
+        if self.stop is not None and self.stop.is_set():
+            return False
+        return True
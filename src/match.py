@@ -0,0 +1,226 @@
+import math
+import time
+import importlib
+
+import chess
+import chess.pgn
+
+import src.search as search
+import src.openings as openings
+from src.stats import SearchStats
+
+# Engine-vs-engine games and match statistics, shared by the arena's
+# tournaments and the training gym. Games are played by play_game() in
+# worker processes, so everything it takes and returns is picklable.
+
+# Games longer than this are adjudicated as draws
+MAX_PLIES = 400
+
+def parse_time_control(spec):
+    # "depth=3", "nodes=20000", "movetime=0.1" (seconds per move) or
+    # "<base>+<increment>" in seconds for a clock, e.g. "10+0.1"
+    if "=" in spec:
+        name, value = spec.split("=", 1)
+        if name == "depth":
+            return {"depth": int(value)}
+        if name == "nodes":
+            return {"nodes": int(value)}
+        if name == "movetime":
+            return {"movetime": float(value)}
+        raise ValueError(f"Unknown time control: {spec}")
+    base, _, increment = spec.partition("+")
+    return {"clock": float(base), "increment": float(increment or 0)}
+
+def describe_time_control(tc):
+    if "clock" in tc:
+        return f"{tc['clock']:g}+{tc['increment']:g}"
+    return ", ".join(f"{name}={value}" for name, value in tc.items())
+
+def load_openings(path=None):
+    # FENs from an EPD/FEN file (one position per line) or the final
+    # positions of the games in a PGN file. Without a file, the positions of
+    # the built-in opening book. A position given twice is kept once, so no
+    # game is played (and counted) twice.
+    if path is None:
+        return unique_positions(openings.OPENING_BOOK)
+    fens = []
+    with open(path) as f:
+        if path.lower().endswith(".pgn"):
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                fens.append(game.end().board().fen())
+        else:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    board = chess.Board(line)
+                except ValueError:
+                    board, _ = chess.Board.from_epd(line)
+                fens.append(board.fen())
+    return unique_positions(fens)
+
+def unique_positions(fens):
+    # First FEN of every position, ignoring the move counters
+    unique = {}
+    for fen in fens:
+        unique.setdefault(openings.position_key(fen), fen)
+    return list(unique.values())
+
+def play_game(job):
+    # job: (index, fen, players, time_controls, collect_stats) with players and
+    # time controls given as (white, black). A player is an engine module name
+    # in src/ or a (name, weights) pair for engines that take weights.
+    # Returns the result, the think time of every move of each side, the
+    # search score of every position from White's side and, with
+    # collect_stats, the SearchStats of each side's searches.
+    index, fen, players, time_controls, collect_stats = job
+    engines = []
+    for player in players:
+        name, weights = player if isinstance(player, tuple) else (player, None)
+        engines.append((importlib.import_module("src." + name), weights))
+    search.TRANSPOSITION_TABLE.clear()  # Every game starts from an empty table
+
+    board = chess.Board(fen)
+    clocks = [tc.get("clock") for tc in time_controls]
+    latencies = ([], [])
+    scores = []
+    stats = (SearchStats(), SearchStats()) if collect_stats else None
+    result = None
+    termination = None
+    while result is None:
+        outcome = board.outcome(claim_draw=True)
+        if outcome is not None:
+            result, termination = outcome.result(), outcome.termination.name.lower()
+            break
+        if len(board.move_stack) >= MAX_PLIES:
+            result, termination = "1/2-1/2", "max plies"
+            break
+
+        player = 0 if board.turn == chess.WHITE else 1
+        module, weights = engines[player]
+        tc = dict(time_controls[player])
+        if clocks[player] is not None:
+            tc["clock"] = clocks[player]
+        if weights is not None:
+            tc["weights"] = weights
+        if stats is not None:
+            tc["stats"] = SearchStats()
+        start = time.time()
+        # No book: both sides would follow it from every opening into the same games
+        searched = module.search_position(board, use_book=False, **tc)
+        duration = time.time() - start
+        move = searched.move
+        if stats is not None:
+            stats[player].merge(tc["stats"])
+        scores.append(searched.score if board.turn == chess.WHITE else -searched.score)
+        latencies[player].append(duration)
+        if clocks[player] is not None:
+            clocks[player] -= duration
+            if clocks[player] < 0:
+                result, termination = ("0-1" if player == 0 else "1-0"), "time forfeit"
+                break
+            clocks[player] += tc.get("increment", 0)
+        board.push(move)
+
+    search.flush_cache()  # Exit handlers don't run in pool workers
+    return {"index": index, "fen": fen, "result": result, "termination": termination, "moves": [m.uci() for m in board.move_stack], "latencies": latencies, "scores": scores, "stats": stats}
+
+def paired_jobs(first, second, games, fens, tc1, tc2, start_index=0, collect_stats=False):
+    # Two games per opening with the colors swapped, the first player is
+    # White in the games with an even index (start_index should be even)
+    jobs = []
+    for i in range(games):
+        fen = fens[(i // 2) % len(fens)]
+        if (start_index + i) % 2 == 0:
+            jobs.append((start_index + i, fen, (first, second), (tc1, tc2), collect_stats))
+        else:
+            jobs.append((start_index + i, fen, (second, first), (tc2, tc1), collect_stats))
+    return jobs
+
+def record_game(writer, game):
+    # Append the positions of a finished game to a dataset.DatasetWriter
+    moves = [chess.Move.from_uci(uci) for uci in game["moves"]]
+    writer.add_game(chess.Board(game["fen"]), moves, game["result"], game["scores"])
+
+def first_player_score(game):
+    # Score of the first player of a paired_jobs game
+    if game["result"] == "1/2-1/2":
+        return 0.5
+    first_is_white = game["index"] % 2 == 0
+    return 1.0 if (game["result"] == "1-0") == first_is_white else 0.0
+
+def game_to_pgn(game, names, event="Python Chess Bot Arena Tournament"):
+    board = chess.Board(game["fen"])
+    pgn = chess.pgn.Game()
+    pgn.headers["Event"] = event
+    pgn.headers["Round"] = str(game["index"] + 1)
+    pgn.headers["White"], pgn.headers["Black"] = names
+    pgn.headers["Result"] = game["result"]
+    pgn.headers["Termination"] = game["termination"]
+    if game["fen"] != chess.STARTING_FEN:
+        pgn.setup(board)
+    node = pgn
+    for uci in game["moves"]:
+        node = node.add_variation(chess.Move.from_uci(uci))
+    return pgn
+
+# Statistics
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def elo_from_score(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+def score_stats(wins, draws, losses):
+    # Mean score per game and its per-game variance
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+def clamp_score(score, games):
+    # Keeps a score half a game away from 0 and 1, where the Elo is infinite
+    bound = 1 / (2 * games)
+    return min(max(score, bound), 1 - bound)
+
+def elo_estimate(wins, draws, losses):
+    # Elo difference with the half width of its 95% confidence interval
+    games = wins + draws + losses
+    score, variance = score_stats(wins, draws, losses)
+    margin = 1.96 * math.sqrt(variance / games)
+    low = elo_from_score(clamp_score(score - margin, games))
+    high = elo_from_score(clamp_score(score + margin, games))
+    return elo_from_score(clamp_score(score, games)), (high - low) / 2
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    # Log-likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    score, variance = score_stats(wins, draws, losses)
+    if variance == 0:
+        # All games ended alike (a shutout or only draws): take the variance
+        # with half a win and half a loss more, so the test can still decide
+        variance = score_stats(wins + 0.5, draws, losses + 0.5)[1]
+    s0 = expected_score(elo0)
+    s1 = expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
@@ -1,3 +1,10 @@
+import os
+import sys
+import random
+
+import chess
+import chess.polyglot
+
 # Standard Chess Openings
 # Maps FEN (Forsyth-Edwards Notation) to the best move (SAN).
 # We use a simplified FEN (board part only) or full FEN if needed.
@@ -33,9 +40,72 @@ OPENING_BOOK = {
     # "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3": "Bc4", # Alternate to Ruy Lopez
 }
 
+# The dict is matched without the move counters, so transpositions and
+# positions reached after a different number of moves still hit.
+def position_key(fen):
+    return " ".join(fen.split()[:4])
+
+OPENING_POSITIONS = {position_key(fen): san for fen, san in OPENING_BOOK.items()}
+
+# Polyglot opening book (.bin), probed before the dict above. The file is
+# memory-mapped and binary-searched on the Polyglot Zobrist key by
+# python-chess, so a book of any size opens instantly and costs microseconds
+# per probe. A missing file just leaves the dict.
+BOOK_FILE = "book.bin"
+
+# "weighted": random move in proportion to the book weights, "best": heaviest move
+BOOK_MODE = "weighted"
+
+_READER = None
+_READER_PATH = None
+_RANDOM = random.Random()
+
+def set_book(path, mode=None):
+    # path: Polyglot book to use, or None for the dict only
+    global BOOK_FILE, BOOK_MODE
+    close_book()
+    BOOK_FILE = path
+    if mode is not None:
+        if mode not in ("weighted", "best"):
+            raise ValueError(f"Unknown book mode: {mode}")
+        BOOK_MODE = mode
+
+def close_book():
+    global _READER, _READER_PATH
+    if _READER is not None:
+        _READER.close()
+    _READER = None
+    _READER_PATH = None
+
+def _reader():
+    global _READER, _READER_PATH
+    if BOOK_FILE != _READER_PATH:
+        close_book()
+        _READER_PATH = BOOK_FILE
+        if BOOK_FILE and os.path.exists(BOOK_FILE):
+            try:
+                _READER = chess.polyglot.open_reader(BOOK_FILE)
+            except (OSError, ValueError) as e:
+                # stderr: under the UCI front-end stdout is the protocol
+                print(f"Error opening book {BOOK_FILE}: {e}", file=sys.stderr)
+    return _READER
+
+def book_move(board, mode=None):
+    # A legal move from the Polyglot book, or None when the position isn't in it
+    reader = _reader()
+    if reader is None:
+        return None
+    mode = mode or BOOK_MODE
+    try:
+        if mode == "best":
+            return reader.find(board).move
+        return reader.weighted_choice(board, random=_RANDOM).move
+    except IndexError:
+        return None
+
 def get_opening_move(board):
-    # Get FEN
-    fen = board.fen()
-    if fen in OPENING_BOOK:
-        return OPENING_BOOK[fen]
-    return None
+    # Book move in SAN, from the Polyglot book first and then the dict
+    move = book_move(board)
+    if move is not None:
+        return board.san(move)
+    return OPENING_POSITIONS.get(position_key(board.fen()))
@@ -0,0 +1,126 @@
+import chess
+
+from src.see import see
+
+# Move ordering
+# Moves are produced lazily in stages, so a cutoff on an early move never
+# pays for generating the rest:
+#   1. the hash move from the transposition table
+#   2. captures and promotions, most valuable victim / least valuable attacker first
+#   3. killer moves (quiet moves that caused a cutoff at the same ply)
+#   4. remaining quiet moves by history score
+#   5. captures that lose material by static exchange evaluation
+
+# Piece values used to spot losing captures, independent of the eval weights
+SEE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 20000,
+}
+
+MAX_PLY = 128
+HISTORY_LIMIT = 1 << 20
+
+
+def mvv_lva(board, move):
+    if board.is_en_passant(move):
+        victim = chess.PAWN
+    else:
+        victim = board.piece_type_at(move.to_square) or 0
+    score = victim * 8 - board.piece_type_at(move.from_square)
+    if move.promotion:
+        score += move.promotion * 8
+    return score
+
+
+def is_quiet(board, move):
+    return not move.promotion and not board.is_capture(move)
+
+
+class MoveOrdering:
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [0] * (2 * 64 * 64)
+
+    def new_search(self):
+        # Killers are position specific, history is kept but faded
+        for slot in self.killers:
+            slot[0] = slot[1] = None
+        history = self.history
+        for i in range(len(history)):
+            history[i] >>= 1
+
+    def record_cutoff(self, board, move, ply, depth):
+        # Called for a quiet move that failed high, before it is pushed
+        if ply < MAX_PLY:
+            slot = self.killers[ply]
+            if slot[0] != move:
+                slot[1] = slot[0]
+                slot[0] = move
+        i = (board.turn * 64 + move.from_square) * 64 + move.to_square
+        self.history[i] += depth * depth
+        if self.history[i] > HISTORY_LIMIT:
+            self.history = [value >> 1 for value in self.history]
+
+    def moves(self, board, ply, tt_move=None):
+        # Stage 1: hash move
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move
+        else:
+            tt_move = None
+
+        # Stage 2: captures and promotions
+        targets = board.occupied_co[not board.turn]
+        if board.ep_square is not None:
+            targets |= chess.BB_SQUARES[board.ep_square]
+        back_rank = chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+        promoting = board.pawns & board.occupied_co[board.turn] & back_rank
+        if promoting:
+            targets |= chess.BB_RANK_8 if board.turn == chess.WHITE else chess.BB_RANK_1
+
+        tactical = []
+        for move in board.generate_legal_moves(chess.BB_ALL, targets):
+            if move == tt_move:
+                continue
+            if not move.promotion and not board.is_capture(move):
+                continue  # A quiet move onto the ep square or the last rank, tried with the quiets
+            tactical.append((mvv_lva(board, move), move))
+        tactical.sort(key=lambda item: item[0], reverse=True)
+
+        losing = []
+        for _, move in tactical:
+            # Only captures by a more valuable piece can lose material
+            attacker = board.piece_type_at(move.from_square)
+            victim = board.piece_type_at(move.to_square)
+            if victim and not move.promotion and SEE_VALUES[attacker] > SEE_VALUES[victim] and see(board, move, SEE_VALUES) < 0:
+                losing.append(move)
+                continue
+            yield move
+
+        # Stage 3: killers
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        tried = [tt_move]
+        for killer in killers:
+            if killer is not None and killer not in tried and is_quiet(board, killer) and board.is_legal(killer):
+                tried.append(killer)
+                yield killer
+
+        # Stage 4: quiet moves by history
+        history = self.history
+        base = board.turn * 4096
+        quiets = []
+        # Own pieces stay in the mask: castling is generated as the king moving onto its rook
+        for move in board.generate_legal_moves(chess.BB_ALL, ~board.occupied_co[not board.turn]):
+            if move.promotion or move in tried or board.is_en_passant(move):
+                continue
+            quiets.append((history[base + move.from_square * 64 + move.to_square], move))
+        quiets.sort(key=lambda item: item[0], reverse=True)
+        for _, move in quiets:
+            yield move
+
+        # Stage 5: losing captures
+        for move in losing:
+            yield move
@@ -0,0 +1,619 @@
+import chess
+
+import src.zobrist as zobrist
+
+# Lean position for the search
+# The search makes and unmakes millions of moves, and python-chess pays for
+# its generality on every one of them: push() snapshots the whole board
+# state, piece_type_at() tests six bitboards and move generation goes
+# through layers of generators. Position keeps the same int bitboards and
+# attribute names as chess.Board (pawns ... kings, occupied_co, occupied,
+# turn, ep_square, castling_rights, halfmove_clock), so the evaluation, SEE,
+# move ordering and bitbase code work on either, and adds:
+#   - a mailbox (piece type per square) for O(1) piece lookups
+#   - push()/pop() that change only what the move touches, with a small
+#     undo tuple per ply
+#   - the Polyglot Zobrist key of the position in `key`, updated by push()
+#   - legal move generation that builds lists and only runs the full safety
+#     test for king moves, pinned pieces and en passant
+# Moves are chess.Move objects in standard notation (castling is the king
+# moving two squares), generated in the same order as python-chess.
+# Positions are standard chess only and are converted from and to
+# chess.Board at the root with from_board() and to_board().
+
+PAWN = chess.PAWN
+KNIGHT = chess.KNIGHT
+BISHOP = chess.BISHOP
+ROOK = chess.ROOK
+QUEEN = chess.QUEEN
+KING = chess.KING
+WHITE = chess.WHITE
+BLACK = chess.BLACK
+
+Move = chess.Move
+
+BB_ALL = chess.BB_ALL
+BB_SQUARES = chess.BB_SQUARES
+BB_RANK_1 = chess.BB_RANK_1
+BB_RANK_8 = chess.BB_RANK_8
+BB_BACKRANKS = chess.BB_BACKRANKS
+BB_KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+BB_KING_ATTACKS = chess.BB_KING_ATTACKS
+BB_PAWN_ATTACKS = chess.BB_PAWN_ATTACKS
+BB_RANK_ATTACKS = chess.BB_RANK_ATTACKS
+BB_FILE_ATTACKS = chess.BB_FILE_ATTACKS
+BB_DIAG_ATTACKS = chess.BB_DIAG_ATTACKS
+BB_RANK_MASKS = chess.BB_RANK_MASKS
+BB_FILE_MASKS = chess.BB_FILE_MASKS
+BB_DIAG_MASKS = chess.BB_DIAG_MASKS
+BB_RAYS = chess.BB_RAYS
+BB_LIGHT_SQUARES = chess.BB_LIGHT_SQUARES
+BB_DARK_SQUARES = chess.BB_DARK_SQUARES
+
+# BETWEEN[a][b]: squares strictly between a and b when they share a line
+BETWEEN = [[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES]
+
+PROMOTIONS = [QUEEN, ROOK, BISHOP, KNIGHT]
+
+# Ranks pawns of each color may capture en passant from
+EP_RANKS = [chess.BB_RANK_4, chess.BB_RANK_5]
+
+# Castling: (king from, king to, rook from, rook to) by rook square
+CASTLING = {
+    chess.H1: (chess.E1, chess.G1, chess.H1, chess.F1),
+    chess.A1: (chess.E1, chess.C1, chess.A1, chess.D1),
+    chess.H8: (chess.E8, chess.G8, chess.H8, chess.F8),
+    chess.A8: (chess.E8, chess.C8, chess.A8, chess.D8),
+}
+ROOK_SQUARE = {(king_to, king_from): rook_from for rook_from, (king_from, king_to, _, _) in CASTLING.items()}
+
+PIECE_KEYS = zobrist.PIECE_KEYS
+TURN_KEY = zobrist.TURN_KEY
+ep_key = zobrist.ep_key
+castling_key = zobrist.castling_key
+
+
+class Position:
+    def __init__(self):
+        self.pawns = 0
+        self.knights = 0
+        self.bishops = 0
+        self.rooks = 0
+        self.queens = 0
+        self.kings = 0
+        self.occupied_co = [0, 0]
+        self.occupied = 0
+        self.types = [0] * 64  # Piece type on every square, 0 when empty
+        self.turn = WHITE
+        self.castling_rights = 0
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.key = 0
+        self.move_stack = []
+        self._undo = []
+
+    @classmethod
+    def from_board(cls, board):
+        position = cls()
+        for piece_type in chess.PIECE_TYPES:
+            for color in chess.COLORS:
+                for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                    position._put(piece_type, color, square)
+        position.turn = board.turn
+        position.castling_rights = board.clean_castling_rights()
+        position.ep_square = board.ep_square
+        position.halfmove_clock = board.halfmove_clock
+        position.fullmove_number = board.fullmove_number
+        position.key = zobrist.hash_board(board)
+        return position
+
+    def to_board(self):
+        board = chess.Board(None)
+        for square in chess.scan_forward(self.occupied):
+            board.set_piece_at(square, chess.Piece(self.types[square], self.color_at(square)))
+        board.turn = self.turn
+        board.castling_rights = self.castling_rights
+        board.ep_square = self.ep_square
+        board.halfmove_clock = self.halfmove_clock
+        board.fullmove_number = self.fullmove_number
+        return board
+
+    def fen(self):
+        return self.to_board().fen()
+
+    def __repr__(self):
+        return f"Position({self.fen()!r})"
+
+    def _put(self, piece_type, color, square):
+        mask = BB_SQUARES[square]
+        self._toggle(piece_type, mask)
+        self.occupied_co[color] |= mask
+        self.occupied |= mask
+        self.types[square] = piece_type
+        self.key ^= PIECE_KEYS[color][piece_type][square]
+
+    def _toggle(self, piece_type, mask):
+        if piece_type == PAWN:
+            self.pawns ^= mask
+        elif piece_type == KNIGHT:
+            self.knights ^= mask
+        elif piece_type == BISHOP:
+            self.bishops ^= mask
+        elif piece_type == ROOK:
+            self.rooks ^= mask
+        elif piece_type == QUEEN:
+            self.queens ^= mask
+        else:
+            self.kings ^= mask
+
+    # Queries, with the same meaning as on chess.Board
+
+    def piece_type_at(self, square):
+        return self.types[square]
+
+    def color_at(self, square):
+        mask = BB_SQUARES[square]
+        if self.occupied_co[WHITE] & mask:
+            return WHITE
+        if self.occupied_co[BLACK] & mask:
+            return BLACK
+        return None
+
+    def pieces_mask(self, piece_type, color):
+        if piece_type == PAWN:
+            bb = self.pawns
+        elif piece_type == KNIGHT:
+            bb = self.knights
+        elif piece_type == BISHOP:
+            bb = self.bishops
+        elif piece_type == ROOK:
+            bb = self.rooks
+        elif piece_type == QUEEN:
+            bb = self.queens
+        else:
+            bb = self.kings
+        return bb & self.occupied_co[color]
+
+    def king(self, color):
+        bb = self.kings & self.occupied_co[color]
+        return bb.bit_length() - 1 if bb else None
+
+    def attackers_mask(self, color, square, occupied=None):
+        if occupied is None:
+            occupied = self.occupied
+        queens_and_rooks = self.queens | self.rooks
+        queens_and_bishops = self.queens | self.bishops
+        attackers = (
+            (BB_KING_ATTACKS[square] & self.kings)
+            | (BB_KNIGHT_ATTACKS[square] & self.knights)
+            | (BB_RANK_ATTACKS[square][BB_RANK_MASKS[square] & occupied] & queens_and_rooks)
+            | (BB_FILE_ATTACKS[square][BB_FILE_MASKS[square] & occupied] & queens_and_rooks)
+            | (BB_DIAG_ATTACKS[square][BB_DIAG_MASKS[square] & occupied] & queens_and_bishops)
+            | (BB_PAWN_ATTACKS[not color][square] & self.pawns)
+        )
+        return attackers & self.occupied_co[color]
+
+    def is_attacked_by(self, color, square):
+        return bool(self.attackers_mask(color, square))
+
+    def is_check(self):
+        king = self.kings & self.occupied_co[self.turn]
+        return bool(king and self.attackers_mask(not self.turn, king.bit_length() - 1))
+
+    def is_en_passant(self, move):
+        to_sq = move.to_square
+        return (
+            to_sq == self.ep_square
+            and self.types[move.from_square] == PAWN
+            and abs(to_sq - move.from_square) in (7, 9)
+            and not self.occupied & BB_SQUARES[to_sq]
+        )
+
+    def is_capture(self, move):
+        return bool(BB_SQUARES[move.to_square] & self.occupied_co[not self.turn]) or self.is_en_passant(move)
+
+    def is_castling(self, move):
+        return self.types[move.from_square] == KING and abs(move.to_square - move.from_square) == 2
+
+    def is_insufficient_material(self):
+        return self._insufficient(WHITE) and self._insufficient(BLACK)
+
+    def _insufficient(self, color):
+        # Same rules as chess.Board.has_insufficient_material
+        ours = self.occupied_co[color]
+        if ours & (self.pawns | self.rooks | self.queens):
+            return False
+        if ours & self.knights:
+            return chess.popcount(ours) <= 2 and not (self.occupied_co[not color] & ~self.kings & ~self.queens)
+        if ours & self.bishops:
+            same_color = (not self.bishops & BB_DARK_SQUARES) or (not self.bishops & BB_LIGHT_SQUARES)
+            return same_color and not self.pawns and not self.knights
+        return True
+
+    # Make and unmake
+
+    def push(self, move):
+        from_sq = move.from_square
+        to_sq = move.to_square
+        us = self.turn
+        them = not us
+        types = self.types
+        occupied_co = self.occupied_co
+        ep = self.ep_square
+        captured = types[to_sq]
+        self._undo.append((captured, self.castling_rights, ep, self.halfmove_clock, self.key))
+        self.move_stack.append(move)
+
+        key = self.key ^ TURN_KEY
+        if ep is not None:
+            key ^= ep_key(ep, self.pawns & occupied_co[us])
+        self.ep_square = None
+        self.turn = them
+        if us == BLACK:
+            self.fullmove_number += 1
+
+        if from_sq == to_sq:
+            # Null move
+            self.halfmove_clock += 1
+            self.key = key
+            return
+
+        piece = types[from_sq]
+        from_bb = BB_SQUARES[from_sq]
+        to_bb = BB_SQUARES[to_sq]
+        self.halfmove_clock += 1
+
+        self._toggle(piece, from_bb)
+        occupied_co[us] ^= from_bb
+        types[from_sq] = 0
+        key ^= PIECE_KEYS[us][piece][from_sq]
+
+        if captured:
+            self._toggle(captured, to_bb)
+            occupied_co[them] ^= to_bb
+            key ^= PIECE_KEYS[them][captured][to_sq]
+            self.halfmove_clock = 0
+
+        placed = piece
+        if piece == PAWN:
+            self.halfmove_clock = 0
+            if to_sq == ep and not captured:
+                capture_sq = to_sq - 8 if us == WHITE else to_sq + 8
+                capture_bb = BB_SQUARES[capture_sq]
+                self.pawns ^= capture_bb
+                occupied_co[them] ^= capture_bb
+                types[capture_sq] = 0
+                key ^= PIECE_KEYS[them][PAWN][capture_sq]
+            elif move.promotion:
+                placed = move.promotion
+        elif piece == KING and abs(to_sq - from_sq) == 2:
+            _, _, rook_from, rook_to = CASTLING[ROOK_SQUARE[to_sq, from_sq]]
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            self.rooks ^= rook_bb
+            occupied_co[us] ^= rook_bb
+            types[rook_from] = 0
+            types[rook_to] = ROOK
+            key ^= PIECE_KEYS[us][ROOK][rook_from] ^ PIECE_KEYS[us][ROOK][rook_to]
+
+        self._toggle(placed, to_bb)
+        occupied_co[us] ^= to_bb
+        types[to_sq] = placed
+        key ^= PIECE_KEYS[us][placed][to_sq]
+        self.occupied = occupied_co[WHITE] | occupied_co[BLACK]
+
+        rights = self.castling_rights
+        if rights:
+            new_rights = rights & ~from_bb & ~to_bb
+            if piece == KING:
+                new_rights &= ~(BB_RANK_1 if us == WHITE else BB_RANK_8)
+            if new_rights != rights:
+                key ^= castling_key(rights) ^ castling_key(new_rights)
+                self.castling_rights = new_rights
+
+        if piece == PAWN and abs(to_sq - from_sq) == 16:
+            self.ep_square = (from_sq + to_sq) >> 1
+            key ^= ep_key(self.ep_square, self.pawns & occupied_co[them])
+        self.key = key
+
+    def pop(self):
+        move = self.move_stack.pop()
+        captured, self.castling_rights, ep, self.halfmove_clock, self.key = self._undo.pop()
+        self.ep_square = ep
+        them = self.turn
+        us = not them
+        self.turn = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+
+        from_sq = move.from_square
+        to_sq = move.to_square
+        if from_sq == to_sq:
+            return move
+
+        types = self.types
+        occupied_co = self.occupied_co
+        from_bb = BB_SQUARES[from_sq]
+        to_bb = BB_SQUARES[to_sq]
+        placed = types[to_sq]
+        piece = PAWN if move.promotion else placed
+
+        self._toggle(placed, to_bb)
+        self._toggle(piece, from_bb)
+        occupied_co[us] ^= to_bb | from_bb
+        types[from_sq] = piece
+        types[to_sq] = captured
+
+        if captured:
+            self._toggle(captured, to_bb)
+            occupied_co[them] ^= to_bb
+        elif piece == PAWN and to_sq == ep:
+            capture_sq = to_sq - 8 if us == WHITE else to_sq + 8
+            capture_bb = BB_SQUARES[capture_sq]
+            self.pawns ^= capture_bb
+            occupied_co[them] ^= capture_bb
+            types[capture_sq] = PAWN
+        elif piece == KING and abs(to_sq - from_sq) == 2:
+            _, _, rook_from, rook_to = CASTLING[ROOK_SQUARE[to_sq, from_sq]]
+            rook_bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            self.rooks ^= rook_bb
+            occupied_co[us] ^= rook_bb
+            types[rook_to] = 0
+            types[rook_from] = ROOK
+        self.occupied = occupied_co[WHITE] | occupied_co[BLACK]
+        return move
+
+    # Move generation
+
+    def attacks_mask(self, square):
+        piece_type = self.types[square]
+        if piece_type == KNIGHT:
+            return BB_KNIGHT_ATTACKS[square]
+        if piece_type == PAWN:
+            return BB_PAWN_ATTACKS[bool(self.occupied_co[WHITE] & BB_SQUARES[square])][square]
+        if piece_type == KING:
+            return BB_KING_ATTACKS[square]
+        occupied = self.occupied
+        attacks = 0
+        if piece_type != ROOK:
+            attacks = BB_DIAG_ATTACKS[square][BB_DIAG_MASKS[square] & occupied]
+        if piece_type != BISHOP:
+            attacks |= BB_RANK_ATTACKS[square][BB_RANK_MASKS[square] & occupied] | BB_FILE_ATTACKS[square][BB_FILE_MASKS[square] & occupied]
+        return attacks
+
+    def generate_pseudo_legal_moves(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        # As a list, in the order python-chess generates them
+        us = self.turn
+        ours = self.occupied_co[us]
+        moves = []
+        append = moves.append
+
+        pieces = ours & ~self.pawns & from_mask
+        while pieces:
+            from_sq = pieces.bit_length() - 1
+            pieces ^= BB_SQUARES[from_sq]
+            targets = self.attacks_mask(from_sq) & ~ours & to_mask
+            while targets:
+                to_sq = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_sq]
+                append(Move(from_sq, to_sq))
+
+        if from_mask & self.kings and self.castling_rights:
+            self._castling_moves(from_mask, to_mask, moves)
+
+        pawns = self.pawns & ours & from_mask
+        if not pawns:
+            return moves
+        occupied = self.occupied
+
+        theirs = self.occupied_co[not us] & to_mask
+        pawn_attacks = BB_PAWN_ATTACKS[us]
+        capturers = pawns
+        while capturers:
+            from_sq = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_sq]
+            targets = pawn_attacks[from_sq] & theirs
+            while targets:
+                to_sq = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_sq]
+                if BB_SQUARES[to_sq] & BB_BACKRANKS:
+                    for promotion in PROMOTIONS:
+                        append(Move(from_sq, to_sq, promotion))
+                else:
+                    append(Move(from_sq, to_sq))
+
+        if us == WHITE:
+            single = pawns << 8 & ~occupied
+            double = single << 8 & ~occupied & chess.BB_RANK_4
+            step = 8
+        else:
+            single = pawns >> 8 & ~occupied
+            double = single >> 8 & ~occupied & chess.BB_RANK_5
+            step = -8
+        single &= to_mask
+        double &= to_mask
+        while single:
+            to_sq = single.bit_length() - 1
+            single ^= BB_SQUARES[to_sq]
+            from_sq = to_sq - step
+            if BB_SQUARES[to_sq] & BB_BACKRANKS:
+                for promotion in PROMOTIONS:
+                    append(Move(from_sq, to_sq, promotion))
+            else:
+                append(Move(from_sq, to_sq))
+        while double:
+            to_sq = double.bit_length() - 1
+            double ^= BB_SQUARES[to_sq]
+            append(Move(to_sq - 2 * step, to_sq))
+
+        if self.ep_square is not None:
+            self._ep_moves(from_mask, to_mask, moves)
+        return moves
+
+    def _ep_moves(self, from_mask, to_mask, moves):
+        ep = self.ep_square
+        if not BB_SQUARES[ep] & to_mask or BB_SQUARES[ep] & self.occupied:
+            return
+        us = self.turn
+        capturers = self.pawns & self.occupied_co[us] & from_mask & BB_PAWN_ATTACKS[not us][ep] & EP_RANKS[us]
+        while capturers:
+            from_sq = capturers.bit_length() - 1
+            capturers ^= BB_SQUARES[from_sq]
+            moves.append(Move(from_sq, ep))
+
+    def _castling_moves(self, from_mask, to_mask, moves):
+        # Castling is allowed for a rook square in to_mask, like python-chess
+        us = self.turn
+        them = not us
+        backrank = BB_RANK_1 if us == WHITE else BB_RANK_8
+        candidates = self.castling_rights & backrank & to_mask & self.rooks & self.occupied_co[us]
+        while candidates:
+            rook_sq = candidates.bit_length() - 1
+            candidates ^= BB_SQUARES[rook_sq]
+            king_from, king_to, rook_from, rook_to = CASTLING[rook_sq]
+            if self.types[king_from] != KING or not BB_SQUARES[king_from] & from_mask & self.occupied_co[us]:
+                continue
+            king_bb = BB_SQUARES[king_from]
+            path = BETWEEN[king_from][rook_from]
+            if self.occupied & path:
+                continue
+            # The king may not be in check, pass through or land on an attacked square
+            king_path = BETWEEN[king_from][king_to] | BB_SQUARES[king_to] | king_bb
+            occupied = self.occupied ^ king_bb
+            attacked = False
+            while king_path:
+                square = king_path.bit_length() - 1
+                king_path ^= BB_SQUARES[square]
+                if self.attackers_mask(them, square, occupied):
+                    attacked = True
+                    break
+            if not attacked:
+                moves.append(Move(king_from, king_to))
+
+    def _slider_blockers(self, king):
+        # Our pieces that are the only piece between our king and an enemy slider
+        rooks_and_queens = self.rooks | self.queens
+        bishops_and_queens = self.bishops | self.queens
+        snipers = (
+            (BB_RANK_ATTACKS[king][0] & rooks_and_queens)
+            | (BB_FILE_ATTACKS[king][0] & rooks_and_queens)
+            | (BB_DIAG_ATTACKS[king][0] & bishops_and_queens)
+        ) & self.occupied_co[not self.turn]
+        blockers = 0
+        occupied = self.occupied
+        while snipers:
+            sniper = snipers.bit_length() - 1
+            snipers ^= BB_SQUARES[sniper]
+            between = BETWEEN[king][sniper] & occupied
+            if between and between & (between - 1) == 0:
+                blockers |= between
+        return blockers & self.occupied_co[self.turn]
+
+    def _ep_is_safe(self, move):
+        # En passant removes two pieces from a line, just try it
+        self.push(move)
+        safe = not self.attackers_mask(self.turn, self.king(not self.turn))
+        self.pop()
+        return safe
+
+    def _filter(self, moves, king, blockers):
+        # The pseudo-legal moves that don't leave our king attacked (not in check)
+        legal = []
+        ep = self.ep_square
+        them = not self.turn
+        for move in moves:
+            from_sq = move.from_square
+            if from_sq == king:
+                if abs(move.to_square - from_sq) == 2 or not self.attackers_mask(them, move.to_square):
+                    legal.append(move)
+            elif ep is not None and move.to_square == ep and self.types[from_sq] == PAWN and abs(ep - from_sq) != 8:
+                if self._ep_is_safe(move):
+                    legal.append(move)
+            elif not blockers & BB_SQUARES[from_sq] or BB_RAYS[from_sq][move.to_square] & BB_SQUARES[king]:
+                legal.append(move)
+        return legal
+
+    def generate_legal_moves(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        us = self.turn
+        king_bb = self.kings & self.occupied_co[us]
+        king = king_bb.bit_length() - 1
+        blockers = self._slider_blockers(king)
+        checkers = self.attackers_mask(not us, king)
+        if not checkers:
+            return self._filter(self.generate_pseudo_legal_moves(from_mask, to_mask), king, blockers)
+
+        # Evasions: king moves off the checking lines, or with a single
+        # checker, captures of it and interpositions
+        attacked = 0
+        sliders = checkers & (self.bishops | self.rooks | self.queens)
+        while sliders:
+            checker = sliders.bit_length() - 1
+            sliders ^= BB_SQUARES[checker]
+            attacked |= BB_RAYS[king][checker] & ~BB_SQUARES[checker]
+        moves = []
+        if king_bb & from_mask:
+            targets = BB_KING_ATTACKS[king] & ~self.occupied_co[us] & ~attacked & to_mask
+            while targets:
+                to_sq = targets.bit_length() - 1
+                targets ^= BB_SQUARES[to_sq]
+                moves.append(Move(king, to_sq))
+        checker = checkers.bit_length() - 1
+        if BB_SQUARES[checker] == checkers:
+            target = BETWEEN[king][checker] | checkers
+            moves.extend(self.generate_pseudo_legal_moves(~self.kings & from_mask, target & to_mask))
+            ep = self.ep_square
+            if ep is not None and not BB_SQUARES[ep] & target and ep + (-8 if us == WHITE else 8) == checker:
+                self._ep_moves(from_mask, to_mask, moves)
+        return self._filter(moves, king, blockers)
+
+    def generate_legal_captures(self, from_mask=BB_ALL, to_mask=BB_ALL):
+        moves = self.generate_legal_moves(from_mask, to_mask & self.occupied_co[not self.turn])
+        ep = self.ep_square
+        if ep is not None and BB_SQUARES[ep] & to_mask:
+            ep_moves = []
+            self._ep_moves(from_mask, to_mask, ep_moves)
+            moves.extend(move for move in ep_moves if self._ep_is_safe(move))
+        return moves
+
+    @property
+    def legal_moves(self):
+        return self.generate_legal_moves()
+
+    def is_legal(self, move):
+        # For moves from elsewhere (the TT, killers): the same move must be
+        # among the legal moves between its two squares
+        from_sq = move.from_square
+        to_sq = move.to_square
+        if from_sq == to_sq or not BB_SQUARES[from_sq] & self.occupied_co[self.turn]:
+            return False
+        to_mask = BB_SQUARES[to_sq]
+        if self.types[from_sq] == KING and abs(to_sq - from_sq) == 2:
+            rook_sq = ROOK_SQUARE.get((to_sq, from_sq))
+            if rook_sq is None:
+                return False
+            to_mask = BB_SQUARES[rook_sq]
+        return move in self.generate_legal_moves(BB_SQUARES[from_sq], to_mask)
+
+
+def perft(position, depth):
+    # Number of leaf nodes of the legal move tree, counted with bulk counting
+    # at the last ply
+    moves = position.generate_legal_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        position.push(move)
+        nodes += perft(position, depth - 1)
+        position.pop()
+    return nodes
+
+
+def divide(position, depth):
+    # Perft per root move, to find which move a wrong count comes from
+    counts = {}
+    for move in position.generate_legal_moves():
+        position.push(move)
+        counts[move.uci()] = perft(position, depth - 1)
+        position.pop()
+    return counts
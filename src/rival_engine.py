@@ -1,5 +1,8 @@
 import chess
-import math
+
+import src.search as search
+from src.evaluation import Evaluator
+from src.limits import SearchLimits
 
 # Rival Personality: Aggressive
 # Values attacking pieces slightly more to encourage active play.
@@ -90,118 +93,32 @@ KING_TABLE_END = [
     -50,-30,-30,-30,-30,-30,-30,-50
 ]
 
+PIECE_TABLES_MID = {
+    chess.PAWN: PAWN_TABLE,
+    chess.KNIGHT: KNIGHT_TABLE,
+    chess.BISHOP: BISHOP_TABLE,
+    chess.ROOK: ROOK_TABLE,
+    chess.QUEEN: QUEEN_TABLE,
+    chess.KING: KING_TABLE_MID,
+}
+PIECE_TABLES_END = dict(PIECE_TABLES_MID)
+PIECE_TABLES_END[chess.KING] = KING_TABLE_END
+
+# Rival is aggressive: Dislikes draws more than standard engine
+DRAW_SCORE = -50 # Slight penalty for draw (from the rival's side), prefers to win
+
+EVALUATOR = Evaluator(PIECE_VALUES, PIECE_TABLES_MID, PIECE_TABLES_END, DRAW_SCORE)
+
 def evaluate_board(board):
-    if board.is_checkmate():
-        if board.turn:
-            return -99999 # Black wins (White is checkmated)
-        else:
-            return 99999 # White wins
-
-    # Rival is aggressive: Dislikes draws more than standard engine
-    if board.is_stalemate() or board.is_insufficient_material() or board.is_fivefold_repetition() or board.is_seventyfive_moves():
-        return -50 # Slight penalty for draw, prefers to win
-
-    if board.can_claim_draw():
-        return -50
-
-    score = 0
-    
-    white_queens = len(board.pieces(chess.QUEEN, chess.WHITE))
-    black_queens = len(board.pieces(chess.QUEEN, chess.BLACK))
-    minor_pieces = len(board.pieces(chess.KNIGHT, chess.WHITE)) + len(board.pieces(chess.BISHOP, chess.WHITE)) + \
-                   len(board.pieces(chess.KNIGHT, chess.BLACK)) + len(board.pieces(chess.BISHOP, chess.BLACK))
-    
-    is_endgame = (white_queens == 0 and black_queens == 0) or (white_queens == 1 and black_queens == 1 and minor_pieces <= 4)
-
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            value = PIECE_VALUES[piece.piece_type]
-            
-            pst_score = 0
-            if piece.piece_type == chess.PAWN:
-                pst_score = PAWN_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else PAWN_TABLE[square]
-            elif piece.piece_type == chess.KNIGHT:
-                pst_score = KNIGHT_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else KNIGHT_TABLE[square]
-            elif piece.piece_type == chess.BISHOP:
-                pst_score = BISHOP_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else BISHOP_TABLE[square]
-            elif piece.piece_type == chess.ROOK:
-                pst_score = ROOK_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else ROOK_TABLE[square]
-            elif piece.piece_type == chess.QUEEN:
-                pst_score = QUEEN_TABLE[chess.square_mirror(square)] if piece.color == chess.BLACK else QUEEN_TABLE[square]
-            elif piece.piece_type == chess.KING:
-                table = KING_TABLE_END if is_endgame else KING_TABLE_MID
-                pst_score = table[chess.square_mirror(square)] if piece.color == chess.BLACK else table[square]
-
-            if piece.color == chess.WHITE:
-                score += value + pst_score
-            else:
-                score -= value + pst_score
-    
-    return score
-
-def minimax(board, depth, alpha, beta, maximizing_player):
-    if board.is_checkmate():
-        return -99999 + depth if maximizing_player else 99999 - depth
-
-    if depth == 0 or board.is_game_over():
-        return evaluate_board(board)
-
-    if maximizing_player:
-        max_eval = -math.inf
-        moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-        
-        for move in moves:
-            board.push(move)
-            eval = minimax(board, depth - 1, alpha, beta, False)
-            board.pop()
-            max_eval = max(max_eval, eval)
-            alpha = max(alpha, eval)
-            if beta <= alpha:
-                break
-        return max_eval
-    else:
-        min_eval = math.inf
-        moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-        
-        for move in moves:
-            board.push(move)
-            eval = minimax(board, depth - 1, alpha, beta, True)
-            board.pop()
-            min_eval = min(min_eval, eval)
-            beta = min(beta, eval)
-            if beta <= alpha:
-                break
-        return min_eval
-
-def get_best_move(board, depth=3):
-    best_move = None
-    max_eval = -math.inf
-    min_eval = math.inf
-    
-    maximizing_player = board.turn == chess.WHITE
-    
+    return EVALUATOR.evaluate(board)
+
+# Same search as the standard engine, only the evaluation differs
+SEARCHER = search.Searcher()
+
+def search_position(board, depth=None, movetime=None, clock=None, increment=0, nodes=None, on_info=None, use_book=True, stats=None):
+    limits = SearchLimits(depth, movetime, clock, increment, nodes)
+    return SEARCHER.search(board, EVALUATOR, limits, use_book=use_book, on_info=on_info, stats=stats)
+
+def get_best_move(board, depth=None, movetime=None, clock=None, increment=0, nodes=None, stats=None):
     # No print statement to keep arena clean
-    
-    moves = sorted(board.legal_moves, key=lambda move: board.is_capture(move), reverse=True)
-    
-    alpha = -math.inf
-    beta = math.inf
-    
-    for move in moves:
-        board.push(move)
-        eval = minimax(board, depth - 1, alpha, beta, not maximizing_player)
-        board.pop()
-        
-        if maximizing_player:
-            if eval > max_eval:
-                max_eval = eval
-                best_move = move
-            alpha = max(alpha, eval)
-        else:
-            if eval < min_eval:
-                min_eval = eval
-                best_move = move
-            beta = min(beta, eval)
-            
-    return best_move
+    return search_position(board, depth, movetime, clock, increment, nodes, stats=stats).move
@@ -0,0 +1,700 @@
+import atexit
+
+import chess
+
+import src.openings as openings
+import src.zobrist as zobrist
+import src.tt as tt
+import src.smp as smp
+import src.bitbase as bitbase
+import src.stats as search_stats
+import src.cache as cache
+from src.position import Position
+from src.evaluation import MATE_SCORE
+from src.see import see, capture_value
+from src.ordering import MoveOrdering, MAX_PLY, mvv_lva, is_quiet
+from src.limits import SearchLimits, SearchAborted
+
+# Search kernel shared by every engine personality.
+# A negamax alpha-beta search with quiescence, a transposition table and staged
+# move ordering. What makes the personalities differ is the Evaluator passed
+# in, so a speedup here applies to all of them at once. The tree is searched
+# on a position.Position built from the root chess.Board, which also keeps
+# the Zobrist key up to date as moves are made.
+
+INFINITY = MATE_SCORE + 1
+NULL_MOVE = chess.Move.null()
+# Scores beyond this are mates, stored in the TT relative to the node
+MATE_BOUND = MATE_SCORE - MAX_PLY
+
+# Quiescence: captures whose best outcome still can't reach alpha by this margin are skipped
+DELTA_MARGIN = 200
+
+# Null move pruning: used from this depth, reduced by 2 plies (3 from NULL_MOVE_DEEP)
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_DEEP = 7
+
+# Aspiration windows: from this depth the root is searched in a window of
+# ASPIRATION_WINDOW around the previous score, widened on every fail
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_WINDOW = 40
+
+# Late move reductions: quiet moves after the first few are reduced by 1 ply,
+# by 2 when deep in the tree and very late in the move list
+LMR_MIN_DEPTH = 3
+LMR_MOVES = 3
+LMR_PV_MOVES = 5
+LMR_DEEP_MOVES = 10
+
+# Transposition Table
+# One fixed-size table for all searches. Keys are salted with the evaluator's
+# fingerprint so positions scored with different weights never mix.
+TT_SIZE_MB = 16
+TRANSPOSITION_TABLE = tt.TranspositionTable(TT_SIZE_MB)
+
+# A nonzero draw score is contempt for the side to move at the root, so draws
+# score the other way round with the other color at the root. Searches for
+# Black salt their keys with this too and never reuse White's draw scores.
+CONTEMPT_KEY = 0x9E3779B97F4A7C15
+
+
+# Lazy SMP helper processes (None when searching on one core)
+THREADS = 1
+_HELPERS = None
+
+# Persistent analysis cache shared with other processes (None when off).
+# Besides the root, the positions this many plies down the PV are stored.
+ANALYSIS_CACHE = None
+CACHE_PV_PLIES = 2
+
+
+def set_hash_size(size_mb):
+    global TT_SIZE_MB
+    TT_SIZE_MB = size_mb
+    if _HELPERS is not None:
+        set_threads(THREADS)  # Rebuilds the shared table at the new size
+    else:
+        TRANSPOSITION_TABLE.resize(size_mb)
+
+
+def set_threads(threads):
+    # Number of processes searching each move, the main search included
+    global THREADS, _HELPERS
+    THREADS = max(1, threads)
+    if _HELPERS is not None:
+        TRANSPOSITION_TABLE.resize(TT_SIZE_MB)
+        _HELPERS.close()
+        _HELPERS = None
+    if THREADS > 1:
+        _HELPERS = smp.HelperPool(THREADS - 1, TT_SIZE_MB)
+        TRANSPOSITION_TABLE.resize(TT_SIZE_MB, _HELPERS.buffer)
+
+
+def set_cache(path, max_entries=cache.MAX_ENTRIES):
+    # Look up and store search results in the cache file at `path`, None turns it off
+    global ANALYSIS_CACHE
+    if ANALYSIS_CACHE is not None:
+        ANALYSIS_CACHE.close()
+    ANALYSIS_CACHE = None if path is None else cache.AnalysisCache(path, max_entries)
+
+
+def flush_cache():
+    # Write the results the cache holds back, e.g. at the end of a game in a
+    # worker process, where exit handlers don't run
+    if ANALYSIS_CACHE is not None:
+        ANALYSIS_CACHE.flush()
+
+
+@atexit.register
+def _shutdown_helpers():
+    if _HELPERS is not None:
+        set_threads(1)
+    if ANALYSIS_CACHE is not None:
+        ANALYSIS_CACHE.close()
+
+
+def key_salt(evaluator, root_color):
+    # XORed into every TT and analysis cache key of a search
+    if evaluator.draw_score and root_color == chess.BLACK:
+        return evaluator.fingerprint ^ CONTEMPT_KEY
+    return evaluator.fingerprint
+
+
+def score_to_tt(score, ply):
+    # Mate scores are stored as distance from this node rather than from the root
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def quiescence_moves(board):
+    # Captures and promotions only
+    moves = list(board.generate_legal_captures())
+    back_rank = chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+    promoting = board.pawns & board.occupied_co[board.turn] & back_rank
+    if promoting:
+        for move in board.generate_legal_moves(promoting, ~board.occupied):
+            if move.promotion:
+                moves.append(move)
+    return moves
+
+
+def mate_in(score):
+    # Moves to mate for a mate score (negative when getting mated), else None
+    if score > MATE_BOUND:
+        return (MATE_SCORE - score + 1) // 2
+    if score < -MATE_BOUND:
+        return -((MATE_SCORE + score + 1) // 2)
+    return None
+
+
+class SearchResult:
+    def __init__(self, move, score=0, depth=0, nodes=0, time=0.0, book=False, pv=None, seldepth=0, stats=None):
+        self.move = move
+        self.score = score  # From the side to move's point of view
+        self.depth = depth
+        self.seldepth = seldepth
+        self.nodes = nodes
+        self.time = time
+        self.book = book
+        self.pv = pv if pv is not None else ([move] if move else [])
+        self.stats = stats  # The SearchStats the search filled, if one was given
+
+    @property
+    def nps(self):
+        return int(self.nodes / self.time) if self.time > 0 else 0
+
+    def info(self):
+        # Search info in the shape the on_info callback receives
+        return {
+            "depth": self.depth,
+            "seldepth": self.seldepth,
+            "score": self.score,
+            "mate": mate_in(self.score),
+            "nodes": self.nodes,
+            "nps": self.nps,
+            "time": self.time,
+            "pv": list(self.pv),
+        }
+
+
+class Searcher:
+    def __init__(self, table=None):
+        self.tt = table if table is not None else TRANSPOSITION_TABLE
+        self.ordering = MoveOrdering()  # Killer and history tables, kept between searches
+        self.board = None  # The position.Position being searched
+        self.evaluator = None
+        self.salt = 0  # key_salt() of the search, XORed into every key
+        self.limits = None
+        self.root_color = chess.WHITE
+        self.keys = []  # Zobrist keys of the positions leading to the current node
+        self.seldepth = 0
+        self.stats = None
+
+    def clear(self):
+        # Forget everything earlier searches learned (new game, benchmarks)
+        self.tt.clear()
+        self.ordering = MoveOrdering()
+
+    def search(self, board, evaluator, limits=None, use_book=True, helper=0, on_info=None, stats=None):
+        # helper: index of a Lazy SMP helper process, 0 for the main search
+        # on_info: called with SearchResult.info() after every completed iteration
+        # stats: optional stats.SearchStats to fill (the helpers' work isn't counted)
+        if limits is None:
+            limits = SearchLimits()
+
+        # Check Opening Book
+        if use_book:
+            book_move_san = openings.get_opening_move(board)
+            if book_move_san:
+                return SearchResult(board.parse_san(book_move_san), book=True, stats=stats)
+
+        analysis = ANALYSIS_CACHE if not helper else None
+        if analysis is not None:
+            entry = analysis.probe(zobrist.hash_board(board), key_salt(evaluator, board.turn), limits.depth)
+            # The legality test guards against the rare key collision
+            if entry is not None and entry[2] and board.is_legal(entry[2][0]):
+                depth, score, pv = entry
+                result = SearchResult(pv[0], score, depth, 0, limits.elapsed(), pv=pv, stats=stats)
+                if on_info is not None:
+                    on_info(result.info())
+                return result
+
+        if stats is not None:
+            result = self._instrumented_search(board, evaluator, limits, helper, on_info, stats)
+        else:
+            result = self._search(board, evaluator, limits, helper, on_info)
+        if analysis is not None and result.depth:
+            self._store_analysis(analysis, board, evaluator, result)
+        return result
+
+    def _search(self, board, evaluator, limits, helper, on_info):
+        position = Position.from_board(board)
+        self.board = position
+        self.evaluator = evaluator
+        self.salt = key_salt(evaluator, board.turn)
+        self.limits = limits
+        self.root_color = board.turn
+        if not helper:
+            self.tt.new_search()
+        self.ordering.new_search()
+
+        root_key = position.key ^ self.salt
+        self.keys = self._history_keys(board, self.salt)
+        mg, eg = evaluator.scores(position)
+        entry = self.tt.probe(root_key)
+        moves = list(self.ordering.moves(position, 0, tt.decode_move(entry[3]) if entry else None))
+        if not moves:
+            return SearchResult(None, stats=self.stats)
+
+        # Helpers diversify: odd ones skip depth 1 and each starts from a
+        # different root move.
+        first_depth = 1
+        if helper:
+            first_depth += helper % 2
+            shift = helper % len(moves)
+            moves = moves[shift:] + moves[:shift]
+
+        # An instrumented search runs on wrappers, the helpers get what's inside
+        helpers = _HELPERS if not helper and search_stats.unwrapped(self.tt) is TRANSPOSITION_TABLE else None
+        if helpers is not None:
+            helpers.start(board, search_stats.unwrapped(evaluator), limits.depth, self.tt.age)
+
+        # Iterative deepening: every completed iteration moves its best move to the
+        # front for the next one, and an aborted iteration is thrown away.
+        result = SearchResult(moves[0])
+        score = 0
+        try:
+            for depth in range(first_depth, limits.depth + 1):
+                self.seldepth = 0
+                try:
+                    move, score = self._aspiration(depth, moves, root_key, mg, eg, score)
+                except SearchAborted:
+                    # Unwind the moves the aborted iteration left on the board
+                    while position.move_stack:
+                        position.pop()
+                    break
+                result = SearchResult(
+                    move, score, depth, limits.nodes, limits.elapsed(),
+                    pv=self._principal_variation(position, root_key, move, depth),
+                    seldepth=self.seldepth, stats=self.stats,
+                )
+                if self.stats is not None:
+                    self.stats.iteration_nodes.append(limits.nodes)
+                if on_info is not None:
+                    on_info(result.info())
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(score) > MATE_BOUND and MATE_SCORE - abs(score) <= depth:
+                    break  # Found a mate we can't improve on by going deeper
+                if not limits.can_start_iteration():
+                    break
+        finally:
+            if helpers is not None:
+                helpers.finish()
+            self.board = None
+            self.limits = None
+
+        result.nodes = limits.nodes
+        result.time = limits.elapsed()
+        return result
+
+    def _instrumented_search(self, board, evaluator, limits, helper, on_info, stats):
+        # The same search with the table, evaluator and move ordering wrapped to
+        # count (and with profiling, time) what they do
+        saved = self.tt, self.ordering
+        self.stats = stats
+        self.tt = search_stats.CountingTable(self.tt, stats)
+        if stats.profile:
+            self.ordering = search_stats.TimedOrdering(self.ordering, stats)
+        nodes = limits.nodes
+        stats.iteration_nodes = []
+        try:
+            return self._search(board, search_stats.CountingEvaluator(evaluator, stats), limits, helper, on_info)
+        finally:
+            self.tt, self.ordering = saved
+            self.stats = None
+            stats.nodes += limits.nodes - nodes
+            stats.finish_search()
+
+    def _store_analysis(self, analysis, board, evaluator, result):
+        # The root result and the positions at the start of its PV: each was
+        # searched one ply less deep, with the score seen from its side. With
+        # contempt, only the positions with the root side to move are stored:
+        # their draw scores are right for a search from there.
+        board = board.copy(stack=False)
+        salt = key_salt(evaluator, board.turn)
+        score = result.score
+        for ply in range(min(CACHE_PV_PLIES + 1, len(result.pv), result.depth)):
+            if ply % 2 == 0 or not evaluator.draw_score:
+                analysis.store(zobrist.hash_board(board), salt, result.depth - ply, score, result.pv[ply:])
+            board.push(result.pv[ply])
+            score = -score_to_tt(score, 1)
+
+    def _history_keys(self, board, salt):
+        # Keys of the game positions before the root that a search position could
+        # still repeat: those since the last capture or pawn move. The full
+        # python-chess rules are only used here, at the root.
+        history = []
+        previous = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            previous.pop()
+            history.append(zobrist.hash_board(previous) ^ salt)
+        history.reverse()
+        return history
+
+    def _aspiration(self, depth, moves, key, mg, eg, previous):
+        # Search the root in a narrow window around the previous iteration's
+        # score, widening it on the side that failed until the score fits.
+        if depth < ASPIRATION_MIN_DEPTH or abs(previous) > MATE_BOUND:
+            return self._root(depth, moves, key, mg, eg, -INFINITY, INFINITY)
+
+        window = ASPIRATION_WINDOW
+        alpha = max(previous - window, -INFINITY)
+        beta = min(previous + window, INFINITY)
+        while True:
+            move, score = self._root(depth, moves, key, mg, eg, alpha, beta)
+            if score <= alpha:
+                alpha = max(score - window, -INFINITY)
+            elif score >= beta:
+                beta = min(score + window, INFINITY)
+                # The move that failed high is the best we know of, try it first
+                moves.remove(move)
+                moves.insert(0, move)
+            else:
+                return move, score
+            window *= 2
+            if window > 1000:
+                alpha = -INFINITY
+                beta = INFINITY
+
+    def _principal_variation(self, board, key, move, depth):
+        # Follow the best moves stored in the TT from the root
+        pv = [move]
+        seen = {key}
+        board.push(move)
+        key = board.key ^ self.salt
+        try:
+            while len(pv) < max(depth, 1) + 8 and key not in seen:
+                seen.add(key)
+                entry = self.tt.probe(key)
+                if entry is None:
+                    break
+                next_move = tt.decode_move(entry[3])
+                if next_move is None or not board.is_legal(next_move):
+                    break
+                pv.append(next_move)
+                board.push(next_move)
+                key = board.key ^ self.salt
+        finally:
+            for _ in pv:
+                board.pop()
+        return pv
+
+    def _root(self, depth, moves, key, mg, eg, alpha, beta):
+        board = self.board
+        evaluator = self.evaluator
+        alpha_orig = alpha
+        best_score = -INFINITY
+        best_move = None
+        searched = 0
+
+        self.keys.append(key)
+        salt = self.salt
+        for move in moves:
+            d_mg, d_eg = evaluator.delta(board, move)
+            board.push(move)
+            child_key = board.key ^ salt
+            if best_move is None:
+                score = -self._negamax(depth - 1, -beta, -alpha, 1, child_key, mg + d_mg, eg + d_eg)
+            else:
+                score = -self._negamax(depth - 1, -alpha - 1, -alpha, 1, child_key, mg + d_mg, eg + d_eg)
+                if alpha < score < beta:
+                    score = -self._negamax(depth - 1, -beta, -alpha, 1, child_key, mg + d_mg, eg + d_eg)
+            board.pop()
+            searched += 1
+            if score > best_score or best_move is None:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.keys.pop()
+        if self.stats is not None:
+            self.stats.expand(0, searched, searched if best_score >= beta else 0)
+
+        if best_score <= alpha_orig:
+            flag = tt.UPPER
+        elif best_score >= beta:
+            flag = tt.LOWER
+        else:
+            flag = tt.EXACT
+        self.tt.store(key, depth, score_to_tt(best_score, 0), flag, tt.encode_move(best_move))
+        return best_move, best_score
+
+    def _evaluate(self, mg, eg):
+        # Static eval from the side to move's point of view
+        board = self.board
+        score = self.evaluator.blend(board, mg, eg)
+        return score if board.turn == chess.WHITE else -score
+
+    def _draw_score(self):
+        # The evaluator's draw score is a contempt factor for the side we search for
+        score = self.evaluator.draw_score
+        return score if self.board.turn == self.root_color else -score
+
+    def _bitbase_score(self, ply):
+        # Exact score of a three piece ending from the local bitbases, with the
+        # distance to mate so the winning side makes progress
+        entry = bitbase.probe(self.board)
+        if entry is None:
+            return None
+        if self.stats is not None:
+            self.stats.bitbase_hits += 1
+        result, plies = entry
+        if result == 0:
+            return self._draw_score()
+        return result * (MATE_SCORE - ply - plies)
+
+    def _is_repetition(self, key, halfmove_clock):
+        # Only positions since the last capture or pawn move can repeat, and
+        # only those with the same side to move: every second key back from
+        # four plies ago down to the one the irreversible move reached.
+        keys = self.keys
+        i = len(keys) - 4
+        stop = max(len(keys) - halfmove_clock, 0)
+        while i >= stop:
+            if keys[i] == key:
+                return True
+            i -= 2
+        return False
+
+    def _negamax(self, depth, alpha, beta, ply, key, mg, eg):
+        self.limits.count_node()
+        board = self.board
+        if ply > self.seldepth:
+            self.seldepth = ply
+
+        # Draws that the game rules would let either side claim. A single
+        # repetition inside the search already counts, the opponent could
+        # repeat again.
+        halfmove_clock = board.halfmove_clock
+        if (
+            (halfmove_clock >= 4 and self._is_repetition(key, halfmove_clock))
+            or (halfmove_clock >= 100 and not board.is_check())
+            or (not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material())
+        ):
+            if self.stats is not None:
+                self.stats.rule_draws += 1
+            return self._draw_score()
+        if ply and chess.popcount(board.occupied) == 3:
+            score = self._bitbase_score(ply)
+            if score is not None:
+                return score
+
+        # Transposition Table Lookup
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_score, tt_depth, tt_flag, tt_move_value = entry
+            if tt_depth >= depth:
+                tt_score = score_from_tt(tt_score, ply)
+                if (
+                    tt_flag == tt.EXACT
+                    or (tt_flag == tt.LOWER and tt_score >= beta)
+                    or (tt_flag == tt.UPPER and tt_score <= alpha)
+                ):
+                    if self.stats is not None:
+                        self.stats.tt_cutoffs += 1
+                    return tt_score
+            tt_move = tt.decode_move(tt_move_value)
+
+        in_check = board.is_check()
+        if in_check:
+            depth += 1  # Check extension: don't let a check push a threat past the horizon
+
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self._quiescence(alpha, beta, ply, mg, eg, 0)
+
+        pv_node = beta - alpha > 1
+
+        # Null move pruning: if passing the move still fails high, a real move
+        # would too. Not in check, not in PV nodes, and not when the side to
+        # move has only pawns, where zugzwang makes passing unrealistically good.
+        if (
+            not pv_node
+            and not in_check
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and abs(beta) < MATE_BOUND
+            and (board.knights | board.bishops | board.rooks | board.queens) & board.occupied_co[board.turn]
+            and self._evaluate(mg, eg) >= beta
+        ):
+            reduction = NULL_MOVE_REDUCTION + (depth >= NULL_MOVE_DEEP)
+            # Repetitions across a null move aren't real, start a fresh key history
+            saved_keys = self.keys
+            self.keys = []
+            board.push(NULL_MOVE)
+            null_key = board.key ^ self.salt
+            score = -self._negamax(depth - 1 - reduction, -beta, -beta + 1, ply + 1, null_key, mg, eg)
+            board.pop()
+            self.keys = saved_keys
+            stats = self.stats
+            if stats is not None:
+                stats.null_tries += 1
+                stats.null_cutoffs += score >= beta
+            if score >= beta:
+                return beta if score >= MATE_BOUND else score
+
+        evaluator = self.evaluator
+        ordering = self.ordering
+        alpha_orig = alpha
+        best_score = -INFINITY
+        best_move = None
+        move_count = 0
+
+        salt = self.salt
+        keys = self.keys
+        keys.append(key)
+        for move in ordering.moves(board, ply, tt_move):
+            move_count += 1
+            quiet = is_quiet(board, move)
+            d_mg, d_eg = evaluator.delta(board, move)
+            child_mg = mg + d_mg
+            child_eg = eg + d_eg
+            board.push(move)
+            child_key = board.key ^ salt
+
+            if move_count == 1:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, child_key, child_mg, child_eg)
+            else:
+                # Late move reductions: quiet moves ordered late rarely matter,
+                # search them shallower first and only re-search if they surprise us.
+                reduction = 0
+                if (
+                    quiet
+                    and depth >= LMR_MIN_DEPTH
+                    and move_count > (LMR_PV_MOVES if pv_node else LMR_MOVES)
+                    and not in_check
+                    and not board.is_check()
+                ):
+                    reduction = 1 + (depth >= 6 and move_count > LMR_DEEP_MOVES)
+                    if self.stats is not None:
+                        self.stats.reductions += 1
+
+                # Principal variation search: prove the move is no better than
+                # alpha with a zero window, re-search with the full window if not.
+                score = -self._negamax(depth - 1 - reduction, -alpha - 1, -alpha, ply + 1, child_key, child_mg, child_eg)
+                if reduction and score > alpha:
+                    if self.stats is not None:
+                        self.stats.re_searches += 1
+                    score = -self._negamax(depth - 1, -alpha - 1, -alpha, ply + 1, child_key, child_mg, child_eg)
+                if alpha < score < beta:
+                    score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, child_key, child_mg, child_eg)
+
+            board.pop()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if quiet:
+                            ordering.record_cutoff(board, move, ply, depth)
+                        break
+        keys.pop()
+
+        stats = self.stats
+        if best_move is None:
+            # No legal moves: mate or stalemate, known from the moves we just generated
+            if board.is_check():
+                if stats is not None:
+                    stats.mates += 1
+                return -(MATE_SCORE - ply)
+            if stats is not None:
+                stats.stalemates += 1
+            return self._draw_score()
+        if stats is not None:
+            stats.expand(ply, move_count, move_count if best_score >= beta else 0)
+
+        # Store in TT with the kind of bound the alpha-beta window gives us
+        if best_score <= alpha_orig:
+            flag = tt.UPPER
+        elif best_score >= beta:
+            flag = tt.LOWER
+        else:
+            flag = tt.EXACT
+        self.tt.store(key, depth, score_to_tt(best_score, ply), flag, tt.encode_move(best_move))
+        return best_score
+
+    def _quiescence(self, alpha, beta, ply, mg, eg, qply):
+        # Resolve captures at the horizon so the static eval is only trusted in quiet positions
+        self.limits.count_node()
+        board = self.board
+        evaluator = self.evaluator
+        if self.stats is not None:
+            self.stats.qnodes += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+
+        if qply and chess.popcount(board.occupied) == 3:
+            score = self._bitbase_score(ply)
+            if score is not None:
+                return score
+
+        if qply == 0 and board.is_check():
+            # No standing pat when the horizon node is in check: every evasion is
+            # searched. Deeper in quiescence this would blow up the tree, so there
+            # checks are treated like any other position.
+            moves = list(board.legal_moves)
+            if not moves:
+                if self.stats is not None:
+                    self.stats.mates += 1
+                return -(MATE_SCORE - ply)
+            best_score = -INFINITY
+        else:
+            stand_pat = self._evaluate(mg, eg)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            best_score = stand_pat
+
+            values = evaluator.values
+            moves = []
+            for move in quiescence_moves(board):
+                # Delta pruning: even winning the piece for free doesn't get us back into the window
+                if stand_pat + capture_value(board, move, values) + DELTA_MARGIN <= alpha:
+                    continue
+                # Skip captures that lose material
+                if see(board, move, values) < 0:
+                    continue
+                moves.append((mvv_lva(board, move), move))
+            moves.sort(key=lambda item: item[0], reverse=True)
+            moves = [move for _, move in moves]
+
+        for move in moves:
+            d_mg, d_eg = evaluator.delta(board, move)
+            board.push(move)
+            score = -self._quiescence(-beta, -alpha, ply + 1, mg + d_mg, eg + d_eg, qply + 1)
+            board.pop()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        return best_score
+
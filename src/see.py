@@ -0,0 +1,72 @@
+import chess
+
+# Static Exchange Evaluation
+# Plays out the capture sequence on one square, always recapturing with the
+# least valuable piece, and returns the material balance for the side making
+# the first capture. Sliders behind the capturing pieces (x-rays) join in as
+# the squares in front of them are vacated.
+
+
+def attackers(board, square, occupied):
+    # Pieces of both colors attacking `square` given the `occupied` mask
+    queens_and_rooks = board.queens | board.rooks
+    queens_and_bishops = board.queens | board.bishops
+    attacks = (
+        (chess.BB_KING_ATTACKS[square] & board.kings)
+        | (chess.BB_KNIGHT_ATTACKS[square] & board.knights)
+        | (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied] & queens_and_rooks)
+        | (chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied] & queens_and_rooks)
+        | (chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied] & queens_and_bishops)
+        | (chess.BB_PAWN_ATTACKS[chess.BLACK][square] & board.pawns & board.occupied_co[chess.WHITE])
+        | (chess.BB_PAWN_ATTACKS[chess.WHITE][square] & board.pawns & board.occupied_co[chess.BLACK])
+    )
+    return attacks & occupied
+
+
+def capture_value(board, move, values):
+    # Material won by the move itself, including a promotion
+    if board.is_en_passant(move):
+        gain = values[chess.PAWN]
+    else:
+        gain = values.get(board.piece_type_at(move.to_square), 0)
+    if move.promotion:
+        gain += values[move.promotion] - values[chess.PAWN]
+    return gain
+
+
+def see(board, move, values):
+    # values: piece type -> material value
+    from_sq = move.from_square
+    to_sq = move.to_square
+
+    gains = [capture_value(board, move, values)]
+    occupied = board.occupied & ~chess.BB_SQUARES[from_sq]
+    if board.is_en_passant(move):
+        occupied &= ~chess.BB_SQUARES[to_sq - 8 if board.turn == chess.WHITE else to_sq + 8]
+
+    # Value of the piece now standing on the target square
+    on_square = values[move.promotion or board.piece_type_at(from_sq)]
+    side = not board.turn
+    attacking = attackers(board, to_sq, occupied)
+
+    while True:
+        ours = attacking & board.occupied_co[side]
+        if not ours:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = ours & board.pieces_mask(piece_type, side)
+            if candidates:
+                break
+        if piece_type == chess.KING and attacking & board.occupied_co[not side]:
+            break  # The king can't recapture into a defended square
+
+        gains.append(on_square - gains[-1])
+        on_square = values[piece_type]
+        occupied &= ~chess.BB_SQUARES[chess.lsb(candidates)]
+        attacking = attackers(board, to_sq, occupied)
+        side = not side
+
+    # Either side may stop capturing when continuing would lose material
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
@@ -0,0 +1,106 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import chess
+
+import src.tt as tt
+
+# Lazy SMP
+# Helper processes search the same root as the main search, all reading and
+# writing one transposition table in shared memory. Nothing is locked: entries
+# are verified with their XOR-ed key, so a torn write just reads as a miss.
+# Helpers start at staggered depths and with rotated root moves so they fill
+# the table with different subtrees, which the main search then picks up.
+
+# Spawn works the same on every platform and doesn't fork a thread-holding parent
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def table_bytes(size_mb):
+    return tt.buckets_for_size(size_mb) * tt.BUCKET_ENTRIES * tt.ENTRY_BYTES
+
+
+def _helper_main(index, shm_name, size_mb, jobs, done, stop):
+    import src.search as search
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    table = tt.TranspositionTable(size_mb, shm.buf)
+    searcher = search.Searcher(table)
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            fen, moves, evaluator, depth, age = job
+            table.age = age
+            board = chess.Board(fen)
+            for uci in moves:
+                board.push_uci(uci)
+            limits = search.SearchLimits(depth=depth, stop=stop)
+            try:
+                searcher.search(board, evaluator, limits, use_book=False, helper=index)
+            finally:
+                done.put(index)
+    finally:
+        del searcher, table
+        shm.close()
+
+
+class HelperPool:
+    def __init__(self, helpers, size_mb):
+        self.helpers = helpers
+        self.size_mb = size_mb
+        self.shm = shared_memory.SharedMemory(create=True, size=table_bytes(size_mb))
+        self.stop = _CONTEXT.Event()
+        self.done = _CONTEXT.Queue()
+        self.jobs = []
+        self.processes = []
+        self.running = 0
+        for index in range(1, helpers + 1):
+            jobs = _CONTEXT.Queue()
+            process = _CONTEXT.Process(
+                target=_helper_main,
+                args=(index, self.shm.name, size_mb, jobs, self.done, self.stop),
+                daemon=True,
+            )
+            process.start()
+            self.jobs.append(jobs)
+            self.processes.append(process)
+
+    @property
+    def buffer(self):
+        return self.shm.buf
+
+    def start(self, board, evaluator, depth, age):
+        # Send the root to every helper. The root is passed as the starting FEN
+        # plus moves so helpers see the game history for repetitions.
+        root = board.root()
+        moves = [move.uci() for move in board.move_stack]
+        self.stop.clear()
+        for jobs in self.jobs:
+            jobs.put((root.fen(), moves, evaluator, depth, age))
+        self.running = len(self.jobs)
+
+    def finish(self):
+        # Stop the helpers and wait until none of them writes to the table anymore
+        self.stop.set()
+        while self.running:
+            self.done.get()
+            self.running -= 1
+        self.stop.clear()
+
+    def close(self):
+        # Whoever maps the table must have dropped it before the memory is released
+        if self.shm is None:
+            return
+        if self.running:
+            self.finish()
+        for jobs in self.jobs:
+            jobs.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
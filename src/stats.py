@@ -0,0 +1,262 @@
+import time
+
+# Search instrumentation
+# A SearchStats passed to a search is filled with counters of what the search
+# did: TT probes, hits and cutoffs, beta cutoffs and on which move they came,
+# eval calls, positions ended by the rules, pruning decisions and how many
+# moves were searched at every ply. Without one the search only pays for a
+# few `is None` tests on rare paths.
+#
+# With profile=True the table, the evaluator and the move ordering are also
+# wrapped for the search so every call is timed. The times go through
+# add_time(section, seconds), which a subclass can override to send them
+# elsewhere (a sampling profiler, a log). Timing costs a lot of speed, so
+# nodes per second measured with it on are meaningless.
+
+# Cutoffs on later moves than this are counted together
+CUTOFF_MOVES = 16
+
+# Sections of the profile
+MOVEGEN = "movegen"
+EVAL = "eval"
+TT = "tt"
+
+
+class SearchStats:
+    def __init__(self, profile=False):
+        self.profile = profile
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.eval_calls = 0
+        self.beta_cutoffs = 0
+        self.cutoff_moves = [0] * (CUTOFF_MOVES + 1)  # Index: move number of the cutoff (capped)
+        self.null_tries = 0
+        self.null_cutoffs = 0
+        self.reductions = 0
+        self.re_searches = 0
+        self.mates = 0
+        self.stalemates = 0
+        self.rule_draws = 0
+        self.bitbase_hits = 0
+        self.expanded = []  # Nodes whose moves were searched, per ply
+        self.moves_searched = []  # Moves searched at those nodes, per ply
+        self.iteration_nodes = []  # Nodes of the current search when each iteration finished
+        self.ebf_total = 0.0  # Sum and count of the effective branching factors of the searches
+        self.ebf_searches = 0
+        self.timings = {}  # Section -> [calls, seconds]
+
+    def expand(self, ply, moves, cutoff_move=0):
+        # A node searched `moves` moves, the last one failing high if cutoff_move
+        while len(self.expanded) <= ply:
+            self.expanded.append(0)
+            self.moves_searched.append(0)
+        self.expanded[ply] += 1
+        self.moves_searched[ply] += moves
+        if cutoff_move:
+            self.beta_cutoffs += 1
+            self.cutoff_moves[min(cutoff_move, CUTOFF_MOVES)] += 1
+
+    def finish_search(self):
+        # Growth of the tree over the last two iterations of the search just
+        # finished, averaged over the searches in effective_branching_factor()
+        nodes = self.iteration_nodes
+        if len(nodes) >= 2:
+            previous = nodes[-2] - (nodes[-3] if len(nodes) > 2 else 0)
+            if previous:
+                self.ebf_total += (nodes[-1] - nodes[-2]) / previous
+                self.ebf_searches += 1
+        self.iteration_nodes = []
+
+    def add_time(self, section, seconds):
+        timing = self.timings.get(section)
+        if timing is None:
+            timing = self.timings[section] = [0, 0.0]
+        timing[0] += 1
+        timing[1] += seconds
+
+    def merge(self, other):
+        # Add the counts of another SearchStats, e.g. of every move of a game
+        for name, value in vars(other).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                setattr(self, name, getattr(self, name) + value)
+        for mine, theirs in ((self.expanded, other.expanded), (self.moves_searched, other.moves_searched)):
+            mine.extend([0] * (len(theirs) - len(mine)))
+            for ply, value in enumerate(theirs):
+                mine[ply] += value
+        for i, value in enumerate(other.cutoff_moves):
+            self.cutoff_moves[i] += value
+        for section, (calls, seconds) in other.timings.items():
+            timing = self.timings.setdefault(section, [0, 0.0])
+            timing[0] += calls
+            timing[1] += seconds
+        return self
+
+    # Derived figures
+
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def first_move_cutoff_rate(self):
+        # Share of beta cutoffs on the first move searched: how good the ordering is
+        return self.cutoff_moves[1] / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    def branching_factor(self, ply=None):
+        # Average number of moves searched per expanded node
+        if ply is None:
+            expanded = sum(self.expanded)
+            searched = sum(self.moves_searched)
+        elif ply < len(self.expanded):
+            expanded = self.expanded[ply]
+            searched = self.moves_searched[ply]
+        else:
+            return 0.0
+        return searched / expanded if expanded else 0.0
+
+    def effective_branching_factor(self):
+        # Growth of the tree per extra iteration
+        return self.ebf_total / self.ebf_searches if self.ebf_searches else 0.0
+
+    def summary(self):
+        # The figures worth a glance, as a flat dict
+        return {
+            "nodes": self.nodes,
+            "qnodes": self.qnodes,
+            "tt_hit_rate": self.tt_hit_rate(),
+            "tt_cutoffs": self.tt_cutoffs,
+            "eval_calls": self.eval_calls,
+            "beta_cutoffs": self.beta_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "branching_factor": self.branching_factor(),
+            "effective_branching_factor": self.effective_branching_factor(),
+            "null_cutoff_rate": self.null_cutoffs / self.null_tries if self.null_tries else 0.0,
+            "re_search_rate": self.re_searches / self.reductions if self.reductions else 0.0,
+            "terminals": self.mates + self.stalemates + self.rule_draws + self.bitbase_hits,
+        }
+
+    def status(self):
+        # Short one-line form for status bars
+        return (
+            f"TT hits {self.tt_hit_rate():.0%} | 1st-move cutoffs {self.first_move_cutoff_rate():.0%}"
+            f" | BF {self.branching_factor():.1f}"
+        )
+
+    def report(self):
+        # Multi-line human readable report
+        nodes = max(self.nodes, 1)
+        lines = [
+            f"Nodes: {self.nodes} ({self.qnodes} quiescence)",
+            f"TT: {self.tt_probes} probes, {self.tt_hit_rate():.1%} hits, {self.tt_cutoffs} cutoffs",
+            f"Eval calls: {self.eval_calls} ({self.eval_calls / nodes:.2f} per node)",
+            f"Beta cutoffs: {self.beta_cutoffs}, {self.first_move_cutoff_rate():.1%} on the first move",
+            "Cutoff move: " + " ".join(
+                f"{i}{'+' if i == CUTOFF_MOVES else ''}:{count}" for i, count in enumerate(self.cutoff_moves) if count
+            ),
+            f"Null move: {self.null_tries} tries, {self.null_cutoffs} cutoffs",
+            f"LMR: {self.reductions} reductions, {self.re_searches} re-searched",
+            f"Terminal: {self.mates} mates, {self.stalemates} stalemates, {self.rule_draws} rule draws, {self.bitbase_hits} bitbase hits",
+            f"Branching factor: {self.branching_factor():.2f} (effective {self.effective_branching_factor():.2f})",
+            "By ply: " + " ".join(f"{ply}:{self.branching_factor(ply):.1f}" for ply in range(len(self.expanded))),
+        ]
+        for section, (calls, seconds) in sorted(self.timings.items()):
+            lines.append(f"Time in {section}: {seconds:.3f}s over {calls} calls ({seconds / calls * 1e6:.1f}us each)")
+        return lines
+
+
+# Wrappers installed for the duration of an instrumented search
+
+def unwrapped(obj):
+    # The table, evaluator or ordering inside a wrapper, e.g. to hand the real
+    # ones to the Lazy SMP helpers
+    if isinstance(obj, CountingTable):
+        return obj._table
+    if isinstance(obj, CountingEvaluator):
+        return obj._evaluator
+    if isinstance(obj, TimedOrdering):
+        return obj._ordering
+    return obj
+
+
+class CountingTable:
+    # Counts (and with profiling, times) the probes and stores of a table
+    def __init__(self, table, stats):
+        self._table = table
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._table, name)
+
+    def probe(self, key):
+        stats = self._stats
+        stats.tt_probes += 1
+        if stats.profile:
+            start = time.perf_counter()
+            entry = self._table.probe(key)
+            stats.add_time(TT, time.perf_counter() - start)
+        else:
+            entry = self._table.probe(key)
+        if entry is not None:
+            stats.tt_hits += 1
+        return entry
+
+    def store(self, *args):
+        stats = self._stats
+        if stats.profile:
+            start = time.perf_counter()
+            self._table.store(*args)
+            stats.add_time(TT, time.perf_counter() - start)
+        else:
+            self._table.store(*args)
+
+
+class CountingEvaluator:
+    # Counts the static evaluations; with profiling, times them and the
+    # incremental updates
+    def __init__(self, evaluator, stats):
+        self._evaluator = evaluator
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._evaluator, name)
+
+    def blend(self, board, mg, eg):
+        stats = self._stats
+        stats.eval_calls += 1
+        if not stats.profile:
+            return self._evaluator.blend(board, mg, eg)
+        start = time.perf_counter()
+        score = self._evaluator.blend(board, mg, eg)
+        stats.add_time(EVAL, time.perf_counter() - start)
+        return score
+
+    def delta(self, board, move):
+        stats = self._stats
+        if not stats.profile:
+            return self._evaluator.delta(board, move)
+        start = time.perf_counter()
+        delta = self._evaluator.delta(board, move)
+        stats.add_time(EVAL, time.perf_counter() - start)
+        return delta
+
+
+class TimedOrdering:
+    # Times the staged move generation, which runs lazily between the moves
+    def __init__(self, ordering, stats):
+        self._ordering = ordering
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._ordering, name)
+
+    def moves(self, board, ply, tt_move=None):
+        stats = self._stats
+        generator = self._ordering.moves(board, ply, tt_move)
+        while True:
+            start = time.perf_counter()
+            move = next(generator, None)
+            stats.add_time(MOVEGEN, time.perf_counter() - start)
+            if move is None:
+                return
+            yield move
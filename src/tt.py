@@ -0,0 +1,122 @@
+import chess
+from array import array
+
+# Transposition Table
+# A fixed-size table preallocated from a memory budget in MB. Each bucket holds
+# two entries: a depth-preferred slot and an always-replace slot. An entry is
+# two 64-bit words, the packed data and (key XOR data), so a probe can verify
+# the key and detect a half-written entry with a single comparison.
+#
+# Data word layout:
+#   bits  0-15  best move (from | to << 6 | promotion << 12), 0 = none
+#   bits 16-47  score + SCORE_OFFSET
+#   bits 48-55  depth
+#   bits 56-57  bound flag
+#   bits 58-63  search age
+
+EXACT = 0
+LOWER = 1  # Score is a lower bound (search failed high)
+UPPER = 2  # Score is an upper bound (search failed low)
+
+ENTRY_BYTES = 16
+BUCKET_ENTRIES = 2
+SCORE_OFFSET = 1 << 31
+AGE_MASK = 0x3F
+
+
+def encode_move(move):
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(value):
+    if not value:
+        return None
+    return chess.Move(value & 0x3F, (value >> 6) & 0x3F, (value >> 12) or None)
+
+
+def buckets_for_size(size_mb):
+    # Largest power of two that fits in the budget, so indexing is a mask.
+    buckets = max(1, (int(size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_ENTRIES)))
+    return 1 << (buckets.bit_length() - 1)
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, buffer=None):
+        self.age = 0
+        self.resize(size_mb, buffer)
+
+    def resize(self, size_mb, buffer=None):
+        self.size_mb = size_mb
+        self.buckets = buckets_for_size(size_mb)
+        self.mask = self.buckets - 1
+        words = self.buckets * BUCKET_ENTRIES * 2
+        if buffer is None:
+            self.table = array('Q', bytes(words * 8))
+        else:
+            # Any writable buffer (e.g. shared memory) large enough for the table
+            self.table = memoryview(buffer).cast('B')[:words * 8].cast('Q')
+
+    def clear(self):
+        self.table[:] = array('Q', bytes(len(self.table) * 8))
+        self.age = 0
+
+    def new_search(self):
+        self.age = (self.age + 1) & AGE_MASK
+
+    def probe(self, key):
+        # Returns (score, depth, flag, move) or None
+        table = self.table
+        i = (key & self.mask) << 2
+        data = table[i]
+        if table[i + 1] ^ data != key:
+            data = table[i + 2]
+            if table[i + 3] ^ data != key:
+                return None
+        return (
+            ((data >> 16) & 0xFFFFFFFF) - SCORE_OFFSET,
+            (data >> 48) & 0xFF,
+            (data >> 56) & 0x3,
+            data & 0xFFFF,
+        )
+
+    def store(self, key, depth, score, flag, move=0):
+        table = self.table
+        i = (key & self.mask) << 2
+
+        old = table[i]
+        same_key = table[i + 1] ^ old == key
+        if not move and same_key:
+            move = old & 0xFFFF  # Keep the best move we already knew about
+
+        old_depth = (old >> 48) & 0xFF
+        old_age = old >> 58
+        if not (same_key or old_age != self.age or depth >= old_depth or flag == EXACT):
+            # Depth-preferred slot keeps its entry, use the always-replace slot
+            i += 2
+            if not move and table[i + 1] ^ table[i] == key:
+                move = table[i] & 0xFFFF
+
+        depth = min(max(depth, 0), 0xFF)
+        score = min(max(int(score), -SCORE_OFFSET), SCORE_OFFSET - 1)
+        data = (
+            (move & 0xFFFF)
+            | ((score + SCORE_OFFSET) << 16)
+            | (depth << 48)
+            | (flag << 56)
+            | (self.age << 58)
+        )
+        table[i] = data
+        table[i + 1] = key ^ data
+
+    def hashfull(self):
+        # Permille of sampled depth-preferred slots written during this search
+        table = self.table
+        sample = min(self.buckets, 1000)
+        used = 0
+        for b in range(sample):
+            data = table[b << 2]
+            if data and (data >> 58) == self.age:
+                used += 1
+        return used * 1000 // sample
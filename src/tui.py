@@ -77,9 +77,7 @@ class RichGame:
         )
         
         # Status
-        self.layout["left"]["status"].update(
-            Panel(Text(self.status_text, justify="center"), title="Status", border_style="yellow")
-        )
+        self.render_status()
         
         # Chat
         chat_text = Text()
@@ -108,5 +106,11 @@ class RichGame:
         
     def set_status(self, status):
         self.status_text = status
+        self.render_status() # Redraw right away, a running search updates it between board updates
+
+    def render_status(self):
+        self.layout["left"]["status"].update(
+            Panel(Text(self.status_text, justify="center"), title="Status", border_style="yellow")
+        )
 
 game_ui = RichGame()
@@ -0,0 +1,59 @@
+import chess
+import chess.polyglot
+
+# Zobrist hashing for the search.
+# We reuse the Polyglot random numbers so a key computed here is identical to
+# chess.polyglot.zobrist_hash(board). The search only hashes the root from
+# scratch, position.Position then updates the key move by move with the keys
+# and helpers below.
+
+RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+
+# PIECE_KEYS[color][piece_type][square]
+PIECE_KEYS = [[[0] * 64 for _ in range(7)] for _ in range(2)]
+for _color in chess.COLORS:
+    for _piece_type in chess.PIECE_TYPES:
+        _kind = (_piece_type - 1) * 2 + (1 if _color == chess.WHITE else 0)
+        for _square in chess.SQUARES:
+            PIECE_KEYS[_color][_piece_type][_square] = RANDOM[64 * _kind + _square]
+
+# Castling rights are stored by python-chess as a bitboard of rook squares.
+CASTLING_KEYS = {
+    chess.H1: RANDOM[768],
+    chess.A1: RANDOM[769],
+    chess.H8: RANDOM[770],
+    chess.A8: RANDOM[771],
+}
+EP_KEYS = [RANDOM[772 + file] for file in range(8)]
+TURN_KEY = RANDOM[780]
+
+
+def hash_board(board):
+    return chess.polyglot.zobrist_hash(board)
+
+
+def castling_key(rights):
+    key = 0
+    for square, value in CASTLING_KEYS.items():
+        if rights & chess.BB_SQUARES[square]:
+            key ^= value
+    return key
+
+
+def ep_key(ep_square, pawns_to_move):
+    # Polyglot only hashes the en passant file when a pawn could take it.
+    if ep_square is None:
+        return 0
+    file = chess.square_file(ep_square)
+    if ep_square > chess.H4:
+        rank_bb = chess.BB_RANK_5  # Black just double pushed, White captures from rank 5
+    else:
+        rank_bb = chess.BB_RANK_4
+    neighbours = 0
+    if file > 0:
+        neighbours |= chess.BB_FILES[file - 1]
+    if file < 7:
+        neighbours |= chess.BB_FILES[file + 1]
+    if pawns_to_move & neighbours & rank_bb:
+        return EP_KEYS[file]
+    return 0
@@ -0,0 +1,5 @@
+import sys
+import os
+
+# Add parent directory to path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
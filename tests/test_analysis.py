@@ -0,0 +1,40 @@
+import io
+
+import chess
+import chess.pgn
+
+import src.analysis as analysis
+from src.evaluation import MATE_SCORE
+from scripts.analyze import game_record
+
+SCHOLARS_MATE = "1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0"
+FOOLS_MATE = "1. f3 e5 2. g4 Qh4# 0-1"
+
+
+def analyzed(pgn):
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    moves = [move.uci() for move in game.mainline_moves()]
+    result = analysis.analyze_game((0, game.board().fen(), moves, "engine", {"depth": 2}))
+    return game, result
+
+
+def test_final_eval_tells_who_mated():
+    for pgn, result in ((SCHOLARS_MATE, "1-0"), (FOOLS_MATE, "0-1")):
+        board = chess.pgn.read_game(io.StringIO(pgn)).end().board()
+        assert analysis.final_eval(board, -MATE_SCORE) == {"eval": None, "mate": 0, "result": result}
+
+
+def test_final_eval_of_an_unfinished_game():
+    board = chess.Board()
+    board.push_uci("e2e4")
+    assert analysis.final_eval(board, -30) == {"eval": 30, "mate": None, "result": "*"}
+
+
+def test_game_record_of_mates_by_either_color():
+    for pgn, result in ((SCHOLARS_MATE, "1-0"), (FOOLS_MATE, "0-1")):
+        game, analysis_result = analyzed(pgn)
+        record, records = game_record("games.pgn", 1, game, analysis_result, {"depth": 2})
+        assert record["final"] == {"eval": None, "mate": 0, "result": result}
+        assert len(records) == len(list(game.mainline_moves()))
+        # The mating move was the best move
+        assert records[-1]["best"] == records[-1]["uci"] and records[-1]["cp_loss"] == 0
@@ -0,0 +1,80 @@
+import os
+import random
+
+import chess
+import pytest
+
+import src.bitbase as bitbase
+
+# Generated locally with scripts/bitbases.py
+pytestmark = pytest.mark.skipif(
+    not all(os.path.exists(path) for name in bitbase.TABLES for path in bitbase.paths(name)),
+    reason="bitbases not generated",
+)
+
+# (FEN, (result for the side to move, plies to mate))
+KNOWN = [
+    ("4k3/Q7/4K3/8/8/8/8/8 w - - 0 1", (1, 1)),  # Qe7#
+    ("k7/8/1Q6/8/8/8/8/7K b - - 0 1", (0, 0)),  # Stalemate
+    ("8/8/8/8/8/8/4K3/4q2k w - - 0 1", (0, 0)),  # Kxe1
+    ("k7/8/1K6/8/8/8/8/7R w - - 0 1", (1, 1)),  # Rh8#
+    ("k6R/8/1K6/8/8/8/8/8 b - - 0 1", (-1, 0)),  # Mated
+    ("k7/8/8/8/P7/8/8/2K5 w - - 0 1", (0, 0)),  # Rook pawn, the king reaches the corner
+    ("8/8/8/8/8/8/p7/K6k w - - 0 1", (0, 0)),  # Kxa2
+    ("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1", (1, 21)),  # King on the sixth ahead of its pawn wins
+    ("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1", (-1, 24)),
+]
+
+
+@pytest.mark.parametrize("fen, expected", KNOWN)
+def test_known_results(fen, expected):
+    assert bitbase.probe(chess.Board(fen)) == expected
+
+
+def test_not_covered():
+    assert bitbase.probe(chess.Board()) is None
+    assert bitbase.probe(chess.Board("k7/8/8/8/8/8/8/B6K w - - 0 1")) is None
+
+
+def random_position(rng, piece):
+    while True:
+        board = chess.Board(None)
+        squares = rng.sample(chess.SQUARES, 3)
+        color = rng.choice(chess.COLORS)
+        board.set_piece_at(squares[0], chess.Piece(chess.KING, color))
+        board.set_piece_at(squares[1], chess.Piece(chess.KING, not color))
+        board.set_piece_at(squares[2], chess.Piece(piece, color))
+        board.turn = rng.choice(chess.COLORS)
+        if board.is_valid():
+            return board
+
+
+@pytest.mark.parametrize("piece", [chess.QUEEN, chess.ROOK, chess.PAWN])
+def test_results_agree_with_the_moves(piece):
+    # A win needs a move to a loss one ply shorter, a loss has only moves to
+    # wins and a draw no move to a loss
+    rng = random.Random(piece)
+    for _ in range(200):
+        board = random_position(rng, piece)
+        result, plies = bitbase.probe(board)
+        replies = []
+        for move in board.legal_moves:
+            board.push(move)
+            reply = bitbase.probe(board)
+            board.pop()
+            # Captures and underpromotions leave the tables, score them here
+            if reply is None:
+                if board.is_capture(move):
+                    reply = (0, 0)
+                else:
+                    continue
+            replies.append(reply)
+        if board.is_checkmate():
+            assert (result, plies) == (-1, 0)
+        elif result == 1:
+            assert min(p for r, p in replies if r == -1) == plies - 1, board.fen()
+        elif result == -1:
+            assert all(r == 1 for r, _ in replies), board.fen()
+            assert max(p for _, p in replies) == plies - 1, board.fen()
+        else:
+            assert all(r != -1 for r, _ in replies), board.fen()
@@ -0,0 +1,55 @@
+import chess
+
+from src.cache import AnalysisCache
+
+KEY = 0x463B96181691FC9C  # Above 2^63, stored as a negative SQLite integer
+FINGERPRINT = 12345
+PV = [chess.Move.from_uci("e2e4"), chess.Move.from_uci("e7e5")]
+
+
+def test_round_trip_through_the_file(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    cache = AnalysisCache(path)
+    cache.store(KEY, FINGERPRINT, 6, 35, PV)
+    cache.close()
+
+    cache = AnalysisCache(path)
+    assert cache.probe(KEY, FINGERPRINT, 6) == (6, 35, PV)
+    assert cache.probe(KEY, FINGERPRINT, 4) == (6, 35, PV)
+    assert cache.probe(KEY, FINGERPRINT, 7) is None
+    assert cache.probe(KEY, FINGERPRINT + 1, 1) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.close()
+
+
+def test_keeps_the_deeper_result(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    deep = AnalysisCache(path)
+    deep.store(KEY, FINGERPRINT, 8, 50, PV)
+    deep.store(KEY, FINGERPRINT, 5, -20, PV[:1])  # Pending, not written yet
+    assert deep.probe(KEY, FINGERPRINT, 1) == (8, 50, PV)
+    deep.close()
+
+    # Another process writing a shallower result later
+    shallow = AnalysisCache(path)
+    shallow.store(KEY, FINGERPRINT, 4, 10, PV[:1])
+    shallow.close()
+
+    cache = AnalysisCache(path)
+    assert cache.probe(KEY, FINGERPRINT, 1) == (8, 50, PV)
+    cache.store(KEY, FINGERPRINT, 9, 70, PV[:1])
+    cache.close()
+    assert AnalysisCache(path).probe(KEY, FINGERPRINT, 1) == (9, 70, PV[:1])
+
+
+def test_prunes_least_recently_used(tmp_path):
+    path = str(tmp_path / "analysis.db")
+    cache = AnalysisCache(path, max_entries=100, batch_size=10)
+    for key in range(300):
+        cache.store(key, FINGERPRINT, 1, 0, [])
+    cache.flush()
+    assert 0 < cache.count() <= 100
+    # The last batches written are the ones kept
+    assert cache.probe(299, FINGERPRINT, 1) is not None
+    assert cache.probe(0, FINGERPRINT, 1) is None
+    cache.close()
@@ -0,0 +1,49 @@
+import random
+
+import chess
+
+import src.engine as engine
+
+# Positions with castling, en passant, promotions and captures
+FENS = [
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+]
+
+
+def test_delta_matches_a_full_rescan():
+    evaluator = engine.evaluator_for()
+    for fen in FENS:
+        board = chess.Board(fen)
+        before = evaluator.scores(board)
+        for move in board.legal_moves:
+            d_mg, d_eg = evaluator.delta(board, move)
+            board.push(move)
+            assert evaluator.scores(board) == (before[0] + d_mg, before[1] + d_eg), (fen, move.uci())
+            board.pop()
+
+
+def test_delta_along_random_games():
+    evaluator = engine.evaluator_for()
+    rng = random.Random(1)
+    for _ in range(20):
+        board = chess.Board()
+        mg, eg = evaluator.scores(board)
+        while not board.is_game_over() and board.ply() < 200:
+            move = rng.choice(list(board.legal_moves))
+            d_mg, d_eg = evaluator.delta(board, move)
+            mg += d_mg
+            eg += d_eg
+            board.push(move)
+            assert evaluator.scores(board) == (mg, eg), board.fen()
+
+
+def test_mirrored_position_scores_negated():
+    evaluator = engine.evaluator_for()
+    for fen in FENS:
+        board = chess.Board(fen)
+        mg, eg = evaluator.scores(board)
+        assert evaluator.scores(board.mirror()) == (-mg, -eg)
@@ -0,0 +1,66 @@
+import math
+
+import pytest
+
+from src.match import elo_from_score, expected_score, elo_estimate, sprt_llr, sprt_bounds, load_openings
+
+
+def test_elo_and_expected_score_are_inverse():
+    for elo in (-400, -50, 0, 50, 400):
+        assert elo_from_score(expected_score(elo)) == pytest.approx(elo)
+    assert elo_from_score(0) == -math.inf
+    assert elo_from_score(1) == math.inf
+
+
+def test_even_score():
+    elo, margin = elo_estimate(10, 20, 10)
+    assert elo == pytest.approx(0)
+    assert margin > 0
+    assert elo_estimate(0, 10, 0) == (0, 0)
+
+
+def test_perfect_scores_stay_finite():
+    elo, margin = elo_estimate(4, 0, 0)
+    assert math.isfinite(elo) and elo > 0
+    assert math.isfinite(margin)
+    assert elo_estimate(0, 0, 4) == pytest.approx((-elo, margin))
+    assert round(elo_estimate(1, 0, 0)[0]) == 0  # One game says nothing
+    # More games, more confidence in the same result
+    assert elo_estimate(40, 0, 0)[0] > elo
+
+
+def test_margin_shrinks_with_games():
+    assert elo_estimate(60, 80, 40)[1] < elo_estimate(6, 8, 4)[1]
+
+
+def test_sprt_llr():
+    assert sprt_llr(0, 0, 0, 0, 5) == 0.0
+    # Without variance a shutout still counts for the winner, all draws for H0
+    assert sprt_llr(5, 0, 0, 0, 5) > 0
+    assert sprt_llr(0, 0, 5, 0, 5) < 0
+    assert sprt_llr(50, 0, 0, 0, 5) > sprt_llr(5, 0, 0, 0, 5)
+    assert sprt_llr(0, 10, 0, 0, 5) < 0
+    assert sprt_llr(60, 20, 20, 0, 5) > 0
+    assert sprt_llr(20, 20, 60, 0, 5) < 0
+    # Twice the games with the same results, twice the evidence
+    assert sprt_llr(60, 20, 20, 0, 5) == pytest.approx(sprt_llr(30, 10, 10, 0, 5) * 2)
+
+
+def test_sprt_bounds():
+    lower, upper = sprt_bounds(0.05, 0.05)
+    assert lower == pytest.approx(-math.log(19))
+    assert upper == pytest.approx(math.log(19))
+
+
+def test_load_openings_drops_duplicates(tmp_path):
+    path = tmp_path / "openings.epd"
+    path.write_text(
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1\n"
+        "# The same position with other move counters\n"
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 3 7\n"
+        "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq -\n"
+    )
+    assert load_openings(str(path)) == [
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1",
+        "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1",
+    ]
@@ -0,0 +1,57 @@
+import random
+
+import chess
+import chess.polyglot
+import pytest
+
+from src.position import Position, perft
+from scripts.perft import PERFT_POSITIONS
+
+# Deeper counts take minutes in pure Python, scripts/perft.py checks those
+MAX_NODES = 500000
+
+
+@pytest.mark.parametrize("fen, counts", PERFT_POSITIONS)
+def test_perft_counts(fen, counts):
+    position = Position.from_board(chess.Board(fen))
+    for depth, expected in enumerate(counts, 1):
+        if expected > MAX_NODES:
+            break
+        assert perft(position, depth) == expected, depth
+    # Counting makes and unmakes every move, the position must be unchanged
+    assert position.fen() == chess.Board(fen).fen()
+    assert position.key == chess.polyglot.zobrist_hash(chess.Board(fen))
+
+
+def test_legal_moves_and_keys_along_random_games():
+    rng = random.Random(1)
+    for fen, _ in PERFT_POSITIONS:
+        board = chess.Board(fen)
+        position = Position.from_board(board)
+        keys = [position.key]
+        while not board.is_game_over() and len(keys) < 120:
+            assert position.generate_legal_moves() == list(board.legal_moves), board.fen()
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            position.push(move)
+            assert position.key == chess.polyglot.zobrist_hash(board), board.fen()
+            keys.append(position.key)
+        # Unmaking restores every key on the way back
+        while keys:
+            assert position.key == keys.pop()
+            assert position.key == chess.polyglot.zobrist_hash(board), board.fen()
+            if keys:
+                board.pop()
+                position.pop()
+        assert position.fen() == chess.Board(fen).fen()
+
+
+def test_null_move_key():
+    board = chess.Board("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+    position = Position.from_board(board)
+    key = position.key
+    board.push(chess.Move.null())
+    position.push(chess.Move.null())
+    assert position.key == chess.polyglot.zobrist_hash(board)
+    position.pop()
+    assert position.key == key
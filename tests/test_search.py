@@ -0,0 +1,68 @@
+import chess
+import pytest
+
+import src.engine as engine
+import src.rival_engine as rival_engine
+from src.search import mate_in
+
+ENGINES = [engine, rival_engine]
+
+# (FEN, depth, best move, moves to mate)
+MATES = [
+    ("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", 3, "a1a8", 1),  # Back rank
+    ("r2qkb1r/pp2nppp/3p4/2pNN1B1/2BnP3/3P4/PPP2PPP/R2bK2R w KQkq - 1 1", 4, "d5f6", 2),  # Nf6+ gxf6 Bxf7#
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_search():
+    # Every test starts without what earlier searches left in the table
+    for module in ENGINES:
+        module.SEARCHER.clear()
+
+
+@pytest.mark.parametrize("module", ENGINES)
+@pytest.mark.parametrize("fen, depth, best, mate", MATES)
+def test_finds_mate(module, fen, depth, best, mate):
+    # Null move pruning and reductions must not hide the mating line
+    result = module.search_position(chess.Board(fen), depth=depth, use_book=False)
+    assert result.move == chess.Move.from_uci(best)
+    assert mate_in(result.score) == mate
+    assert len(result.pv) == 2 * mate - 1
+
+
+@pytest.mark.parametrize("module", ENGINES)
+def test_defends_against_mate(module):
+    # Black must stop Qxf7#
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 4 4")
+    result = module.search_position(board, depth=4, use_book=False)
+    board.push(result.move)
+    for move in board.legal_moves:
+        board.push(move)
+        assert not board.is_checkmate(), move.uci()
+        board.pop()
+
+
+@pytest.mark.parametrize("module", ENGINES)
+def test_takes_a_hanging_queen(module):
+    board = chess.Board("rnb1kbnr/pppp1ppp/8/4p3/3q4/4P3/PPPP1PPP/RNBQKBNR w KQkq - 0 1")
+    result = module.search_position(board, depth=4, use_book=False)
+    assert board.is_capture(result.move) and result.move.to_square == chess.D4
+    assert result.score > 500
+
+
+@pytest.mark.parametrize("module", ENGINES)
+def test_pv_is_legal(module):
+    board = chess.Board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    result = module.search_position(board, depth=4, use_book=False)
+    assert result.pv and result.pv[0] == result.move
+    for move in result.pv:
+        assert board.is_legal(move)
+        board.push(move)
+
+
+@pytest.mark.parametrize("module", ENGINES)
+def test_node_budget(module):
+    result = module.search_position(chess.Board(), nodes=2000, use_book=False)
+    assert result.move in chess.Board().legal_moves
+    assert result.nodes <= 2000 * 1.1
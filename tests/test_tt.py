@@ -0,0 +1,52 @@
+import chess
+
+from src.tt import TranspositionTable, EXACT, LOWER, UPPER, encode_move, decode_move
+
+KEY = 0x463B96181691FC9C  # Polyglot key of the start position
+
+
+def test_store_and_probe_keep_the_bound_flag():
+    tt = TranspositionTable(1)
+    move = encode_move(chess.Move.from_uci("e2e4"))
+    for flag in (EXACT, LOWER, UPPER):
+        tt.store(KEY, 5, -123, flag, move)
+        assert tt.probe(KEY) == (-123, 5, flag, move)
+
+
+def test_probe_misses_other_keys():
+    tt = TranspositionTable(1)
+    tt.store(KEY, 5, 40, EXACT)
+    assert tt.probe(KEY ^ 1 << 40) is None
+    assert tt.probe(KEY + tt.buckets) is None
+
+
+def test_store_without_move_keeps_the_known_move():
+    tt = TranspositionTable(1)
+    move = encode_move(chess.Move.from_uci("g1f3"))
+    tt.store(KEY, 3, 10, LOWER, move)
+    tt.store(KEY, 4, 25, UPPER)
+    assert tt.probe(KEY) == (25, 4, UPPER, move)
+
+
+def test_shallower_entry_goes_to_the_always_replace_slot():
+    tt = TranspositionTable(1)
+    other = KEY + tt.buckets  # Same bucket, different key
+    tt.store(KEY, 8, 50, LOWER)
+    tt.store(other, 2, -50, UPPER)
+    assert tt.probe(KEY) == (50, 8, LOWER, 0)
+    assert tt.probe(other) == (-50, 2, UPPER, 0)
+
+
+def test_clear_forgets_everything():
+    tt = TranspositionTable(1)
+    tt.store(KEY, 5, 40, EXACT)
+    tt.clear()
+    assert tt.probe(KEY) is None
+
+
+def test_move_encoding_round_trip():
+    for uci in ("e2e4", "e7e8q", "a2a1n", "e1g1"):
+        move = chess.Move.from_uci(uci)
+        assert decode_move(encode_move(move)) == move
+    assert encode_move(None) == 0
+    assert decode_move(0) is None